@@ -0,0 +1,196 @@
+"""Integration benchmark of setup, refresh and MQTT ingest against the fake API.
+
+For each device count the integration is set up from a config entry in a
+test Home Assistant instance, backed by ``tests.fake_phyn.FakePhynAPI``.
+It measures:
+
+* ``async_setup_entry`` duration and the time until the first entity state
+* ``PhynDataUpdateCoordinator`` refresh latency
+* ``on_device_update`` throughput, per-message latency and the number of
+  entity state writes per MQTT message
+
+Results are printed as JSON (or written with ``--output``) so runs of
+different versions can be compared. Needs the test requirements.
+
+    python -m benchmarks.bench_integration --devices 1 10 50 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager
+import json
+from pathlib import Path
+import platform
+import statistics
+import tempfile
+import time
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, EVENT_STATE_CHANGED
+from homeassistant.core import Event
+from homeassistant.helpers.entity import Entity
+from homeassistant.loader import DATA_CUSTOM_COMPONENTS
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.phyn.const import DOMAIN
+from tests.fake_phyn import FakePhynAPI
+
+MANIFEST = Path(__file__).parent.parent / "custom_components" / "phyn" / "manifest.json"
+DEVICE_COUNTS = (1, 10, 50, 100, 200)
+REFRESHES = 10
+MESSAGES = 2000
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    """Summarize latencies in microseconds."""
+    ordered = sorted(values)
+    return {
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p50_us": ordered[len(ordered) // 2] * 1e6,
+        "p95_us": ordered[int(len(ordered) * 0.95)] * 1e6,
+        "p99_us": ordered[int(len(ordered) * 0.99)] * 1e6,
+        "max_us": ordered[-1] * 1e6,
+    }
+
+
+@contextmanager
+def _count_entity_writes() -> Iterator[list[int]]:
+    """Count calls to Entity.async_write_ha_state."""
+    writes = [0]
+    original = Entity.async_write_ha_state
+
+    def async_write_ha_state(self: Entity) -> None:
+        writes[0] += 1
+        original(self)
+
+    with patch.object(Entity, "async_write_ha_state", async_write_ha_state):
+        yield writes
+
+
+async def _async_bench_devices(devices: int, refreshes: int, messages: int, latency: float) -> dict[str, Any]:
+    """Set up the integration with Phyn Plus devices and measure it."""
+    api = FakePhynAPI({"PP2": devices}, latency=latency)
+    async with async_test_home_assistant() as hass:
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass.config.config_dir = config_dir
+            hass.data.pop(DATA_CUSTOM_COMPONENTS, None)
+            hass.data["core.uuid"] = "benchmark"
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={CONF_USERNAME: api.username, CONF_PASSWORD: "password", "Brand": "phyn"},
+                version=1,
+                minor_version=2,
+            )
+            entry.add_to_hass(hass)
+
+            first_entity: list[float] = []
+
+            def state_changed(event: Event) -> None:
+                if not first_entity:
+                    first_entity.append(time.perf_counter())
+
+            hass.bus.async_listen(EVENT_STATE_CHANGED, state_changed)
+
+            # Entities bind async_write_ha_state when added, so count from setup on
+            with (
+                patch("custom_components.phyn.async_get_api", AsyncMock(return_value=api)),
+                _count_entity_writes() as writes,
+            ):
+                setup_begin = time.perf_counter()
+                assert await hass.config_entries.async_setup(entry.entry_id)
+                await hass.async_block_till_done()
+                setup = time.perf_counter() - setup_begin
+                coordinator = hass.data[DOMAIN]["coordinator"]
+                entities = len(hass.states.async_all())
+
+                refresh_times = []
+                for _ in range(refreshes):
+                    begin = time.perf_counter()
+                    await coordinator.async_refresh()
+                    refresh_times.append(time.perf_counter() - begin)
+
+                device_ids = [device.id for device in coordinator.devices]
+                message_times = []
+                writes[0] = 0
+                begin = time.perf_counter()
+                for index in range(messages):
+                    device_id = device_ids[index % len(device_ids)]
+                    flow = (0.0, 1.5)[index % 2]
+                    start = time.perf_counter()
+                    await api.mqtt.push_realtime(device_id, flow=flow, pressure=60 + index % 3)
+                    message_times.append(time.perf_counter() - start)
+                ingest = time.perf_counter() - begin
+                message_writes = writes[0]
+
+                assert await hass.config_entries.async_unload(entry.entry_id)
+                await hass.async_block_till_done()
+
+    return {
+        "devices": devices,
+        "entities": entities,
+        "setup_s": setup,
+        "first_entity_s": first_entity[0] - setup_begin if first_entity else None,
+        "refresh_mean_ms": statistics.fmean(refresh_times) * 1e3,
+        "refresh_max_ms": max(refresh_times) * 1e3,
+        "skipped_writes_per_refresh": coordinator.skipped_writes,
+        "mqtt_messages_per_s": messages / ingest,
+        "mqtt_latency": _percentiles(message_times),
+        "entity_writes_per_message": message_writes / messages,
+    }
+
+
+async def async_run(
+    device_counts: tuple[int, ...] = DEVICE_COUNTS,
+    refreshes: int = REFRESHES,
+    messages: int = MESSAGES,
+    latency: float = 0.0,
+) -> dict[str, Any]:
+    """Run the benchmark for every device count."""
+    return {
+        "version": json.loads(MANIFEST.read_text())["version"],
+        "python": platform.python_version(),
+        "timestamp": int(time.time()),
+        "latency_s": latency,
+        "results": [
+            await _async_bench_devices(devices, refreshes, messages, latency)
+            for devices in device_counts
+        ],
+    }
+
+
+def run(**kwargs: Any) -> dict[str, Any]:
+    """Run the benchmark and return the results."""
+    return asyncio.run(async_run(**kwargs))
+
+
+def main() -> None:
+    """Print or write the benchmark results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=list(DEVICE_COUNTS))
+    parser.add_argument("--refreshes", type=int, default=REFRESHES)
+    parser.add_argument("--messages", type=int, default=MESSAGES)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated API latency in seconds")
+    parser.add_argument("--output", type=Path, help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = run(
+        device_counts=tuple(args.devices),
+        refreshes=args.refreshes,
+        messages=args.messages,
+        latency=args.latency,
+    )
+    output = json.dumps(results, indent=2)
+    if args.output is not None:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Memory and throughput benchmark for the realtime sample ring buffer.
+
+Simulates one hour of 10 Hz ingest and times downsampling the most recent
+ten minutes at several resolutions.
+
+    python -m benchmarks.bench_samples
+"""
+from __future__ import annotations
+
+import math
+import time
+import tracemalloc
+
+from custom_components.phyn.analytics.samples import SampleRingBuffer
+
+RATE_HZ = 10
+DURATION_S = 3600
+
+
+def run() -> dict[str, float]:
+    """Run the benchmark and return the measurements."""
+    samples = RATE_HZ * DURATION_S
+    start_ts = time.time() - DURATION_S
+
+    tracemalloc.start()
+    buffer = SampleRingBuffer(samples)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    begin = time.perf_counter()
+    for i in range(samples):
+        ts = start_ts + i / RATE_HZ
+        buffer.append(ts, 2.0 + math.sin(i / 50), 60.0 + math.cos(i / 70), 65.0)
+    ingest = time.perf_counter() - begin
+
+    results: dict[str, float] = {
+        "samples": samples,
+        "buffer_bytes": buffer.nbytes,
+        "alloc_peak_bytes": peak,
+        "bytes_per_sample": buffer.nbytes / samples,
+        "ingest_per_second": samples / ingest,
+        "ingest_us_per_sample": ingest / samples * 1e6,
+    }
+
+    since = start_ts + DURATION_S - 600
+    for resolution in (1, 10, 60):
+        begin = time.perf_counter()
+        buckets = buffer.downsample(since, resolution)
+        results[f"downsample_{resolution}s_ms"] = (time.perf_counter() - begin) * 1000
+        results[f"downsample_{resolution}s_buckets"] = len(buckets["ts"])
+    return results
+
+
+def main() -> None:
+    """Print the benchmark results."""
+    for name, value in run().items():
+        print(f"{name:28} {value:,.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Startup benchmark of platform setup with many simulated devices.
+
+Compares the former per-platform ``isinstance`` scans over every device's
+entities and the per-access ``DeviceInfo`` construction against the entity
+lists bucketed once by the coordinator and the cached ``DeviceInfo``.
+
+    python -m benchmarks.bench_startup
+"""
+from __future__ import annotations
+
+import timeit
+from unittest.mock import MagicMock
+
+from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC, DeviceInfo
+
+from custom_components.phyn.const import DOMAIN
+from custom_components.phyn.update_coordinator import (
+    PLATFORM_ENTITY_TYPES,
+    PhynDataUpdateCoordinator,
+)
+
+DEVICES = 50
+ITERATIONS = 200
+PRODUCT_CODES = ("PP2", "PC1", "PW1")
+
+
+def _coordinator() -> PhynDataUpdateCoordinator:
+    """Create a coordinator with simulated devices of every product."""
+    coordinator = PhynDataUpdateCoordinator(MagicMock(), MagicMock())
+    for index in range(DEVICES):
+        coordinator.add_device(
+            "home", f"device-{index:04d}", PRODUCT_CODES[index % len(PRODUCT_CODES)]
+        )
+    return coordinator
+
+
+def _scan_platforms(coordinator: PhynDataUpdateCoordinator) -> int:
+    """Filter entities per platform the way each setup entry used to."""
+    total = 0
+    for _, entity_type in PLATFORM_ENTITY_TYPES:
+        entities = []
+        for device in coordinator.devices:
+            entities.extend([
+                entity
+                for entity in device.entities
+                if isinstance(entity, entity_type)
+            ])
+        total += len(entities)
+    return total
+
+
+def _bucketed_platforms(coordinator: PhynDataUpdateCoordinator) -> int:
+    """Fetch the pre-indexed entity list of each platform."""
+    return sum(
+        len(coordinator.entities_for_platform(platform))
+        for platform, _ in PLATFORM_ENTITY_TYPES
+    )
+
+
+def _built_device_info(coordinator: PhynDataUpdateCoordinator) -> None:
+    """Build a DeviceInfo per entity the way entities used to."""
+    for device in coordinator.devices:
+        for _ in device.entities:
+            DeviceInfo(
+                identifiers={(DOMAIN, device.id)},
+                manufacturer=device.manufacturer,
+                model=device.model,
+                name=device.device_name.capitalize(),
+                sw_version=device.firmware_version,
+                connections={(CONNECTION_NETWORK_MAC, device.id)},
+                serial_number=device.serial_number
+            )
+
+
+def _cached_device_info(coordinator: PhynDataUpdateCoordinator) -> None:
+    """Read the cached DeviceInfo of each entity's device."""
+    for device in coordinator.devices:
+        for _ in device.entities:
+            device.device_info  # pylint: disable=pointless-statement
+
+
+def run() -> dict[str, float]:
+    """Run the benchmark and return microseconds per startup."""
+    coordinator = _coordinator()
+    entities = sum(len(device.entities) for device in coordinator.devices)
+    assert _scan_platforms(coordinator) == _bucketed_platforms(coordinator) == entities
+
+    timings = {
+        "scan_platforms": timeit.timeit(lambda: _scan_platforms(coordinator), number=ITERATIONS),
+        "bucketed_platforms": timeit.timeit(
+            lambda: _bucketed_platforms(coordinator), number=ITERATIONS
+        ),
+        "built_device_info": timeit.timeit(
+            lambda: _built_device_info(coordinator), number=ITERATIONS
+        ),
+        "cached_device_info": timeit.timeit(
+            lambda: _cached_device_info(coordinator), number=ITERATIONS
+        ),
+    }
+    results = {"entities": float(entities)}
+    results.update({f"{name}_us": value / ITERATIONS * 1e6 for name, value in timings.items()})
+    return results
+
+
+def main() -> None:
+    """Print the benchmark results."""
+    for name, value in run().items():
+        print(f"{name:22} {value:,.1f}")
+
+
+if __name__ == "__main__":
+    main()
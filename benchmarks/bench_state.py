@@ -0,0 +1,74 @@
+"""Micro-benchmark of the typed device state against the former raw dict.
+
+Compares ingesting an MQTT style update and reading the values entities
+use on every state write (pressure, temperature, flow and valve status).
+Parsing moves work to ingest, so the per-message figure combines one
+ingest with the reads of a full entity refresh.
+
+    python -m benchmarks.bench_state
+"""
+from __future__ import annotations
+
+import timeit
+from typing import Any
+
+from custom_components.phyn.devices.state import PhynPlusState
+
+ITERATIONS = 200_000
+# Every MQTT message rewrites the state of each Phyn Plus entity
+READS_PER_MESSAGE = 20
+
+UPDATE: dict[str, Any] = {
+    "flow": {"v": 1.23456, "ts": 1700000000000},
+    "sov_status": {"v": "Open"},
+    "pressure": {"v": 61.23456, "ts": 1700000000000},
+    "temperature": {"v": 64.98765, "ts": 1700000000000},
+}
+
+
+def _dict_reads(state: dict[str, Any]) -> tuple[Any, ...]:
+    """Read values the way the dict based properties did."""
+    pressure = state.get("pressure", {})
+    psi = round(pressure["v"], 2) if "v" in pressure else round(pressure.get("mean", 0), 2)
+    temp = state.get("temperature", {})
+    temperature = round(temp["v"], 2) if "v" in temp else round(temp.get("mean", 0), 2)
+    flow = state.get("flow", {})
+    rate = round(flow["v"], 3) if "v" in flow else None
+    sov_status = state.get("sov_status", {})
+    return psi, temperature, rate, sov_status.get("v") == "Open"
+
+
+def _model_reads(state: PhynPlusState) -> tuple[Any, ...]:
+    """Read values from the typed state."""
+    return state.pressure, state.temperature, state.flow, state.sov_status == "Open"
+
+
+def run() -> dict[str, float]:
+    """Run the benchmark and return nanoseconds per operation."""
+    raw: dict[str, Any] = {}
+    model = PhynPlusState()
+    raw.update(UPDATE)
+    model.update(UPDATE)
+
+    timings = {
+        "dict_ingest": timeit.timeit(lambda: raw.update(UPDATE), number=ITERATIONS),
+        "model_ingest": timeit.timeit(lambda: model.update(UPDATE), number=ITERATIONS),
+        "dict_reads": timeit.timeit(lambda: _dict_reads(raw), number=ITERATIONS),
+        "model_reads": timeit.timeit(lambda: _model_reads(model), number=ITERATIONS),
+    }
+    results = {f"{name}_ns": value / ITERATIONS * 1e9 for name, value in timings.items()}
+    for kind in ("dict", "model"):
+        results[f"{kind}_message_ns"] = (
+            results[f"{kind}_ingest_ns"] + READS_PER_MESSAGE * results[f"{kind}_reads_ns"]
+        )
+    return results
+
+
+def main() -> None:
+    """Print the benchmark results."""
+    for name, value in run().items():
+        print(f"{name:20} {value:,.1f}")
+
+
+if __name__ == "__main__":
+    main()
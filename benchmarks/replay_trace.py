@@ -0,0 +1,131 @@
+"""Replay a recorded Phyn trace through the integration.
+
+The integration is set up from a config entry in a test Home Assistant
+instance, backed by ``tests.replay_phyn.ReplayPhynAPI``. Recorded MQTT
+updates are pushed at their original timing divided by ``--speed`` (0 for
+as fast as possible), and the coordinator refreshes every
+``--refresh-interval`` seconds of trace time. Because refreshes follow
+trace time rather than the wall clock, a replay is deterministic at any
+speed. Prints timings, entity writes and the final entity states as JSON.
+Needs the test requirements.
+
+    python -m benchmarks.replay_trace phyn_trace_20240101_120000.jsonl.gz --speed 0
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import tempfile
+import time
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant  # noqa: F401  imported before the loader
+from homeassistant.loader import DATA_CUSTOM_COMPONENTS
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.phyn.const import DOMAIN
+from tests.replay_phyn import ReplayPhynAPI
+
+from .bench_integration import _count_entity_writes, _percentiles
+
+REFRESH_INTERVAL = 60.0
+
+
+async def async_replay(path: Path, speed: float = 1.0, refresh_interval: float = REFRESH_INTERVAL) -> dict[str, Any]:
+    """Replay a trace and return the measurements."""
+    api = ReplayPhynAPI.from_file(path)
+    async with async_test_home_assistant() as hass:
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass.config.config_dir = config_dir
+            hass.data.pop(DATA_CUSTOM_COMPONENTS, None)
+            hass.data["core.uuid"] = "replay"
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={CONF_USERNAME: api.username, CONF_PASSWORD: "password", "Brand": "phyn"},
+                version=1,
+                minor_version=2,
+            )
+            entry.add_to_hass(hass)
+
+            with (
+                patch("custom_components.phyn.async_get_api", AsyncMock(return_value=api)),
+                _count_entity_writes() as writes,
+            ):
+                assert await hass.config_entries.async_setup(entry.entry_id)
+                await hass.async_block_till_done()
+                coordinator = hass.data[DOMAIN]["coordinator"]
+
+                refresh_times: list[float] = []
+                next_refresh = [refresh_interval]
+
+                async def on_time(trace_time: float) -> None:
+                    while trace_time >= next_refresh[0]:
+                        next_refresh[0] += refresh_interval
+                        begin = time.perf_counter()
+                        await coordinator.async_refresh()
+                        refresh_times.append(time.perf_counter() - begin)
+
+                writes[0] = 0
+                message_times: list[float] = []
+                original_push = api.mqtt.push
+
+                async def timed_push(device_id: str, data: dict[str, Any]) -> None:
+                    begin = time.perf_counter()
+                    await original_push(device_id, data)
+                    message_times.append(time.perf_counter() - begin)
+
+                api.mqtt.push = timed_push
+                begin = time.perf_counter()
+                messages = await api.async_replay(speed, on_time)
+                await hass.async_block_till_done()
+                elapsed = time.perf_counter() - begin
+                entity_writes = writes[0]
+                states = {
+                    state.entity_id: state.state
+                    for state in sorted(hass.states.async_all(), key=lambda state: state.entity_id)
+                }
+
+                assert await hass.config_entries.async_unload(entry.entry_id)
+                await hass.async_block_till_done()
+
+    return {
+        "trace": str(path),
+        "trace_duration_s": api.duration,
+        "speed": speed,
+        "replay_s": elapsed,
+        "messages": messages,
+        "mqtt_latency": _percentiles(message_times) if message_times else None,
+        "refreshes": len(refresh_times),
+        "refresh_mean_ms": sum(refresh_times) / len(refresh_times) * 1e3 if refresh_times else None,
+        "entity_writes": entity_writes,
+        "simulated_calls": sorted(set(api.unanswered)),
+        "states": states,
+    }
+
+
+def main() -> None:
+    """Print or write the replay results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", type=Path)
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed factor, 0 for as fast as possible")
+    parser.add_argument("--refresh-interval", type=float, default=REFRESH_INTERVAL, help="trace seconds between refreshes")
+    parser.add_argument("--output", type=Path, help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(async_replay(args.trace, args.speed, args.refresh_interval))
+    output = json.dumps(results, indent=2)
+    if args.output is not None:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 """The phyn integration."""
 import asyncio
+from datetime import datetime
 import logging
 
 from aiophyn import async_get_api
@@ -14,15 +15,24 @@ from homeassistant.exceptions import (
     ConfigEntryNotReady
 )
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_time_interval
 
 from .const import CLIENT, DOMAIN
-from .update_coordinator import PhynDataUpdateCoordinator
+from .debug import CATEGORY_SETUP, DEBUG
+from .options import PhynOptions
+from .update_coordinator import DISCOVERY_INTERVAL, PhynDataUpdateCoordinator
 from .exceptions import HaAuthError, HaCannotConnect
-from .services import phyn_leak_test_service_setup
+from .services import (
+    phyn_get_samples_service_setup,
+    phyn_home_service_setup,
+    phyn_leak_test_service_setup,
+    phyn_profile_service_setup,
+    phyn_record_trace_service_setup,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.BINARY_SENSOR, Platform.SENSOR, Platform.SWITCH, Platform.UPDATE, Platform.VALVE]
+PLATFORMS = [Platform.BINARY_SENSOR, Platform.EVENT, Platform.SENSOR, Platform.SWITCH, Platform.UPDATE, Platform.VALVE]
 
 async def async_migrate_entry(hass, config_entry: ConfigEntry):
     """Migrate old entry."""
@@ -71,15 +81,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     homes = await client.home.get_homes(entry.data[CONF_USERNAME])
 
-    _LOGGER.debug("Phyn homes: %s", homes)
+    DEBUG.event(CATEGORY_SETUP, "Found %s Phyn homes", len(homes), homes=homes)
 
     try:
         await client.mqtt.connect()
 
-        coordinator = PhynDataUpdateCoordinator(hass, client)
+        coordinator = PhynDataUpdateCoordinator(
+            hass, client, options=PhynOptions.from_options(entry.options)
+        )
         for home in homes:
             for device in home["devices"]:
                 coordinator.add_device(home["id"], device["device_id"], device["product_code"])
+        coordinator.add_account(entry.entry_id, entry.data["Brand"])
         hass.data[DOMAIN]["coordinator"] = coordinator
 
         await coordinator.async_refresh()
@@ -87,6 +100,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
         await phyn_leak_test_service_setup(hass)
+        await phyn_get_samples_service_setup(hass)
+        await phyn_home_service_setup(hass)
+        await phyn_record_trace_service_setup(hass)
+        await phyn_profile_service_setup(hass)
+        entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+        async def async_discover_devices(_now: datetime) -> None:
+            await coordinator.async_discover_devices(entry.data[CONF_USERNAME])
+
+        entry.async_on_unload(
+            async_track_time_interval(
+                hass, async_discover_devices, DISCOVERY_INTERVAL, name=f"{DOMAIN} device discovery"
+            )
+        )
 
         return True
     except Exception:
@@ -99,9 +126,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         raise
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running coordinator, without a reload."""
+    hass.data[DOMAIN]["coordinator"].async_apply_options(PhynOptions.from_options(entry.options))
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     client = hass.data[DOMAIN][CLIENT]
+    await hass.data[DOMAIN]["coordinator"].async_stop_trace()
     await client.mqtt.disconnect_and_wait()
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
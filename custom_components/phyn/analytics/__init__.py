@@ -0,0 +1 @@
+"""Local analytics for Phyn realtime data."""
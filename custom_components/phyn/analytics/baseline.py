@@ -0,0 +1,207 @@
+"""Rolling hour-of-week baselines for flow and pressure."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, tzinfo
+import math
+from typing import Any
+
+HOURS_PER_WEEK = 168
+
+DEFAULT_FLOW_THRESHOLD = 0.05
+DEFAULT_MIN_OBSERVATIONS = 3
+DEFAULT_Z_LIMIT = 3.0
+FLOW_STD_FLOOR = 0.05
+PRESSURE_STD_FLOOR = 0.5
+MIN_PRESSURE_DROP = 1.0
+
+
+class HourOfWeekStats:
+    """Welford running mean and variance for each hour of the week."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.count: array[float] = array("d", bytes(8 * HOURS_PER_WEEK))
+        self.mean: array[float] = array("d", bytes(8 * HOURS_PER_WEEK))
+        self.m2: array[float] = array("d", bytes(8 * HOURS_PER_WEEK))
+
+    def update(self, hour: int, value: float) -> None:
+        """Add an observation to an hour bucket."""
+        count = self.count[hour] + 1
+        delta = value - self.mean[hour]
+        mean = self.mean[hour] + delta / count
+        self.count[hour] = count
+        self.mean[hour] = mean
+        self.m2[hour] += delta * (value - mean)
+
+    def std(self, hour: int) -> float:
+        """Return the sample standard deviation of an hour bucket."""
+        count = self.count[hour]
+        if count < 2:
+            return 0.0
+        return math.sqrt(self.m2[hour] / (count - 1))
+
+    def is_outlier(
+        self, hour: int, value: float, std_floor: float, min_observations: int, z_limit: float
+    ) -> bool:
+        """Return True if value is above the learned band of an hour bucket."""
+        if self.count[hour] < min_observations:
+            return False
+        return value > self.mean[hour] + z_limit * max(self.std(hour), std_floor)
+
+    def as_dict(self) -> dict[str, list[float]]:
+        """Return the statistics in a JSON serializable form."""
+        return {
+            "count": self.count.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, list[float]]) -> HourOfWeekStats:
+        """Restore statistics saved by as_dict."""
+        stats = cls()
+        for name in cls.__slots__:
+            values = data.get(name, [])
+            if len(values) == HOURS_PER_WEEK:
+                setattr(stats, name, array("d", values))
+        return stats
+
+
+class BaselineAnomalyDetector:
+    """Online detector for continuous flow and pressure decay.
+
+    Samples are folded into per-hour aggregates in constant time: the lowest
+    flow seen during the hour (non-zero when water never stopped) and the
+    largest pressure drop while no water was flowing. When an hour completes
+    both aggregates are compared with the baseline for that hour of the week,
+    and normal hours are added to the baseline. A bucket needs a few weeks of
+    observations before it can report an anomaly.
+    """
+
+    __slots__ = (
+        "_tz",
+        "_flow_threshold",
+        "_min_observations",
+        "_z_limit",
+        "flow_stats",
+        "pressure_stats",
+        "continuous_flow",
+        "pressure_decay",
+        "_hour",
+        "_hour_end",
+        "_min_flow",
+        "_max_drop",
+        "_last_flow",
+        "_segment_peak",
+    )
+
+    def __init__(
+        self,
+        tz: tzinfo | None = None,
+        flow_threshold: float = DEFAULT_FLOW_THRESHOLD,
+        min_observations: int = DEFAULT_MIN_OBSERVATIONS,
+        z_limit: float = DEFAULT_Z_LIMIT,
+    ) -> None:
+        """Initialize the detector."""
+        self._tz: tzinfo | None = tz
+        self._flow_threshold: float = flow_threshold
+        self._min_observations: int = min_observations
+        self._z_limit: float = z_limit
+        self.flow_stats: HourOfWeekStats = HourOfWeekStats()
+        self.pressure_stats: HourOfWeekStats = HourOfWeekStats()
+        self.continuous_flow: bool = False
+        self.pressure_decay: bool = False
+        self._hour: int = -1
+        self._hour_end: float = 0.0
+        self._min_flow: float = math.inf
+        self._max_drop: float = 0.0
+        self._last_flow: float | None = None
+        self._segment_peak: float | None = None
+
+    def add_sample(
+        self, ts: float, flow: float | None = None, pressure: float | None = None
+    ) -> bool:
+        """Fold a sample into the current hour. Return True if an hour was closed."""
+        closed = self.advance(ts)
+
+        if flow is not None:
+            self._last_flow = flow
+            if flow < self._min_flow:
+                self._min_flow = flow
+            if flow >= self._flow_threshold:
+                self._segment_peak = None
+
+        if pressure is not None and (self._last_flow or 0.0) < self._flow_threshold:
+            if self._segment_peak is None or pressure > self._segment_peak:
+                self._segment_peak = pressure
+            drop = self._segment_peak - pressure
+            if drop > self._max_drop:
+                self._max_drop = drop
+
+        return closed
+
+    def advance(self, ts: float) -> bool:
+        """Close the current hour if ts is past it. Return True if an hour was closed."""
+        if ts < self._hour_end:
+            return False
+
+        closed = self._hour >= 0
+        if closed:
+            self._close_hour()
+
+        local = datetime.fromtimestamp(ts, self._tz)
+        self._hour = local.weekday() * 24 + local.hour
+        self._hour_end = local.replace(minute=0, second=0, microsecond=0).timestamp() + 3600
+        # Flow carries over until the next sample arrives
+        self._min_flow = self._last_flow if self._last_flow is not None else math.inf
+        self._max_drop = 0.0
+        return closed
+
+    def _close_hour(self) -> None:
+        """Evaluate and learn from the hour that just completed."""
+        hour = self._hour
+        continuous_flow = False
+        if self._min_flow != math.inf:
+            continuous_flow = self._min_flow >= self._flow_threshold and self.flow_stats.is_outlier(
+                hour, self._min_flow, FLOW_STD_FLOOR, self._min_observations, self._z_limit
+            )
+            if not continuous_flow:
+                self.flow_stats.update(hour, self._min_flow)
+
+        pressure_decay = self._max_drop >= MIN_PRESSURE_DROP and self.pressure_stats.is_outlier(
+            hour, self._max_drop, PRESSURE_STD_FLOOR, self._min_observations, self._z_limit
+        )
+        if not pressure_decay:
+            self.pressure_stats.update(hour, self._max_drop)
+
+        self.continuous_flow = continuous_flow
+        self.pressure_decay = pressure_decay
+
+    def baseline(self, ts: float) -> dict[str, Any]:
+        """Return the learned baseline for the hour containing ts."""
+        local = datetime.fromtimestamp(ts, self._tz)
+        hour = local.weekday() * 24 + local.hour
+        return {
+            "observations": int(self.flow_stats.count[hour]),
+            "min_flow_mean": round(self.flow_stats.mean[hour], 3),
+            "min_flow_std": round(self.flow_stats.std(hour), 3),
+            "pressure_drop_mean": round(self.pressure_stats.mean[hour], 2),
+            "pressure_drop_std": round(self.pressure_stats.std(hour), 2),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the model state in a JSON serializable form."""
+        return {
+            "flow": self.flow_stats.as_dict(),
+            "pressure": self.pressure_stats.as_dict(),
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Restore model state saved by as_dict."""
+        if "flow" in data:
+            self.flow_stats = HourOfWeekStats.from_dict(data["flow"])
+        if "pressure" in data:
+            self.pressure_stats = HourOfWeekStats.from_dict(data["pressure"])
@@ -0,0 +1,115 @@
+"""Pressure decay analysis for valve-closed periods."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from .samples import SampleRingBuffer
+
+DEFAULT_MIN_SAMPLES = 5
+DEFAULT_MIN_DURATION = 60.0
+REFIT_INTERVAL = 30.0
+
+
+@dataclass(slots=True)
+class DecayFit:
+    """Linear fit of pressure against time for a valve-closed window."""
+
+    rate: float
+    r_squared: float
+    samples: int
+    start: float
+    end: float
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the fit as state attributes."""
+        return {
+            "r_squared": round(self.r_squared, 3),
+            "samples": self.samples,
+            "window_start": self.start,
+            "window_seconds": round(self.end - self.start, 1),
+        }
+
+
+def fit_decay(ts: np.ndarray, pressure: np.ndarray) -> tuple[float, float, int] | None:
+    """Fit pressure = a + b * t by least squares.
+
+    Return the decay rate in psi per minute (positive when pressure falls),
+    the coefficient of determination and the number of samples used.
+    """
+    valid = ~np.isnan(pressure)
+    count = int(valid.sum())
+    if count < 2:
+        return None
+    t = ts[valid]
+    p = pressure[valid]
+    t = t - t.mean()
+    residual_p = p - p.mean()
+    sxx = float(np.dot(t, t))
+    if sxx == 0.0:
+        return None
+    slope = float(np.dot(t, residual_p)) / sxx
+    syy = float(np.dot(residual_p, residual_p))
+    r_squared = 1.0 if syy == 0.0 else slope * slope * sxx / syy
+    return -slope * 60, r_squared, count
+
+
+class PressureDecayAnalyzer:
+    """Fit the pressure decay of each valve-closed window.
+
+    While the valve is closed no water can be drawn through it, so a falling
+    pressure points at a leak downstream. The window is refitted every
+    REFIT_INTERVAL seconds while it lasts and once more when it ends.
+    """
+
+    __slots__ = ("_min_samples", "_min_duration", "_window_start", "_last_fit", "fit")
+
+    def __init__(
+        self,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        min_duration: float = DEFAULT_MIN_DURATION,
+    ) -> None:
+        """Initialize the analyzer."""
+        self._min_samples: int = min_samples
+        self._min_duration: float = min_duration
+        self._window_start: float | None = None
+        self._last_fit: float = 0.0
+        self.fit: DecayFit | None = None
+
+    @property
+    def window_active(self) -> bool:
+        """Return True while a valve-closed window is open."""
+        return self._window_start is not None
+
+    def update(self, ts: float, valve_closed: bool, samples: SampleRingBuffer) -> bool:
+        """Track the valve state. Return True if a new fit was produced."""
+        start = self._window_start
+        if valve_closed:
+            if start is None:
+                self._window_start = ts
+                self._last_fit = ts
+                return False
+            if ts - self._last_fit < REFIT_INTERVAL:
+                return False
+            self._last_fit = ts
+            return self._fit_window(start, ts, samples)
+
+        if start is None:
+            return False
+        self._window_start = None
+        return self._fit_window(start, ts, samples)
+
+    def _fit_window(self, start: float, end: float, samples: SampleRingBuffer) -> bool:
+        """Fit the samples of the window between start and end."""
+        if end - start < self._min_duration:
+            return False
+        ts, _, pressure, _ = samples.window(start)
+        in_window = ts <= end
+        result = fit_decay(ts[in_window], pressure[in_window])
+        if result is None or result[2] < self._min_samples:
+            return False
+        rate, r_squared, count = result
+        self.fit = DecayFit(rate, r_squared, count, start, end)
+        return True
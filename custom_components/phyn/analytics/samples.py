@@ -0,0 +1,107 @@
+"""Fixed-size ring buffer of realtime Phyn samples."""
+from __future__ import annotations
+
+from array import array
+import math
+from typing import Any
+
+import numpy as np
+
+DEFAULT_CAPACITY = 36000
+METRICS = ("flow", "pressure", "temperature")
+
+
+class SampleRingBuffer:
+    """Array-backed ring buffer of flow, pressure and temperature samples.
+
+    Samples are stored column-wise in preallocated ``array('d')`` buffers so
+    ingest never allocates. Missing values are stored as NaN. Reads view the
+    buffers through NumPy without copying until the window is selected.
+    """
+
+    __slots__ = ("_capacity", "_columns", "_head", "_size")
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Initialize the buffer."""
+        self._capacity: int = capacity
+        self._columns: tuple[array[float], ...] = tuple(
+            array("d", [math.nan]) * capacity for _ in range(len(METRICS) + 1)
+        )
+        self._head: int = 0
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored samples."""
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """Return the maximum number of samples kept."""
+        return self._capacity
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the sample columns."""
+        return sum(column.itemsize * len(column) for column in self._columns)
+
+    def append(
+        self,
+        ts: float,
+        flow: float | None = None,
+        pressure: float | None = None,
+        temperature: float | None = None,
+    ) -> None:
+        """Store a sample, overwriting the oldest one when full."""
+        head = self._head
+        ts_col, flow_col, pressure_col, temperature_col = self._columns
+        ts_col[head] = ts
+        flow_col[head] = math.nan if flow is None else flow
+        pressure_col[head] = math.nan if pressure is None else pressure
+        temperature_col[head] = math.nan if temperature is None else temperature
+        self._head = (head + 1) % self._capacity
+        if self._size < self._capacity:
+            self._size += 1
+
+    def window(self, since: float) -> tuple[np.ndarray, ...]:
+        """Return (ts, flow, pressure, temperature) arrays for samples at or after since."""
+        start = (self._head - self._size) % self._capacity
+        columns = []
+        for column in self._columns:
+            data = np.frombuffer(column, dtype=np.float64)
+            if start + self._size <= self._capacity:
+                columns.append(data[start:start + self._size])
+            else:
+                columns.append(np.concatenate((data[start:], data[:self._head])))
+        first = int(np.searchsorted(columns[0], since, side="left"))
+        return tuple(column[first:].copy() for column in columns)
+
+    def downsample(self, since: float, resolution: float) -> dict[str, Any]:
+        """Return min/max/mean of each metric over buckets of resolution seconds."""
+        ts, *values = self.window(since)
+        result: dict[str, Any] = {"ts": []}
+        for name in METRICS:
+            result[name] = {"min": [], "max": [], "mean": []}
+        if ts.size == 0:
+            return result
+
+        buckets = np.floor((ts - since) / resolution).astype(np.int64)
+        starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+        result["ts"] = (since + buckets[starts] * resolution).tolist()
+
+        for name, data in zip(METRICS, values):
+            valid = ~np.isnan(data)
+            counts = np.add.reduceat(valid.astype(np.int64), starts)
+            sums = np.add.reduceat(np.where(valid, data, 0.0), starts)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = sums / counts
+            result[name] = {
+                "min": _to_list(np.fmin.reduceat(data, starts)),
+                "max": _to_list(np.fmax.reduceat(data, starts)),
+                "mean": _to_list(means),
+            }
+        return result
+
+
+def _to_list(data: np.ndarray) -> list[float | None]:
+    """Return a JSON friendly list with NaN mapped to None."""
+    return [None if math.isnan(value) else round(value, 3) for value in data.tolist()]
@@ -0,0 +1,133 @@
+"""Water-use event segmentation for the Phyn flow stream."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_FLOW_THRESHOLD = 0.05
+DEFAULT_MIN_VOLUME = 0.01
+# Realtime flow state reported once water stops flowing
+FLOW_STATE_NO_FLOW = "no_flow"
+
+
+def payload_timestamp(value: dict[str, Any], default: float) -> float:
+    """Return the timestamp of a ``{"v": ..., "ts": ...}`` payload in seconds."""
+    ts = value.get("ts")
+    if not isinstance(ts, (int, float)) or ts <= 0:
+        return default
+    # MQTT payloads carry millisecond epochs
+    if ts > 1e11:
+        return ts / 1000
+    return float(ts)
+
+
+@dataclass(slots=True)
+class WaterUseEvent:
+    """A completed water-use event."""
+
+    start: float
+    end: float
+    peak_gpm: float
+    volume: float
+
+    @property
+    def duration(self) -> float:
+        """Return the event duration in seconds."""
+        return self.end - self.start
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the event as a dict suitable for event data."""
+        return {
+            "start": self.start,
+            "end": self.end,
+            "duration": round(self.duration, 1),
+            "peak_gpm": round(self.peak_gpm, 3),
+            "volume": round(self.volume, 3),
+        }
+
+
+class WaterUseEventDetector:
+    """Incremental state machine splitting flow samples into water-use events.
+
+    Each sample is handled in constant time: while an event is active the
+    volume is integrated with the trapezoidal rule and the peak is tracked,
+    and the event is closed by the first sample below the flow threshold,
+    or when the device reports that water stopped flowing.
+    """
+
+    __slots__ = (
+        "_flow_threshold",
+        "_min_volume",
+        "_active",
+        "_start",
+        "_peak",
+        "_volume",
+        "_last_ts",
+        "_last_gpm",
+    )
+
+    def __init__(
+        self,
+        flow_threshold: float = DEFAULT_FLOW_THRESHOLD,
+        min_volume: float = DEFAULT_MIN_VOLUME,
+    ) -> None:
+        """Initialize the detector."""
+        self._flow_threshold: float = flow_threshold
+        self._min_volume: float = min_volume
+        self._active: bool = False
+        self._start: float = 0.0
+        self._peak: float = 0.0
+        self._volume: float = 0.0
+        self._last_ts: float | None = None
+        self._last_gpm: float = 0.0
+
+    @property
+    def active(self) -> bool:
+        """Return True while water is flowing."""
+        return self._active
+
+    @property
+    def current_volume(self) -> float:
+        """Return the volume of the running event in gallons."""
+        return self._volume if self._active else 0.0
+
+    def add_sample(self, ts: float, gpm: float) -> WaterUseEvent | None:
+        """Feed a flow sample, returning an event when one completes."""
+        last_ts = self._last_ts
+        if last_ts is not None and ts <= last_ts:
+            # Out of order or duplicate sample
+            return None
+
+        if self._active and last_ts is not None:
+            self._volume += (self._last_gpm + gpm) / 2 * (ts - last_ts) / 60
+        self._last_ts = ts
+        self._last_gpm = gpm
+
+        if gpm >= self._flow_threshold:
+            if not self._active:
+                self._active = True
+                self._start = ts
+                self._peak = gpm
+                self._volume = 0.0
+            elif gpm > self._peak:
+                self._peak = gpm
+            return None
+
+        if not self._active:
+            return None
+        return self._close(ts)
+
+    def flow_stopped(self, ts: float) -> WaterUseEvent | None:
+        """Close the running event, as the device stops pushing flow once water stops."""
+        if not self._active:
+            return None
+        if self._last_ts is None or ts > self._last_ts:
+            return self.add_sample(ts, 0.0)
+        return self._close(self._last_ts)
+
+    def _close(self, ts: float) -> WaterUseEvent | None:
+        """End the running event at ts, returning it unless it is too small."""
+        self._active = False
+        if self._volume < self._min_volume:
+            return None
+        return WaterUseEvent(self._start, ts, self._peak, self._volume)
@@ -6,9 +6,11 @@ import voluptuous as vol
 
 from homeassistant import config_entries, core, exceptions
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import DOMAIN, LOGGER
+from .options import PhynOptions, options_schema
 
 BRANDS = ["Phyn", "Kohler"]
 
@@ -48,6 +50,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     MINOR_VERSION = 2
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
+        """Return the options flow."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
         errors = {}
@@ -104,7 +112,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_reconfigure(self, user_input: dict[str, any] | None = None):
         errors = {}
         reconfigure_entry = self._get_reconfigure_entry()
-        LOGGER.debug("Reconfigure entry: %s" % reconfigure_entry)
+        LOGGER.debug("Reconfigure entry: %s", reconfigure_entry.entry_id)
         if user_input is not None:
             try:
                 info = await validate_input(self.hass, user_input)
@@ -130,5 +138,22 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors
         )
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle polling, concurrency and realtime options, applied without a reload."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=options_schema(PhynOptions.from_options(self._entry.options)),
+        )
+
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -6,3 +6,8 @@ LOGGER = logging.getLogger(__package__)
 
 CLIENT = "client"
 DOMAIN = "phyn"
+
+EVENT_WATER_USE = "phyn_water_use"
+EVENT_TYPE_WATER_USE = "water_use"
+
+STORAGE_VERSION = 1
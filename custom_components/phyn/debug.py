@@ -0,0 +1,94 @@
+"""Sampled, structured debug logging.
+
+Debug events belong to a category with a sampling rate, so a stream of
+realtime updates logs one in every few messages instead of every one.
+Payloads are passed as keyword arguments. They are only summarized when
+the record is actually emitted, and each summary is capped in size.
+Sampled out or disabled events cost a level check and a counter increment.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from .const import LOGGER
+
+CATEGORY_COMMAND = "command"
+CATEGORY_MQTT = "mqtt"
+CATEGORY_REFRESH = "refresh"
+CATEGORY_SETUP = "setup"
+
+# Fraction of the debug events of a category that are logged
+DEFAULT_SAMPLE_RATES: dict[str, float] = {
+    CATEGORY_COMMAND: 1.0,
+    CATEGORY_MQTT: 0.05,
+    CATEGORY_REFRESH: 0.2,
+    CATEGORY_SETUP: 1.0,
+}
+# Characters of a payload summary
+MAX_SUMMARY_LENGTH = 300
+
+
+def summarize(value: Any, limit: int = MAX_SUMMARY_LENGTH) -> str:
+    """Return the repr of a value, cut to ``limit`` characters."""
+    text = repr(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}...(+{len(text) - limit} chars)"
+
+
+class _Payload:
+    """Payload fields formatted only when the log record is emitted."""
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: dict[str, Any]) -> None:
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return " ".join(f"{key}={summarize(value)}" for key, value in self.fields.items())
+
+
+class DebugTracer:
+    """Log debug events per category at a sampling rate."""
+
+    def __init__(self, logger: logging.Logger, rates: dict[str, float]) -> None:
+        """Initialize the tracer."""
+        self._logger = logger
+        self._every: dict[str, int] = {}
+        self._seen: dict[str, int] = {}
+        for category, rate in rates.items():
+            self.set_rate(category, rate)
+
+    def set_rate(self, category: str, rate: float) -> None:
+        """Log the given fraction of the events of a category, zero for none."""
+        self._every[category] = round(1 / rate) if rate > 0 else 0
+
+    def rate(self, category: str) -> float:
+        """Return the fraction of the events of a category that are logged."""
+        every = self._every.get(category, 1)
+        return 1 / every if every else 0.0
+
+    def event(self, category: str, message: str, *args: Any, **payload: Any) -> None:
+        """Log a debug event, if it is sampled, with its payload summarized."""
+        if not self._logger.isEnabledFor(logging.DEBUG):
+            return
+        every = self._every.get(category, 1)
+        if not every:
+            return
+        seen = self._seen[category] = self._seen.get(category, 0) + 1
+        if (seen - 1) % every:
+            return
+        if payload:
+            message = f"{message} %s"
+            args = (*args, _Payload(payload))
+        self._logger.debug(
+            f"[%s] {message}",
+            category,
+            *args,
+            extra={"phyn_category": category, "phyn_payload": payload},
+            stacklevel=2,
+        )
+
+
+DEBUG = DebugTracer(LOGGER, DEFAULT_SAMPLE_RATES)
@@ -1 +1,3 @@
-from .pp import PhynDailyUsageSensor, PhynCurrentFlowRateSensor, PhynTemperatureSensor, PhynPressureSensor
+from .pc import PhynClassicDevice
+from .pp import PhynPlusDevice
+from .pw import PhynWaterSensorDevice
@@ -0,0 +1,76 @@
+"""Phyn account with account-wide diagnostic entities."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity import Entity
+
+from ..const import DOMAIN
+from ..entities.base import (
+    DIAGNOSTIC_SENSORS,
+    MQTT_MESSAGES_SENSOR,
+    PhynDiagnosticSensor,
+)
+
+if TYPE_CHECKING:
+    from ..update_coordinator import PhynDataUpdateCoordinator
+
+
+class PhynAccount:
+    """The Phyn account of a config entry.
+
+    It is a service device in the device registry, whose diagnostic sensors
+    cover every device of the account.
+    """
+
+    def __init__(self, coordinator: PhynDataUpdateCoordinator, entry_id: str, brand: str) -> None:
+        """Initialize the account."""
+        self._coordinator: PhynDataUpdateCoordinator = coordinator
+        self._brand: str = brand
+        self.id: str = f"account_{entry_id}"
+        self.entities: list[Entity] = [
+            PhynDiagnosticSensor(self, description)  # type: ignore[arg-type]
+            for description in (*DIAGNOSTIC_SENSORS, MQTT_MESSAGES_SENSOR)
+        ]
+        self._device_info: DeviceInfo = DeviceInfo(
+            identifiers={(DOMAIN, self.id)},
+            entry_type=DeviceEntryType.SERVICE,
+            manufacturer="Phyn",
+            name=f"{brand.capitalize()} account",
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True, the account statistics are always known."""
+        return True
+
+    @property
+    def coordinator(self) -> PhynDataUpdateCoordinator:
+        """Return update coordinator"""
+        return self._coordinator
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return a device description for device registry."""
+        return self._device_info
+
+    @property
+    def refresh_duration(self) -> float | None:
+        """Return the seconds the last refresh of all devices took."""
+        return self._coordinator.metrics.last_duration("refresh")
+
+    @property
+    def api_latency(self) -> float | None:
+        """Return the median seconds of the recent API calls of all devices."""
+        return self._coordinator.metrics.median_latency("device.")
+
+    @property
+    def consecutive_failures(self) -> int:
+        """Return the consecutive failed refreshes."""
+        return self._coordinator.consecutive_failures
+
+    @property
+    def mqtt_messages_per_minute(self) -> float:
+        """Return the recent realtime updates per minute of all devices."""
+        return self._coordinator.metrics.rate("mqtt.update")
@@ -1,17 +1,37 @@
 """ Generic Phyn Device"""
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+from collections.abc import Awaitable, Callable
+from copy import deepcopy
+from dataclasses import asdict, replace
+from typing import TYPE_CHECKING, Any, ClassVar
 import math
 import time
 
-from ..const import LOGGER
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC, DeviceInfo
+from homeassistant.helpers.entity import Entity
+
+from ..const import DOMAIN
+from ..debug import CATEGORY_REFRESH, DEBUG
+from ..options import CONF_POLL_INTERVAL_PHYN_PLUS, POLL_SLACK
+from .state import PhynDeviceState
 
 if TYPE_CHECKING:
     from ..update_coordinator import PhynDataUpdateCoordinator
 
+@callback
+def _async_keep_polling() -> None:
+    """Coordinator listener of device listeners, which are notified per device."""
+
 class PhynDevice:
     """Generic Phyn Device"""
+
+    # Option with the seconds between refreshes of the device class
+    POLL_INTERVAL_OPTION: ClassVar[str] = CONF_POLL_INTERVAL_PHYN_PLUS
+    # Entities of the device, created by each device class
+    entities: list[Entity]
+
     def __init__(
         self,
         coordinator: PhynDataUpdateCoordinator,
@@ -25,34 +45,60 @@ class PhynDevice:
         self._phyn_device_id: str = device_id
         self._product_code: str = product_code
         self._manufacturer: str = "Phyn"
-        self._device_state: dict[str, Any] = {}
+        self._device_state: PhynDeviceState = PhynDeviceState()
         self._device_preferences: dict[str, dict[str, Any]] = {}
-        self._firmware_info: dict[str, Any] = {}
         self._update_count: int = 0
+        # Monotonic time endpoints refreshed less often than the device were last fetched
+        self._endpoint_fetched: dict[str, float] = {}
+        self._device_info: DeviceInfo | None = None
+        self._device_info_key: tuple[str, ...] = ()
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._last_snapshot: tuple[Any, ...] | None = None
     
     @property
     def available(self) -> bool:
         """Return True if device is available."""
-        online_status = self._device_state.get("online_status", {})
-        return online_status.get("v") == "online"
+        return self._device_state.online
     
     @property
     def coordinator(self) -> PhynDataUpdateCoordinator:
         """Return update coordinator"""
         return self._coordinator
 
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device registry description, rebuilt only when it changes."""
+        key = (self.device_name, self.model, self.firmware_version, self.serial_number)
+        if self._device_info is None or key != self._device_info_key:
+            self._device_info_key = key
+            self._device_info = DeviceInfo(
+                identifiers={(DOMAIN, self._phyn_device_id)},
+                manufacturer=self._manufacturer,
+                model=self.model,
+                name=self.device_name.capitalize(),
+                sw_version=self.firmware_version,
+                connections={(CONNECTION_NETWORK_MAC, self._phyn_device_id)},
+                serial_number=self.serial_number
+            )
+        return self._device_info
+
     @property
     def device_name(self) -> str:
         """Return device name."""
         return f"{self.manufacturer} {self.model}"
 
+    @property
+    def _firmware_info(self) -> dict[str, Any]:
+        """Return the latest firmware information of the device's product code."""
+        return self._coordinator.firmware.get(self._product_code)
+
     @property
     def firmware_has_update(self) -> bool | None:
         """Return if the firmware has an update"""
         if "fw_version" not in self._firmware_info:
             return None
         fw_version = self._firmware_info.get("fw_version")
-        device_fw = self._device_state.get("fw_version")
+        device_fw = self._device_state.fw_version
         if fw_version and device_fw:
             return int(fw_version) > int(device_fw)
         return False
@@ -74,7 +120,7 @@ class PhynDevice:
     @property
     def firmware_version(self) -> str:
         """Return the firmware version for the device."""
-        return self._device_state.get("fw_version", "")
+        return self._device_state.fw_version
 
     @property
     def home_id(self) -> str:
@@ -94,36 +140,138 @@ class PhynDevice:
     @property
     def model(self) -> str:
         """Return model for device."""
-        return self._device_state.get("product_code", "")
+        return self._device_state.product_code
+
+    @property
+    def refresh_duration(self) -> float | None:
+        """Return the seconds the last refresh of the device took."""
+        return self._coordinator.metrics.last_duration("refresh.device", self._phyn_device_id)
+
+    @property
+    def api_latency(self) -> float | None:
+        """Return the median seconds of the recent API calls for the device."""
+        return self._coordinator.metrics.median_latency("device.", self._phyn_device_id)
+
+    @property
+    def consecutive_failures(self) -> int:
+        """Return the consecutive refreshes in which the device failed to update."""
+        return self._coordinator.device_failures(self._phyn_device_id)
+
+    @property
+    def product_code(self) -> str:
+        """Return the product code the device was added with."""
+        return self._product_code
 
     @property
     def rssi(self) -> float | None:
         """Return rssi for device."""
-        return self._device_state.get("signal_strength")
+        return self._device_state.signal_strength
 
     @property
     def serial_number(self) -> str:
         """Return the serial number for the device."""
-        return self._device_state.get("serial_number", "")
+        return self._device_state.serial_number
     
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for data updates of this device."""
+        # The coordinator only schedules refreshes while it has listeners
+        remove_coordinator_listener = self._coordinator.async_add_listener(_async_keep_polling)
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            remove_coordinator_listener()
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners of this device.
+
+        Realtime updates call this for every message, so no snapshot is taken
+        here; the one of the last refresh is dropped instead, as the entities
+        no longer render it.
+        """
+        self._last_snapshot = None
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def async_update_listeners_if_changed(self) -> int:
+        """Notify listeners only if the data changed since the last notification.
+
+        Returns the number of skipped listener calls.
+        """
+        snapshot = self.snapshot()
+        if snapshot == self._last_snapshot:
+            return len(self._listeners)
+        self.async_update_listeners()
+        self._last_snapshot = snapshot
+        return 0
+
+    def snapshot(self) -> tuple[Any, ...]:
+        """Return a copy of the data rendered by the device's entities."""
+        return (
+            replace(self._device_state),
+            deepcopy(self._device_preferences),
+            # Replaced, never changed, by the firmware cache
+            self._firmware_info,
+        )
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the current data of the device for diagnostics."""
+        return {
+            "id": self._phyn_device_id,
+            "home_id": self._phyn_home_id,
+            "product_code": self._product_code,
+            "available": self.available,
+            "update_count": self._update_count,
+            "state": asdict(self._device_state),
+            "preferences": deepcopy(self._device_preferences),
+            "firmware": deepcopy(self._firmware_info),
+        }
+
     async def async_setup(self) -> None:
         """Setup the device. Override in subclasses if needed."""
         pass
 
+    async def async_remove(self) -> None:
+        """Release the device after it was removed from the account. Override in subclasses if needed."""
+        pass
+
     async def async_update_data(self) -> None:
         """Update device data. Must be overridden by subclasses."""
         pass
 
+    async def _async_fetch_due(
+        self, endpoint: str, ttl: float, fetch: Callable[[], Awaitable[None]]
+    ) -> None:
+        """Fetch data of an endpoint if it is older than its TTL in seconds."""
+        now = time.monotonic()
+        fetched = self._endpoint_fetched.get(endpoint)
+        if fetched is not None and now - fetched < ttl - POLL_SLACK:
+            return
+        await fetch()
+        self._endpoint_fetched[endpoint] = now
+
     async def _update_firmware_information(self, *_) -> None:
-        self._firmware_info.update(
-            (await self._coordinator.api_client.device.get_latest_firmware_info(self._phyn_device_id))[0]
+        """Update the firmware information of the product code, if older than its TTL."""
+        async def fetch() -> list[dict[str, Any]]:
+            info = await self._coordinator.api_client.device.get_latest_firmware_info(self._phyn_device_id)
+            DEBUG.event(CATEGORY_REFRESH, "Firmware of %s", self._product_code, firmware=info)
+            return info
+
+        await self._coordinator.firmware.async_update(
+            self._product_code, self._coordinator.options.firmware_ttl, fetch
         )
-        LOGGER.debug("%s firmware: %s", self.device_name, self._firmware_info)
 
     async def _update_device_state(self, *_) -> None:
         """Update the device state from the API."""
-        if 'last_updated' not in self._device_state or self._device_state['last_updated'] <= (math.floor(time.time()) - 60):
+        last_updated = self._device_state.last_updated
+        if last_updated is None or last_updated <= (math.floor(time.time()) - 60):
             self._device_state.update(await self._coordinator.api_client.device.get_state( 
                 self._phyn_device_id
             ))
-            self._device_state['last_updated'] = math.floor(time.time())
+            self._device_state.last_updated = math.floor(time.time())
@@ -0,0 +1,79 @@
+"""Debounced batching of device writes."""
+from __future__ import annotations
+
+from asyncio import Future, TimerHandle
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+
+class BatchWriter:
+    """Merge writes made within a short window into a single call.
+
+    The last value written for each key wins. Every caller waits for the
+    shared call and gets its result or exception.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        delay: float,
+        write: Callable[[dict[str, Any]], Awaitable[None]],
+    ) -> None:
+        """Initialize the writer."""
+        self._hass = hass
+        self._name = name
+        self._delay = delay
+        self._write = write
+        self._pending: dict[str, Any] = {}
+        self._waiters: list[Future[None]] = []
+        self._timer: TimerHandle | None = None
+
+    async def async_write(self, key: str, value: Any) -> None:
+        """Queue a write and wait until the batch containing it is written."""
+        self._pending[key] = value
+        future: Future[None] = self._hass.loop.create_future()
+        self._waiters.append(future)
+        if self._timer is None:
+            self._timer = self._hass.loop.call_later(self._delay, self._async_flush)
+        await future
+
+    @callback
+    def async_cancel(self, error: Exception) -> None:
+        """Drop the queued values and fail their waiters with error.
+
+        A batch that is already being written completes as usual.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+        waiters = self._waiters
+        self._pending, self._waiters, self._timer = {}, [], None
+        for future in waiters:
+            if not future.done():
+                future.set_exception(error)
+
+    @callback
+    def _async_flush(self) -> None:
+        """Start writing the queued values."""
+        values, waiters = self._pending, self._waiters
+        self._pending, self._waiters, self._timer = {}, [], None
+        self._hass.async_create_background_task(
+            self._async_write_batch(values, waiters), f"{self._name} batch write"
+        )
+
+    async def _async_write_batch(
+        self, values: dict[str, Any], waiters: list[Future[None]]
+    ) -> None:
+        """Write a batch and resolve its waiters."""
+        try:
+            await self._write(values)
+        except Exception as error:  # pylint: disable=broad-except
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for future in waiters:
+                if not future.done():
+                    future.set_result(None)
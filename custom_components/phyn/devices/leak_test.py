@@ -0,0 +1,129 @@
+"""Leak test progress tracking for Phyn devices."""
+from __future__ import annotations
+
+from asyncio import Future, shield, timeout as async_timeout
+from collections.abc import Awaitable, Callable
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from ..const import LOGGER
+
+LEAK_TEST_STATUS = "LeakExp"
+
+
+class LeakTestTracker:
+    """Follow a started leak test through valve status transitions.
+
+    The test runs while the valve reports ``LeakExp``. When it leaves that
+    status the result is fetched and handed to everyone waiting on the test.
+    A health test that ended after the start also completes the test, in
+    case the polls never saw ``LeakExp``.
+    """
+
+    def __init__(self, hass: HomeAssistant, device_id: str) -> None:
+        """Initialize the tracker."""
+        self._hass = hass
+        self._device_id = device_id
+        self._future: Future[dict[str, Any] | None] | None = None
+        self._fetch_result: Callable[[], Awaitable[dict[str, Any] | None]] | None = None
+        self._running: bool = False
+        # Epoch milliseconds the tracked test was started, as health test end times
+        self._started: float = 0
+        # True while a test was started during an earlier one that is still tracked
+        self._restarted: bool = False
+
+    @property
+    def active(self) -> bool:
+        """Return True while a started test has not completed."""
+        return self._future is not None and not self._future.done()
+
+    @callback
+    def async_start(self, fetch_result: Callable[[], Awaitable[dict[str, Any] | None]]) -> None:
+        """Track a test that is about to be started.
+
+        If an earlier test has not completed yet, its waiters are kept and
+        get the result of the test that ends next.
+        """
+        self._fetch_result = fetch_result
+        if self.active:
+            self._restarted = True
+            return
+        self._future = self._hass.loop.create_future()
+        self._started = time.time() * 1000
+        self._running = False
+        self._restarted = False
+
+    @callback
+    def async_abort(self, error: Exception) -> None:
+        """Stop tracking a test that could not be started.
+
+        An earlier test that is still tracked keeps running for its waiters.
+        """
+        if self._restarted:
+            self._restarted = False
+            return
+        if self._future is not None and not self._future.done():
+            self._future.set_exception(error)
+            # Waiting is optional, so nobody may retrieve the exception
+            self._future.exception()
+        self._future = None
+
+    @callback
+    def async_cancel(self, error: Exception) -> None:
+        """Stop tracking the test and fail everyone waiting on it with error."""
+        self._restarted = False
+        self._running = False
+        if self._future is not None and not self._future.done():
+            self._future.set_exception(error)
+            self._future.exception()
+        self._future = None
+
+    @callback
+    def async_status(self, sov_status: str | None) -> None:
+        """Follow a reported valve status."""
+        if (future := self._future) is None or future.done():
+            return
+        if sov_status == LEAK_TEST_STATUS:
+            self._running = True
+        elif self._running:
+            self._running = False
+            LOGGER.debug("Leak test on %s ended, fetching result", self._device_id)
+            self._hass.async_create_background_task(
+                self._async_complete(future), f"leak test result {self._device_id}"
+            )
+
+    @callback
+    def async_health_test(self, test: dict[str, Any] | None) -> None:
+        """Complete the tracked test with a health test that ended after it was started."""
+        if (future := self._future) is None or future.done():
+            return
+        if test is None or test["end_time"] < self._started:
+            return
+        LOGGER.debug("Health test listed for the leak test on %s", self._device_id)
+        self._running = False
+        future.set_result(test)
+
+    async def async_wait(self, timeout: float) -> dict[str, Any] | None:
+        """Wait for the tracked test and return its result.
+
+        Raises TimeoutError if the test does not complete in time.
+        """
+        if self._future is None:
+            return None
+        async with async_timeout(timeout):
+            return await shield(self._future)
+
+    async def _async_complete(self, future: Future[dict[str, Any] | None]) -> None:
+        """Fetch the result of an ended test and resolve its waiters."""
+        assert self._fetch_result is not None
+        try:
+            result = await self._fetch_result()
+        except Exception as error:  # pylint: disable=broad-except
+            if not future.done():
+                future.set_exception(error)
+                future.exception()
+            return
+        if not future.done():
+            future.set_result(result)
@@ -0,0 +1,94 @@
+"""Optimistic command state for Phyn devices.
+
+Commands are shown with their requested value as soon as they are sent.
+The value stays pending until the cloud reports it, and is rolled back to
+the reported value if that does not happen before its deadline.
+"""
+from __future__ import annotations
+
+from asyncio import TimerHandle
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from ..const import LOGGER
+
+
+@dataclass(slots=True)
+class PendingCommand:
+    """A requested value waiting for confirmation."""
+
+    value: Any
+    timer: TimerHandle
+
+
+class OptimisticState:
+    """Track pending command values of a device."""
+
+    def __init__(self, hass: HomeAssistant, device_id: str, on_change: CALLBACK_TYPE) -> None:
+        """Initialize the optimistic state."""
+        self._hass = hass
+        self._device_id = device_id
+        self._on_change = on_change
+        self._pending: dict[str, PendingCommand] = {}
+
+    def is_pending(self, key: str) -> bool:
+        """Return True if a command for key waits for confirmation."""
+        return key in self._pending
+
+    def value(self, key: str, actual: Any) -> Any:
+        """Return the pending value of key, or the actual value if none is pending."""
+        if (pending := self._pending.get(key)) is not None:
+            return pending.value
+        return actual
+
+    @callback
+    def async_set(self, key: str, value: Any, timeout: float) -> None:
+        """Show value for key until it is confirmed or timeout seconds pass."""
+        if (pending := self._pending.get(key)) is not None:
+            pending.timer.cancel()
+        self._pending[key] = PendingCommand(
+            value, self._hass.loop.call_later(timeout, self._async_expire, key, timeout)
+        )
+        self._on_change()
+
+    @callback
+    def async_confirm(self, key: str, actual: Any) -> bool:
+        """Clear the pending value of key if the actual value matches it."""
+        pending = self._pending.get(key)
+        if pending is None or pending.value != actual:
+            return False
+        del self._pending[key]
+        pending.timer.cancel()
+        return True
+
+    @callback
+    def async_confirm_all(self, actual: Callable[[str], Any]) -> None:
+        """Confirm every pending value that the device now reports."""
+        for key in list(self._pending):
+            self.async_confirm(key, actual(key))
+
+    @callback
+    def async_rollback(self, key: str, reason: str) -> None:
+        """Drop the pending value of key and show the actual value again."""
+        if (pending := self._pending.pop(key, None)) is None:
+            return
+        pending.timer.cancel()
+        LOGGER.error(
+            "Rolling back %s of %s to the reported state: %s", key, self._device_id, reason
+        )
+        self._on_change()
+
+    @callback
+    def async_clear(self) -> None:
+        """Drop every pending value without notifying, for a removed device."""
+        for pending in self._pending.values():
+            pending.timer.cancel()
+        self._pending.clear()
+
+    @callback
+    def _async_expire(self, key: str, timeout: float) -> None:
+        """Roll back a command that was not confirmed in time."""
+        self.async_rollback(key, f"not confirmed within {timeout:g} seconds")
@@ -5,45 +5,82 @@ from typing import TYPE_CHECKING, Any
 from aiophyn.errors import RequestError
 from asyncio import timeout
 
-from homeassistant.components.binary_sensor import (
-    BinarySensorDeviceClass,
-    BinarySensorEntity,
-)
 from homeassistant.components.sensor import (
     SensorDeviceClass,
-    SensorEntity,
     SensorStateClass,
 )
-from homeassistant.components.valve import (
-    ValveDeviceClass,
-    ValveEntity,
-    ValveEntityFeature
-)
 from homeassistant.const import (
     UnitOfPressure,
     UnitOfTemperature,
-    UnitOfVolume,
 )
 
 from homeassistant.helpers.update_coordinator import UpdateFailed
 import homeassistant.util.dt as dt_util
 
-from ..const import LOGGER
+from ..debug import CATEGORY_REFRESH, DEBUG
+from ..options import CONF_POLL_INTERVAL_CLASSIC
 from ..entities.base import (
-    PhynDailyUsageSensor,
-    PhynFirmwareUpdateAvailableSensor,
+    DAILY_USAGE_SENSOR,
+    DIAGNOSTIC_SENSORS,
+    FIRMWARE_UPDATE_AVAILABLE_SENSOR,
+    PhynBinarySensor,
+    PhynBinarySensorEntityDescription,
+    PhynDiagnosticSensor,
     PhynFirwmwareUpdateEntity,
-    PhynTemperatureSensor,
-    PhynPressureSensor,
+    PhynSensor,
+    PhynSensorEntityDescription,
 )
 from .base import PhynDevice
+from .state import PhynClassicState
 
 if TYPE_CHECKING:
     from ..update_coordinator import PhynDataUpdateCoordinator
 
+SENSORS: tuple[PhynSensorEntityDescription, ...] = (
+    DAILY_USAGE_SENSOR,
+    PhynSensorEntityDescription(
+        key="temperature1",
+        name="Average hot water temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: device.temperature1,
+    ),
+    PhynSensorEntityDescription(
+        key="temperature2",
+        name="Average cold water temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: device.temperature2,
+    ),
+    PhynSensorEntityDescription(
+        key="pressure1",
+        name="Average hot water pressure",
+        device_class=SensorDeviceClass.PRESSURE,
+        native_unit_of_measurement=UnitOfPressure.PSI,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: device.current_psi1,
+    ),
+    PhynSensorEntityDescription(
+        key="pressure2",
+        name="Average cold water pressure",
+        device_class=SensorDeviceClass.PRESSURE,
+        native_unit_of_measurement=UnitOfPressure.PSI,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: device.current_psi2,
+    ),
+)
+
+BINARY_SENSORS: tuple[PhynBinarySensorEntityDescription, ...] = (
+    FIRMWARE_UPDATE_AVAILABLE_SENSOR,
+)
+
 class PhynClassicDevice(PhynDevice):
     """Phyn device object."""
 
+    POLL_INTERVAL_OPTION = CONF_POLL_INTERVAL_CLASSIC
+
     def __init__(
         self,
         coordinator: PhynDataUpdateCoordinator,
@@ -53,22 +90,16 @@ class PhynClassicDevice(PhynDevice):
     ) -> None:
         """Initialize the device."""
         super().__init__(coordinator, home_id, device_id, product_code)
-        self._device_state: dict[str, Any] = {
-            "cold_line_num": None,
-            "hot_line_num": None,
-        }
+        self._device_state: PhynClassicState = PhynClassicState()
         self._away_mode: dict[str, Any] = {}
         self._water_usage: dict[str, Any] = {}
         self._last_known_valve_state: bool = True
 
         self.entities = [
-            PhynDailyUsageSensor(self),
-            PhynFirmwareUpdateAvailableSensor(self),
+            *(PhynSensor(self, description) for description in SENSORS),
+            *(PhynBinarySensor(self, description) for description in BINARY_SENSORS),
+            *(PhynDiagnosticSensor(self, description) for description in DIAGNOSTIC_SENSORS),
             PhynFirwmwareUpdateEntity(self),
-            PhynTemperatureSensor(self, "temperature1", "Average hot water temperature", "temperature1"),
-            PhynTemperatureSensor(self, "temperature2", "Average cold water temperature", "temperature2"),
-            PhynPressureSensor(self, "pressure1", "Average hot water pressure", "current_psi1"),
-            PhynPressureSensor(self, "pressure2", "Average cold water pressure", "current_psi2"),
         ]
 
     async def async_update_data(self):
@@ -78,9 +109,7 @@ class PhynClassicDevice(PhynDevice):
                 await self._update_device_state()
                 await self._update_consumption_data()
 
-                #Update every hour
-                if self._update_count % 60 == 0:
-                    await self._update_firmware_information()
+                await self._update_firmware_information()
 
                 self._update_count += 1
         except (RequestError) as error:
@@ -89,7 +118,7 @@ class PhynClassicDevice(PhynDevice):
     @property
     def cold_line_num(self) -> int | None:
         """Return cold line number"""
-        return self._device_state.get('cold_line_num')
+        return self._device_state.cold_line_num
 
     @property
     def consumption_today(self) -> float | None:
@@ -99,53 +128,45 @@ class PhynClassicDevice(PhynDevice):
     @property
     def current_flow_rate(self) -> float | None:
         """Return current flow rate in gpm."""
-        flow = self._device_state.get("flow", {})
-        if "v" not in flow:
-            return None
-        return round(flow["v"], 3)
+        return self._device_state.flow
 
     @property
     def current_psi1(self) -> float:
         """Return the current pressure in psi."""
-        pressure1 = self._device_state.get("pressure1", {})
-        if "v" in pressure1:
-            return round(pressure1["v"], 2)
-        return round(pressure1.get("mean", 0), 2)
+        return self._device_state.pressure1
 
     @property
     def current_psi2(self) -> float:
         """Return the current pressure in psi."""
-        pressure2 = self._device_state.get("pressure2", {})
-        if "v" in pressure2:
-            return round(pressure2["v"], 2)
-        return round(pressure2.get("mean", 0), 2)
+        return self._device_state.pressure2
 
     @property
     def hot_line_num(self) -> int | None:
         """Return hot line number"""
-        return self._device_state.get('hot_line_num')
+        return self._device_state.hot_line_num
 
     @property
     def leak_test_running(self) -> bool:
         """Check if a leak test is running"""
-        sov_status = self._device_state.get("sov_status", {})
-        return sov_status.get("v") == "LeakExp"
+        return self._device_state.sov_status == "LeakExp"
 
     @property
     def temperature1(self) -> float:
         """Return the current temperature in degrees F."""
-        temp1 = self._device_state.get("temperature1", {})
-        if "v" in temp1:
-            return round(temp1["v"], 2)
-        return round(temp1.get("mean", 0), 2)
+        return self._device_state.temperature1
 
     @property
     def temperature2(self) -> float:
         """Return the current temperature in degrees F."""
-        temp2 = self._device_state.get("temperature2", {})
-        if "v" in temp2:
-            return round(temp2["v"], 2)
-        return round(temp2.get("mean", 0), 2)
+        return self._device_state.temperature2
+
+    def snapshot(self) -> tuple[Any, ...]:
+        """Return a copy of the data rendered by the device's entities."""
+        return (*super().snapshot(), dict(self._water_usage))
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the current data of the device for diagnostics."""
+        return {**super().diagnostics(), "water_usage": dict(self._water_usage)}
 
     async def _update_consumption_data(self, *_) -> None:
         """Update water consumption data from the API."""
@@ -154,7 +175,7 @@ class PhynClassicDevice(PhynDevice):
         self._water_usage = await self._coordinator.api_client.device.get_consumption(
             self._phyn_device_id, duration
         )
-        LOGGER.debug("Updated Phyn consumption data: %s", self._water_usage)
+        DEBUG.event(CATEGORY_REFRESH, "Consumption of %s", self._phyn_device_id, consumption=self._water_usage)
 
     async def async_setup(self) -> None:
         """Async setup not needed"""
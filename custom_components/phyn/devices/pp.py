@@ -1,17 +1,15 @@
 """Support for Phyn Plus Water Monitor sensors."""
 from __future__ import annotations
+from collections.abc import Awaitable, Callable
 from typing import TYPE_CHECKING, Any
 
 from aiophyn.errors import RequestError
-from asyncio import Lock, timeout
+from asyncio import Event, Lock, Task, current_task, sleep, timeout
 
-from homeassistant.components.binary_sensor import (
-    BinarySensorDeviceClass,
-    BinarySensorEntity,
-)
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
+from homeassistant.components.event import EventEntity
 from homeassistant.components.sensor import (
     SensorDeviceClass,
-    SensorEntity,
     SensorStateClass,
 )
 from homeassistant.components.valve import (
@@ -20,27 +18,52 @@ from homeassistant.components.valve import (
     ValveEntityFeature
 )
 from homeassistant.const import (
+    EntityCategory,
     UnitOfPressure,
     UnitOfTemperature,
+    UnitOfTime,
     UnitOfVolume,
     UnitOfVolumeFlowRate,
 )
 
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.util.unit_system import US_CUSTOMARY_SYSTEM
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import UpdateFailed
 import homeassistant.util.dt as dt_util
 
-from ..const import LOGGER
+from ..analytics.baseline import BaselineAnomalyDetector
+from ..analytics.decay import PressureDecayAnalyzer
+from ..analytics.samples import SampleRingBuffer
+from ..analytics.water_use import (
+    FLOW_STATE_NO_FLOW,
+    WaterUseEvent,
+    WaterUseEventDetector,
+    payload_timestamp,
+)
+from ..const import DOMAIN, EVENT_TYPE_WATER_USE, EVENT_WATER_USE, LOGGER, STORAGE_VERSION
+from ..debug import CATEGORY_COMMAND, CATEGORY_MQTT, CATEGORY_REFRESH, CATEGORY_SETUP, DEBUG
 from ..entities.base import (
+    DAILY_USAGE_SENSOR,
+    DIAGNOSTIC_SENSORS,
+    FIRMWARE_UPDATE_AVAILABLE_SENSOR,
+    MQTT_DIAGNOSTIC_SENSORS,
+    PhynBinarySensor,
+    PhynBinarySensorEntityDescription,
+    PhynDiagnosticSensor,
     PhynEntity,
-    PhynDailyUsageSensor,
-    PhynFirmwareUpdateAvailableSensor,
     PhynFirwmwareUpdateEntity,
-    PhynPressureSensor,
-    PhynTemperatureSensor,
+    PhynSensor,
+    PhynSensorEntityDescription,
     PhynSwitchEntity
 )
+from ..options import CONF_POLL_INTERVAL_PHYN_PLUS, POLL_SLACK, PhynOptions
+from ..profiler import PROFILE_UPDATE
 from .base import PhynDevice
+from .batch import BatchWriter
+from .leak_test import LeakTestTracker
+from .optimistic import OptimisticState
+from .state import PhynPlusState
 
 import math
 import time
@@ -54,10 +77,175 @@ NAME_DAILY_USAGE = "Daily water usage"
 NAME_FLOW_RATE = "Current water flow rate"
 NAME_WATER_TEMPERATURE = "Current water temperature"
 NAME_WATER_PRESSURE = "Current water pressure"
+CLOSED_VALVE_STATES = ("Close", "Closed", "LeakExp")
+
+# Polling intervals, in seconds, while confirming a valve command
+VALVE_CONFIRM_INITIAL_INTERVAL = 1.0
+VALVE_CONFIRM_MAX_INTERVAL = 8.0
+VALVE_CONFIRM_TIMEOUT = 90.0
+# Seconds past the next poll a switched setting is shown before it rolls back
+COMMAND_CONFIRM_MARGIN = 30.0
+# Seconds preference writes are collected into one request
+PREFERENCE_WRITE_DELAY = 0.25
+# Health test refreshes after a leak test ends, until its result is listed
+LEAK_TEST_RESULT_ATTEMPTS = 5
+LEAK_TEST_RESULT_RETRY = 10.0
+
+# Optimistic command keys, named after the API fields they set
+AUTO_SHUTOFF_KEY = "auto_shutoff_enable"
+AWAY_MODE_KEY = "leak_sensitivity_away_mode"
+SCHEDULER_KEY = "scheduler_enable"
+VALVE_KEY = "valve"
+
+
+def _reading_value(reading: dict[str, Any] | None) -> float | None:
+    """Return the value of a realtime reading, falling back to its mean."""
+    if not reading:
+        return None
+    return reading.get("v", reading.get("mean"))
+
+def _flow_rate(device: PhynPlusDevice) -> float | None:
+    """Return the current flow rate rounded for display."""
+    if device.current_flow_rate is None:
+        return None
+    rate = round(device.current_flow_rate, 1)
+    return 0 if rate == 0 else rate
+
+
+def _health_test_result(device: PhynPlusDevice, key: str) -> bool | None:
+    """Return a flag of the latest health test."""
+    if device.latest_health_test is None:
+        return None
+    return device.latest_health_test.get(key, False)
+
+
+def _health_test_history(device: PhynPlusDevice) -> dict[str, Any]:
+    """Return the health test counts as state attributes."""
+    latest = device.latest_health_test or {}
+    return {
+        **device.health_test_counts,
+        "last_end_time": latest.get("end_time"),
+        "stale": device.health_test_stale,
+    }
+
+
+SENSORS: tuple[PhynSensorEntityDescription, ...] = (
+    DAILY_USAGE_SENSOR,
+    PhynSensorEntityDescription(
+        key="water_flow_state",
+        name="Water Flowing",
+        icon=WATER_ICON,
+        value_fn=lambda device: device.flow_state,
+    ),
+    PhynSensorEntityDescription(
+        key="current_flow_rate",
+        name=NAME_FLOW_RATE,
+        translation_key="current_flow_rate",
+        device_class=SensorDeviceClass.VOLUME_FLOW_RATE,
+        native_unit_of_measurement=UnitOfVolumeFlowRate.GALLONS_PER_MINUTE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_flow_rate,
+    ),
+    PhynSensorEntityDescription(
+        key="consumption",
+        name="Total Water Usage",
+        icon=WATER_ICON,
+        device_class=SensorDeviceClass.WATER,
+        native_unit_of_measurement=UnitOfVolume.GALLONS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda device: device.consumption,
+    ),
+    PhynSensorEntityDescription(
+        key="temperature",
+        name=NAME_WATER_TEMPERATURE,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: round(device.temperature, 1),
+    ),
+    PhynSensorEntityDescription(
+        key="pressure",
+        name=NAME_WATER_PRESSURE,
+        device_class=SensorDeviceClass.PRESSURE,
+        native_unit_of_measurement=UnitOfPressure.PSI,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: round(device.current_psi, 1),
+    ),
+    PhynSensorEntityDescription(
+        key="pressure_decay_rate",
+        name="Estimated leak rate",
+        icon=GAUGE_ICON,
+        native_unit_of_measurement="psi/min",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: (
+            round(device.decay_analyzer.fit.rate, 3) if device.decay_analyzer.fit else None
+        ),
+        attr_fn=lambda device: (
+            device.decay_analyzer.fit.as_dict() if device.decay_analyzer.fit else None
+        ),
+    ),
+    PhynSensorEntityDescription(
+        key="valve_command_latency",
+        name="Valve command latency",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda device: device.valve_command_latency,
+        attr_fn=lambda device: device.valve_confirmation,
+    ),
+    PhynSensorEntityDescription(
+        key="leak_test_history",
+        name="Leak Test History",
+        icon="mdi:clipboard-list-outline",
+        value_fn=lambda device: sum(device.health_test_counts.values()),
+        attr_fn=_health_test_history,
+    ),
+)
+
+BINARY_SENSORS: tuple[PhynBinarySensorEntityDescription, ...] = (
+    FIRMWARE_UPDATE_AVAILABLE_SENSOR,
+    PhynBinarySensorEntityDescription(
+        key="continuous_flow_anomaly",
+        name="Continuous Flow Anomaly",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda device: device.anomaly_detector.continuous_flow,
+        attr_fn=lambda device: device.anomaly_detector.baseline(time.time()),
+    ),
+    PhynBinarySensorEntityDescription(
+        key="pressure_decay_anomaly",
+        name="Pressure Decay Anomaly",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda device: device.anomaly_detector.pressure_decay,
+        attr_fn=lambda device: device.anomaly_detector.baseline(time.time()),
+    ),
+    PhynBinarySensorEntityDescription(
+        key="leak_test_running",
+        name="Leak Test Running",
+        device_class=BinarySensorDeviceClass.RUNNING,
+        value_fn=lambda device: device.leak_test_running,
+    ),
+    PhynBinarySensorEntityDescription(
+        key="leak_test_warning",
+        name="Leak Test Warning",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda device: _health_test_result(device, "is_warn"),
+        attr_fn=lambda device: {"stale": device.health_test_stale},
+    ),
+    PhynBinarySensorEntityDescription(
+        key="leak_test_leak",
+        name="Leak Detected",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda device: _health_test_result(device, "is_leak"),
+        attr_fn=lambda device: {"stale": device.health_test_stale},
+    ),
+)
 
 class PhynPlusDevice(PhynDevice):
     """Phyn device object."""
 
+    POLL_INTERVAL_OPTION = CONF_POLL_INTERVAL_PHYN_PLUS
+
     def __init__(
         self,
         coordinator: PhynDataUpdateCoordinator,
@@ -67,36 +255,62 @@ class PhynPlusDevice(PhynDevice):
     ) -> None:
         """Initialize the device."""
         super().__init__(coordinator, home_id, device_id, product_code)
-        self._device_state: dict[str, Any] = {
-            "flow_state": {
-                "v": 0.0,
-                "ts": 0,
-            }
-        }
+        self._device_state: PhynPlusState = PhynPlusState()
         self._auto_shutoff: dict[str, Any] = {}
         self._away_mode: dict[str, Any] = {}
         self._water_usage: dict[str, Any] = {}
         self._last_known_valve_state: bool = True
+        self._valve_target: bool | None = None
+        self._valve_confirmed: Event = Event()
+        self._valve_confirm_task: Task[None] | None = None
+        self._valve_confirmation: dict[str, Any] | None = None
+        self._optimistic: OptimisticState = OptimisticState(
+            coordinator.hass, device_id, self.async_update_listeners
+        )
+        self._leak_test_tracker: LeakTestTracker = LeakTestTracker(coordinator.hass, device_id)
+        self._preference_writer: BatchWriter = BatchWriter(
+            coordinator.hass,
+            f"{DOMAIN} {device_id} preferences",
+            PREFERENCE_WRITE_DELAY,
+            self._async_write_preferences,
+        )
         self._latest_health_test: dict[str, Any] | None = None
+        self._health_test_counts: dict[str, int] = {"pass": 0, "warn": 0, "leak": 0}
+        self._health_test_stale: bool = False
+        self._health_test_store: Store[dict[str, Any]] = Store(
+            coordinator.hass, STORAGE_VERSION, f"{DOMAIN}.{device_id}.health_tests"
+        )
         self._rt_device_state: dict[str, Any] = {}
+        self._mqtt_message_age: float | None = None
+        # Flow, pressure and temperature of the last realtime entity write
+        self._written_readings: tuple[float | None, float | None, float | None] | None = None
+        self.skipped_realtime_writes: int = 0
+        self._removed: bool = False
         self._state_lock: Lock = Lock()
+        self._water_use_detector: WaterUseEventDetector = WaterUseEventDetector()
+        self._water_use_listeners: list[Callable[[WaterUseEvent], None]] = []
+        self._anomaly_detector: BaselineAnomalyDetector = BaselineAnomalyDetector(
+            dt_util.DEFAULT_TIME_ZONE
+        )
+        self._samples: SampleRingBuffer = SampleRingBuffer()
+        self._decay_analyzer: PressureDecayAnalyzer = PressureDecayAnalyzer()
+        self._baseline_store: Store[dict[str, Any]] = Store(
+            coordinator.hass, STORAGE_VERSION, f"{DOMAIN}.{device_id}.baseline"
+        )
 
         self.entities = [
+            *(PhynSensor(self, description) for description in SENSORS),
+            *(PhynBinarySensor(self, description) for description in BINARY_SENSORS),
+            *(
+                PhynDiagnosticSensor(self, description)
+                for description in (*DIAGNOSTIC_SENSORS, *MQTT_DIAGNOSTIC_SENSORS)
+            ),
             PhynAutoShutoffModeSwitch(self),
             PhynAwayModeSwitch(self),
-            PhynFlowState(self),
-            PhynDailyUsageSensor(self),
-            PhynCurrentFlowRateSensor(self),
-            PhynConsumptionSensor(self),
-            PhynFirmwareUpdateAvailableSensor(self),
             PhynFirwmwareUpdateEntity(self),
-            PhynLeakTestLeakDetected(self),
-            PhynLeakTestSensor(self),
-            PhynLeakTestWarning(self),
             PhynScheduledLeakTestEnabledSwitch(self),
-            PhynTemperatureSensor(self, "temperature", NAME_WATER_TEMPERATURE),
-            PhynPressureSensor(self, "pressure", NAME_WATER_PRESSURE),
             PhynValve(self),
+            PhynWaterUseEventEntity(self),
         ]
 
     async def async_update_data(self):
@@ -104,17 +318,23 @@ class PhynPlusDevice(PhynDevice):
         try:
             async with timeout(20):
                 await self._update_device_state()
+                self._leak_test_tracker.async_status(self._device_state.sov_status)
                 await self._update_autoshutoff()
                 await self._update_device_preferences()
                 await self._update_consumption_data()
 
-                #Update every 10 minutes
-                if self._update_count % 10 == 0:
-                    await self._update_device_health_tests()
+                options = self._coordinator.options
+                # A started leak test may only show up in the health tests
+                health_test_ttl = 0 if self._leak_test_tracker.active else options.health_test_ttl
+                await self._async_fetch_due(
+                    "health_tests", health_test_ttl, self._update_device_health_tests
+                )
+                await self._update_firmware_information()
+
+                if options.analytics and self._anomaly_detector.advance(time.time()):
+                    self._async_save_baseline()
 
-                #Update every hour
-                if (self._update_count % 60 == 0):
-                    await self._update_firmware_information()
+                self._optimistic.async_confirm_all(self._reported_value)
                 
                 self._update_count += 1
         except (RequestError) as error:
@@ -125,7 +345,7 @@ class PhynPlusDevice(PhynDevice):
         """Return the current consumption for today in gallons."""
         if "consumption" not in self._rt_device_state:
             return None
-        return self._device_state.get("consumption")
+        return self._device_state.consumption
 
     @property
     def consumption_today(self) -> float | None:
@@ -135,129 +355,189 @@ class PhynPlusDevice(PhynDevice):
     @property
     def current_flow_rate(self) -> float | None:
         """Return current flow rate in gpm."""
-        flow = self._device_state.get("flow", {})
-        if "v" not in flow:
-            return None
-        return round(flow["v"], 3)
+        return self._device_state.flow
+
+    @property
+    def flow_state(self) -> str | None:
+        """Return the realtime flow state."""
+        if "flow_state" in self._rt_device_state:
+            return self._rt_device_state['flow_state']['v']
+        return None
 
     @property
     def current_psi(self) -> float:
         """Return the current pressure in psi."""
-        pressure = self._device_state.get("pressure", {})
-        if "v" in pressure:
-            return round(pressure["v"], 2)
-        return round(pressure.get("mean", 0), 2)
+        return self._device_state.pressure
 
     @property
     def leak_test_running(self) -> bool:
         """Check if a leak test is running"""
-        sov_status = self._device_state.get("sov_status", {})
-        return sov_status.get("v") == "LeakExp"
+        return self._device_state.sov_status == "LeakExp"
 
     @property
     def temperature(self) -> float:
         """Return the current temperature in degrees F."""
-        temp = self._device_state.get("temperature", {})
-        if "v" in temp:
-            return round(temp["v"], 2)
-        return round(temp.get("mean", 0), 2)
+        return self._device_state.temperature
 
     @property
     def scheduled_leak_test_enabled(self) -> bool | None:
         """Return if the scheduled leak test is enabled"""
-        if "scheduler_enable" not in self._device_preferences:
-            return None
-        scheduler = self._device_preferences.get("scheduler_enable", {})
-        return scheduler.get("value") == "true"
+        return self._optimistic.value(SCHEDULER_KEY, self._reported_value(SCHEDULER_KEY))
 
 
     @property
     def valve_open(self) -> bool:
         """Return the valve state for the device."""
         if self.valve_changing:
-            return self._last_known_valve_state
-        sov_status = self._device_state.get("sov_status", {})
-        return sov_status.get("v") == "Open"
+            valve_open = self._last_known_valve_state
+        else:
+            valve_open = self._device_state.sov_status == "Open"
+        return self._optimistic.value(VALVE_KEY, valve_open)
+
+    @property
+    def valve_command_pending(self) -> bool:
+        """Return True while a valve command waits for confirmation."""
+        return self._optimistic.is_pending(VALVE_KEY)
+
+    @property
+    def valve_closed(self) -> bool:
+        """Return True if the valve is fully closed, including during leak tests."""
+        return self._device_state.sov_status in CLOSED_VALVE_STATES
 
     @property
     def valve_changing(self) -> bool:
         """Return the valve changing status"""
-        sov_status = self._device_state.get("sov_status", {})
-        return sov_status.get("v") == "Partial"
+        return self._device_state.sov_status == "Partial"
 
-    async def async_setup(self) -> str:  # type: ignore[override]
+    async def async_setup(self) -> str | None:  # type: ignore[override]
         """Setup a new device coordinator"""
-        LOGGER.debug("Setting up coordinator")
+        DEBUG.event(CATEGORY_SETUP, "Subscribing to realtime updates of %s", self._phyn_device_id)
+
+        if (baseline := await self._baseline_store.async_load()) is not None:
+            self._anomaly_detector.restore(baseline)
+        if (health_tests := await self._health_test_store.async_load()) is not None:
+            self._latest_health_test = health_tests.get("latest")
+            self._health_test_counts.update(health_tests.get("counts", {}))
 
         await self._coordinator.api_client.mqtt.add_event_handler("update", self.on_device_update)
         await self._coordinator.api_client.mqtt.subscribe(f"prd/app_subscriptions/{self._phyn_device_id}")
-        return self._device_state["sov_status"]["v"]
+        return self._device_state.sov_status
+
+    async def async_remove(self) -> None:
+        """Stop the realtime updates and pending work of a removed device."""
+        self._removed = True
+        if self._valve_confirm_task is not None:
+            self._valve_confirm_task.cancel()
+        error = RuntimeError(f"Device {self._phyn_device_id} was removed")
+        self._leak_test_tracker.async_cancel(error)
+        self._preference_writer.async_cancel(error)
+        self._optimistic.async_clear()
+        # aiophyn can neither unsubscribe nor remove handlers, so the topic is dropped
+        # from those restored on reconnect, every copy as each resubscribe appends
+        # one, and unsubscribed on the MQTT client directly
+        mqtt = self._coordinator.api_client.mqtt
+        topic = f"prd/app_subscriptions/{self._phyn_device_id}"
+        mqtt.topics[:] = [subscribed for subscribed in mqtt.topics if subscribed != topic]
+        if (client := getattr(mqtt, "client", None)) is not None:
+            client.unsubscribe(topic)
     
     @property
     def autoshutoff_enabled(self) -> bool | None:
         """Return True if auto shutoff enabled"""
-        if "auto_shutoff_enable" not in self._auto_shutoff:
-            return None
-        return self._auto_shutoff["auto_shutoff_enable"] == True
+        return self._optimistic.value(AUTO_SHUTOFF_KEY, self._reported_value(AUTO_SHUTOFF_KEY))
     
     async def set_autoshutoff_enabled(self, state: bool) -> None:
-        LOGGER.debug("Setting auto shutoff state: %s" % state)
-        await self._coordinator.api_client.device.set_autoshutoff_enabled(self._phyn_device_id, state)
-        self._auto_shutoff["auto_shutoff_enable"] = state
+        DEBUG.event(CATEGORY_COMMAND, "Setting auto shutoff of %s", self._phyn_device_id, state=state)
+        self._optimistic.async_set(AUTO_SHUTOFF_KEY, state, self._command_confirm_timeout())
+        try:
+            await self._coordinator.api_client.device.set_autoshutoff_enabled(self._phyn_device_id, state)
+        except Exception as error:
+            self._optimistic.async_rollback(AUTO_SHUTOFF_KEY, str(error))
+            raise
+        await self._async_confirm_commands(self._update_autoshutoff)
 
     @property
     def away_mode(self) -> bool | None:
         """Return True if device is in away mode."""
-        if "leak_sensitivity_away_mode" not in self._device_preferences:
-            return None
-        return self._device_preferences["leak_sensitivity_away_mode"]["value"] == "true"
+        return self._optimistic.value(AWAY_MODE_KEY, self._reported_value(AWAY_MODE_KEY))
 
-    async def set_device_preference(self, name: str, val: bool) -> None:
-        """Set Device Preference"""
-        if name not in ["leak_sensitivity_away_mode", "scheduler_enable"]:
+    async def set_device_preference(self, name: str, val: str) -> None:
+        """Set a device preference to "true" or "false"."""
+        if name not in [AWAY_MODE_KEY, SCHEDULER_KEY]:
             LOGGER.debug("Tried setting preference for %s but not avialable", name)
             return None
         if val not in ["true", "false"]:
             return None
-        params = [{
-            "device_id": self._phyn_device_id,
-            "name": name,
-            "value": val
-        }]
-        LOGGER.debug("Setting preference '%s' to '%s'", name, val)
+        DEBUG.event(CATEGORY_COMMAND, "Setting preference of %s", self._phyn_device_id, name=name, value=val)
+        self._optimistic.async_set(name, val == "true", self._command_confirm_timeout())
+        try:
+            await self._preference_writer.async_write(name, val)
+        except Exception as error:
+            self._optimistic.async_rollback(name, str(error))
+            raise
+
+    async def _async_write_preferences(self, values: dict[str, str]) -> None:
+        """Write a batch of preferences in one request and read them back."""
+        params = [
+            {"device_id": self._phyn_device_id, "name": name, "value": val}
+            for name, val in values.items()
+        ]
+        DEBUG.event(CATEGORY_COMMAND, "Writing preferences of %s", self._phyn_device_id, params=params)
         await self._coordinator.api_client.device.set_device_preferences(self._phyn_device_id, params)
-        if name not in self._device_preferences:
-            self._device_preferences[name] = {}
-        self._device_preferences[name]["value"] = val
+        await self._async_confirm_commands(self._update_device_preferences)
     
     async def set_away_mode(self, state: bool) -> None:
         """Manually set away mode value"""
-        key = "leak_sensitivity_away_mode"
-        val = "true" if state else "false"
-        params = [{
-            "device_id": self._phyn_device_id,
-            "name": key,
-            "value": val
-        }]
-        await self._coordinator.api_client.device.set_device_preferences(self._phyn_device_id, params)
-        self._device_preferences[key]["value"] = val
+        await self.set_device_preference(AWAY_MODE_KEY, "true" if state else "false")
 
     async def set_scheduler_enabled(self, state: bool) -> None:
         """Manually set the scheduler enabled mode"""
-        key = "scheduler_enable"
-        val = "true" if state else "false"
-        params = [{
-            "device_id": self._phyn_device_id,
-            "name": key,
-            "value": val
-        }]
-        await self._coordinator.api_client.device.set_device_preferences(self._phyn_device_id, params)
-        self._device_preferences[key]["value"] = val
+        await self.set_device_preference(SCHEDULER_KEY, "true" if state else "false")
+
+    def _reported_value(self, key: str) -> bool | None:
+        """Return the value the cloud reports for an optimistic command key."""
+        if key == VALVE_KEY:
+            if self.valve_changing:
+                return None
+            return self._device_state.sov_status == "Open"
+        if key == AUTO_SHUTOFF_KEY:
+            if key not in self._auto_shutoff:
+                return None
+            return self._auto_shutoff[key] == True
+        if key not in self._device_preferences:
+            return None
+        return self._device_preferences[key].get("value") == "true"
+
+    def _command_confirm_timeout(self) -> float:
+        """Return the seconds a command is shown optimistically, covering the next poll.
+
+        The poll interval is configurable, so the deadline is taken when the
+        command is issued.
+        """
+        return (
+            getattr(self._coordinator.options, self.POLL_INTERVAL_OPTION)
+            + POLL_SLACK
+            + COMMAND_CONFIRM_MARGIN
+        )
+
+    async def _async_confirm_commands(self, read_back: Callable[[], Awaitable[None]]) -> None:
+        """Read back state after a command and confirm the pending values it reports.
+
+        Values that are not reported yet stay pending until a later poll or
+        their deadline.
+        """
+        try:
+            await read_back()
+        except RequestError as error:
+            LOGGER.debug("Error reading back %s after a command: %s", self._phyn_device_id, error)
+            return
+        self._optimistic.async_confirm_all(self._reported_value)
+        self.async_update_listeners()
     
     async def _update_autoshutoff(self, *_) -> None:
         """Update auto shutoff status"""
         data = await self._coordinator.api_client.device.get_autoshuftoff_status(self._phyn_device_id)
-        LOGGER.debug("Autoshutoff info: %s" % data)
+        DEBUG.event(CATEGORY_REFRESH, "Auto shutoff of %s", self._phyn_device_id, data=data)
         self._auto_shutoff.update(data)
     
     async def _update_away_mode(self, *_) -> None:
@@ -271,7 +551,7 @@ class PhynPlusDevice(PhynDevice):
         data = await self._coordinator.api_client.device.get_device_preferences(self._phyn_device_id)
         for item in data:
             self._device_preferences.update({item['name']: item})
-        #LOGGER.debug("Device Preferences: %s", self._device_preferences)
+        DEBUG.event(CATEGORY_REFRESH, "Preferences of %s", self._phyn_device_id, preferences=data)
 
     async def _update_consumption_data(self, *_) -> None:
         """Update water consumption data from the API."""
@@ -280,71 +560,394 @@ class PhynPlusDevice(PhynDevice):
         self._water_usage = await self._coordinator.api_client.device.get_consumption(
             self._phyn_device_id, duration
         )
-        LOGGER.debug("Updated Phyn consumption data: %s", self._water_usage)
+        DEBUG.event(CATEGORY_REFRESH, "Consumption of %s", self._phyn_device_id, consumption=self._water_usage)
     
+    @property
+    def latest_health_test(self) -> dict[str, Any] | None:
+        """Return the most recent health test."""
+        return self._latest_health_test
+
+    @property
+    def health_test_counts(self) -> dict[str, int]:
+        """Return the number of passed, warning and leak health tests."""
+        return self._health_test_counts
+
+    @property
+    def health_test_stale(self) -> bool:
+        """Return True if the cached health test could not be refreshed."""
+        return self._health_test_stale
+
+    async def async_run_leak_test(self, extended: bool = False) -> dict[str, Any]:
+        """Start a leak test, track its progress and return the API response."""
+        DEBUG.event(CATEGORY_COMMAND, "Running leak test on %s", self._phyn_device_id, extended=extended)
+        previous = self._latest_health_test
+        self._leak_test_tracker.async_start(lambda: self._async_fetch_leak_test_result(previous))
+        try:
+            result = await self._coordinator.api_client.device.run_leak_test(
+                self._phyn_device_id, extended
+            )
+        except Exception as error:
+            self._leak_test_tracker.async_abort(error)
+            raise
+        if result.get("code") != "success":
+            self._leak_test_tracker.async_abort(RuntimeError(str(result)))
+        return result
+
+    async def async_wait_leak_test(self, timeout: float) -> dict[str, Any] | None:
+        """Wait for the started leak test to complete and return its health test.
+
+        Raises TimeoutError if it does not complete in time.
+        """
+        return await self._leak_test_tracker.async_wait(timeout)
+
+    async def _async_fetch_leak_test_result(
+        self, previous: dict[str, Any] | None
+    ) -> dict[str, Any] | None:
+        """Refresh the health tests until the one after previous is listed."""
+        for attempt in range(LEAK_TEST_RESULT_ATTEMPTS):
+            if attempt:
+                await sleep(LEAK_TEST_RESULT_RETRY)
+            await self._update_device_health_tests()
+            if self._latest_health_test is not None and self._latest_health_test != previous:
+                self.async_update_listeners()
+                return self._latest_health_test
+        LOGGER.warning("No health test result listed for the leak test on %s", self._phyn_device_id)
+        return None
+
     async def _update_device_health_tests(self, *_) -> None:
-        """Update the latest health test"""
+        """Update the latest health test.
+
+        The API always returns the full list, so only tests newer than the
+        cached one are processed. On errors the cached test is kept and
+        marked stale.
+        """
         try: 
             data = await self._coordinator.api_client.device.get_health_tests(self._phyn_device_id)
         except Exception as error:
-            LOGGER.error("Error getting health tests: %s" % error)
-            self._latest_health_test = None
+            LOGGER.error("Error getting health tests: %s", error)
+            self._health_test_stale = True
             return
-        latest_test = None
-        LOGGER.debug("Health data: %s" % data)
+        self._health_test_stale = False
+
+        latest_test = self._latest_health_test
+        cached_end = latest_test['end_time'] if latest_test is not None else None
+        new_tests = 0
         for test in data['data']:
+            if cached_end is not None and test['end_time'] <= cached_end:
+                continue
+            new_tests += 1
+            if test.get('is_leak'):
+                self._health_test_counts["leak"] += 1
+            elif test.get('is_warn'):
+                self._health_test_counts["warn"] += 1
+            else:
+                self._health_test_counts["pass"] += 1
             if latest_test is None or latest_test['end_time'] < test['end_time']:
                 latest_test = test
-        
-        self._latest_health_test = latest_test        
+        LOGGER.debug("Health tests for %s: %s new", self._phyn_device_id, new_tests)
+
+        if new_tests:
+            self._latest_health_test = latest_test
+            self._health_test_store.async_delay_save(self._health_test_data, 10)
+            self._leak_test_tracker.async_health_test(latest_test)
+
+    def _health_test_data(self) -> dict[str, Any]:
+        """Return the cached health test data to persist."""
+        return {
+            "latest": self._latest_health_test,
+            "counts": self._health_test_counts,
+        }
+
+    @property
+    def valve_command_latency(self) -> float | None:
+        """Return the seconds the last valve command took to be confirmed."""
+        if self._valve_confirmation is None:
+            return None
+        return self._valve_confirmation["latency"]
+
+    @property
+    def mqtt_message_age(self) -> float | None:
+        """Return the seconds between the reading and the receipt of the last realtime update."""
+        return self._mqtt_message_age
+
+    @property
+    def mqtt_messages_per_minute(self) -> float:
+        """Return the recent realtime updates per minute."""
+        return self._coordinator.metrics.rate("mqtt.update", self._phyn_device_id)
+
+    @property
+    def valve_confirmation(self) -> dict[str, Any] | None:
+        """Return how the last valve command was confirmed."""
+        return self._valve_confirmation
+
+    def _valve_at_target(self, open_valve: bool) -> bool:
+        """Return True if the valve settled in the requested position."""
+        sov_status = self._device_state.sov_status
+        if open_valve:
+            return sov_status == "Open"
+        return sov_status in ("Close", "Closed")
+
+    async def async_set_valve(self, open_valve: bool) -> None:
+        """Open or close the valve and confirm the new position in the background."""
+        self._optimistic.async_set(VALVE_KEY, open_valve, VALVE_CONFIRM_TIMEOUT)
+        try:
+            if open_valve:
+                await self._coordinator.api_client.device.open_valve(self._phyn_device_id)
+            else:
+                await self._coordinator.api_client.device.close_valve(self._phyn_device_id)
+        except Exception as error:
+            self._optimistic.async_rollback(VALVE_KEY, str(error))
+            raise
+
+        if self._valve_confirm_task is not None:
+            self._valve_confirm_task.cancel()
+        self._valve_target = open_valve
+        self._valve_confirmed = Event()
+        self._valve_confirm_task = self._coordinator.hass.async_create_background_task(
+            self._async_confirm_valve(open_valve, time.monotonic()),
+            f"{DOMAIN} valve confirmation {self._phyn_device_id}",
+        )
+
+    async def _async_confirm_valve(self, open_valve: bool, started: float) -> None:
+        """Poll the device state in growing intervals until the valve settles.
+
+        MQTT updates that reach the target end the burst early. The time from
+        command to confirmation is kept for the valve command latency sensor.
+        """
+        interval = VALVE_CONFIRM_INITIAL_INTERVAL
+        deadline = started + VALVE_CONFIRM_TIMEOUT
+        confirmed_by: str | None = None
+        try:
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    async with timeout(min(interval, remaining)):
+                        await self._valve_confirmed.wait()
+                    confirmed_by = "mqtt"
+                    break
+                except TimeoutError:
+                    pass
+                try:
+                    await self._update_device_state(force=True)
+                except RequestError as error:
+                    LOGGER.debug("Error polling valve state of %s: %s", self._phyn_device_id, error)
+                else:
+                    if self._valve_at_target(open_valve):
+                        confirmed_by = "poll"
+                        break
+                interval = min(interval * 2, VALVE_CONFIRM_MAX_INTERVAL)
+        finally:
+            # A newer command cancels this burst and already set its own target and task
+            if self._valve_confirm_task is current_task():
+                self._valve_target = None
+                self._valve_confirm_task = None
+
+        latency = time.monotonic() - started
+        if confirmed_by is None:
+            self._optimistic.async_rollback(
+                VALVE_KEY,
+                f"valve did not report {'open' if open_valve else 'closed'} "
+                f"within {VALVE_CONFIRM_TIMEOUT:g} seconds",
+            )
+        else:
+            self._optimistic.async_confirm(VALVE_KEY, open_valve)
+        self._valve_confirmation = {
+            "target": "open" if open_valve else "closed",
+            "confirmed_by": confirmed_by,
+            "latency": round(latency, 2) if confirmed_by is not None else None,
+        }
+        self.async_update_listeners()
+
+    def snapshot(self) -> tuple[Any, ...]:
+        """Return a copy of the data rendered by the device's entities."""
+        fit = self._decay_analyzer.fit
+        return (
+            *super().snapshot(),
+            dict(self._auto_shutoff),
+            dict(self._water_usage),
+            self._latest_health_test,
+            dict(self._health_test_counts),
+            self._health_test_stale,
+            self._last_known_valve_state,
+            self.flow_state,
+            self.consumption,
+            self._anomaly_detector.baseline(time.time()),
+            fit.as_dict() if fit is not None else None,
+        )
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the current data of the device for diagnostics."""
+        return {
+            **super().diagnostics(),
+            "realtime": self._rt_device_state,
+            "auto_shutoff": dict(self._auto_shutoff),
+            "water_usage": dict(self._water_usage),
+            "valve_command_pending": self.valve_command_pending,
+            "valve_confirmation": self._valve_confirmation,
+            "leak_test_active": self._leak_test_tracker.active,
+            "latest_health_test": self._latest_health_test,
+            "health_test_counts": dict(self._health_test_counts),
+            "samples": len(self._samples),
+        }
+
+    @callback
+    def async_add_water_use_listener(
+        self, listener: Callable[[WaterUseEvent], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for completed water-use events."""
+        self._water_use_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._water_use_listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _async_process_water_use(self, data: dict[str, Any], now: float) -> None:
+        """Feed the realtime flow sample and flow state to the water-use detector."""
+        event = None
+        if "v" in (flow := data.get("flow", {})):
+            event = self._water_use_detector.add_sample(payload_timestamp(flow, now), flow["v"])
+        if event is None and (flow_state := data.get("flow_state", {})).get("v") == FLOW_STATE_NO_FLOW:
+            event = self._water_use_detector.flow_stopped(payload_timestamp(flow_state, now))
+        if event is None:
+            return
+
+        LOGGER.debug("Water use event on %s: %s", self._phyn_device_id, event)
+        self._coordinator.hass.bus.async_fire(
+            EVENT_WATER_USE,
+            {"device_id": self._phyn_device_id, **event.as_dict()},
+        )
+        for listener in list(self._water_use_listeners):
+            listener(event)
+
+    @callback
+    def _async_process_samples(self, update_data: dict[str, Any], now: float) -> None:
+        """Feed realtime flow, pressure and temperature to the local analytics."""
+        flow = _reading_value(update_data.get("flow"))
+        pressure = _reading_value(update_data.get("pressure"))
+        self._samples.append(now, flow, pressure, _reading_value(update_data.get("temperature")))
+        if flow is None and pressure is None:
+            return
+        if self._anomaly_detector.add_sample(now, flow, pressure):
+            self._async_save_baseline()
+
+    @property
+    def samples(self) -> SampleRingBuffer:
+        """Return the buffer of recent realtime samples."""
+        return self._samples
+
+    @property
+    def decay_analyzer(self) -> PressureDecayAnalyzer:
+        """Return the valve-closed pressure decay analyzer."""
+        return self._decay_analyzer
+
+    @property
+    def anomaly_detector(self) -> BaselineAnomalyDetector:
+        """Return the flow and pressure baseline anomaly detector."""
+        return self._anomaly_detector
+
+    @callback
+    def _async_save_baseline(self) -> None:
+        """Schedule persisting the learned baseline."""
+        self._baseline_store.async_delay_save(self._anomaly_detector.as_dict, 60)
 
     def _update_last_known_valve_state(self) -> None:
         """Update last known valve state from device state. Must be called within _state_lock."""
-        sov_status = self._device_state.get("sov_status", {})
-        if sov_status.get("v") != "Partial":
-            self._last_known_valve_state = sov_status.get("v") == "Open"
+        sov_status = self._device_state.sov_status
+        if sov_status != "Partial":
+            self._last_known_valve_state = sov_status == "Open"
 
-    async def _update_device_state(self, *_) -> None:
+    async def _update_device_state(self, *_, force: bool = False) -> None:
         """Update the device state from the API."""
         async with self._state_lock:
-            if 'last_updated' not in self._device_state or self._device_state['last_updated'] <= (math.floor(time.time()) - 60):
+            last_updated = self._device_state.last_updated
+            if force or last_updated is None or last_updated <= (math.floor(time.time()) - 60):
                 state_data = await self._coordinator.api_client.device.get_state(
                     self._phyn_device_id
                 )
                 self._device_state.update(state_data)
-                self._device_state['last_updated'] = math.floor(time.time())
+                self._device_state.last_updated = math.floor(time.time())
                 self._update_last_known_valve_state()
 
     async def on_device_update(self, device_id, data):
-        if device_id == self._phyn_device_id:
-            async with self._state_lock:
-                self._rt_device_state = data
-
-                update_data = {}
-                if "consumption" in data:
-                    # Round consumption down to 2 decimal points.
-                    update_data.update({"consumption": math.floor(data["consumption"]["v"] * 100) / 100})
-                if "flow" in data:
-                    update_data.update({"flow": data["flow"]})
-                if "flow_state" in data:
-                    update_data.update({"flow_state": data["flow_state"]})
-                if "sov_state" in data:
-                    update_data.update({"sov_status":{"v": data["sov_state"]}})
-                if "sensor_data" in data:
-                    if "pressure" in data["sensor_data"]:
-                        update_data.update({"pressure": data["sensor_data"]["pressure"]})
-                    if "temperature" in data["sensor_data"]:
-                        update_data.update({"temperature": data["sensor_data"]["temperature"]})
-                self._device_state.update(update_data)
-                self._device_state['last_updated'] = math.floor(time.time())
-                self._update_last_known_valve_state()
-                LOGGER.debug("Updating device %s Device State: %s", self._phyn_device_id, self._device_state)
-
-            for entity in self.entities:
-                # Skip entities that aren't fully initialized yet
-                if getattr(entity, "hass", None) is None:
-                    continue
-                entity.async_write_ha_state()
+        # The handler of a removed device stays registered, and the device may be added again
+        if device_id == self._phyn_device_id and not self._removed:
+            with (
+                self._coordinator.metrics.measure("mqtt.update", device_id),
+                self._coordinator.profile(PROFILE_UPDATE),
+            ):
+                await self._async_handle_update(data)
+
+    async def _async_handle_update(self, data: dict[str, Any]) -> None:
+        """Apply a realtime update pushed over MQTT."""
+        options = self._coordinator.options
+        async with self._state_lock:
+            state = self._device_state
+            status = (state.sov_status, self.flow_state, state.consumption)
+            self._rt_device_state = data
+
+            update_data = {}
+            if "consumption" in data:
+                # Round consumption down to 2 decimal points.
+                update_data.update({"consumption": math.floor(data["consumption"]["v"] * 100) / 100})
+            if "flow" in data:
+                if "ts" in data["flow"]:
+                    # Readings are timestamped in milliseconds by the device
+                    self._mqtt_message_age = time.time() - data["flow"]["ts"] / 1000
+                update_data.update({"flow": data["flow"]})
+            if "flow_state" in data:
+                update_data.update({"flow_state": data["flow_state"]})
+            if options.analytics and data.keys() & {"flow", "flow_state"}:
+                self._async_process_water_use(data, time.time())
+            if "sov_state" in data:
+                update_data.update({"sov_status":{"v": data["sov_state"]}})
+            if "sensor_data" in data:
+                if "pressure" in data["sensor_data"]:
+                    update_data.update({"pressure": data["sensor_data"]["pressure"]})
+                if "temperature" in data["sensor_data"]:
+                    update_data.update({"temperature": data["sensor_data"]["temperature"]})
+            now = time.time()
+            if options.analytics and update_data.keys() & {"flow", "pressure", "temperature"}:
+                self._async_process_samples(update_data, now)
+            self._device_state.update(update_data)
+            if options.analytics:
+                self._decay_analyzer.update(now, self.valve_closed, self._samples)
+            self._device_state.last_updated = math.floor(now)
+            self._update_last_known_valve_state()
+            if self._valve_target is not None and self._valve_at_target(self._valve_target):
+                self._valve_confirmed.set()
+            self._optimistic.async_confirm_all(self._reported_value)
+            self._leak_test_tracker.async_status(self._device_state.sov_status)
+            DEBUG.event(CATEGORY_MQTT, "Realtime update of %s", self._phyn_device_id, data=data)
+            within_deadbands = (
+                options.deadbands
+                and status == (state.sov_status, self.flow_state, state.consumption)
+                and self._readings_within_deadbands(options)
+            )
+
+        if within_deadbands:
+            self.skipped_realtime_writes += 1
+            return
+        self._written_readings = (state.flow, state.pressure, state.temperature)
+        self.async_update_listeners()
+
+    def _readings_within_deadbands(self, options: PhynOptions) -> bool:
+        """Return True if the realtime readings moved less than their deadbands since the last write."""
+        if self._written_readings is None:
+            return False
+        state = self._device_state
+        for reading, written, deadband in zip(
+            (state.flow, state.pressure, state.temperature),
+            self._written_readings,
+            (options.flow_deadband, options.pressure_deadband, options.temperature_deadband),
+        ):
+            if reading is None or written is None:
+                if reading != written:
+                    return False
+            elif abs(reading - written) > deadband:
+                return False
+        return True
 
 class PhynAutoShutoffModeSwitch(PhynSwitchEntity):
     """Switch class for the Phyn Away Mode."""
@@ -398,72 +1001,6 @@ class PhynAwayModeSwitch(PhynSwitchEntity):
             return "mdi:bag-suitcase"
         return "mdi:home-circle"
 
-class PhynFlowState(PhynEntity, SensorEntity):
-    """Flow State for Water Sensor"""
-    _attr_icon = WATER_ICON
-    #_attr_native_unit_of_measurement = UnitOfVolume.GALLONS
-    #_attr_state_class: SensorStateClass = SensorStateClass.TOTAL_INCREASING
-    #_attr_device_class = SensorDeviceClass.WATER
-
-    _device: PhynPlusDevice
-
-    def __init__(self, device: PhynPlusDevice) -> None:
-        """Initialize the daily water usage sensor."""
-        super().__init__("water_flow_state", "Water Flowing", device)
-        self._state: str | None = None
-
-    @property
-    def native_value(self) -> str | None:
-        if "flow_state" in self._device._rt_device_state:
-            return self._device._rt_device_state['flow_state']['v']
-        return None
-
-class PhynLeakTestSensor(PhynEntity, BinarySensorEntity):
-    """Leak Test Sensor"""
-    _attr_device_class = BinarySensorDeviceClass.RUNNING
-
-    _device: PhynPlusDevice
-
-    def __init__(self, device: PhynPlusDevice) -> None:
-        """Initialize the leak test sensor."""
-        super().__init__("leak_test_running", "Leak Test Running", device)
-
-    @property
-    def is_on(self) -> bool:
-        return self._device.leak_test_running
-
-class PhynLeakTestWarning(PhynEntity, BinarySensorEntity):
-    """Leak Test Sensor"""
-    _attr_device_class = BinarySensorDeviceClass.PROBLEM
-
-    _device: PhynPlusDevice
-
-    def __init__(self, device: PhynPlusDevice) -> None:
-        """Initialize the leak test warning sensor."""
-        super().__init__("leak_test_warning", "Leak Test Warning", device)
-
-    @property
-    def is_on(self) -> bool | None:
-        if self._device._latest_health_test is None:
-            return None
-        return self._device._latest_health_test.get('is_warn', False)
-
-class PhynLeakTestLeakDetected(PhynEntity, BinarySensorEntity):
-    """Leak Test Sensor"""
-    _attr_device_class = BinarySensorDeviceClass.PROBLEM
-
-    _device: PhynPlusDevice
-
-    def __init__(self, device: PhynPlusDevice) -> None:
-        """Initialize the leak test leak sensor."""
-        super().__init__("leak_test_leak", "Leak Detected", device)
-
-    @property
-    def is_on(self) -> bool | None:
-        if self._device._latest_health_test is None:
-            return None
-        return self._device._latest_health_test.get('is_leak', False)
-
 class PhynScheduledLeakTestEnabledSwitch(PhynSwitchEntity):
     """Switch class for the Phyn Away Mode."""
 
@@ -485,51 +1022,30 @@ class PhynScheduledLeakTestEnabledSwitch(PhynSwitchEntity):
             return "mdi:bag-suitcase"
         return "mdi:home-circle"
 
-class PhynConsumptionSensor(PhynEntity, SensorEntity):
-    """Monitors the amount of water usage."""
+class PhynWaterUseEventEntity(PhynEntity, EventEntity):
+    """Event entity fired for every completed water-use event."""
 
     _attr_icon = WATER_ICON
-    _attr_native_unit_of_measurement = UnitOfVolume.GALLONS
-    _attr_state_class: SensorStateClass = SensorStateClass.TOTAL_INCREASING
-    _attr_device_class = SensorDeviceClass.WATER
+    _attr_event_types = [EVENT_TYPE_WATER_USE]
 
     _device: PhynPlusDevice
 
     def __init__(self, device: PhynPlusDevice) -> None:
-        """Initialize the daily water usage sensor."""
-        super().__init__("consumption", "Total Water Usage", device)
-        self._state: float | None = None
-
-    @property
-    def native_value(self) -> float | None:
-        """Return the current daily usage."""
-        if self._device.consumption is None:
-            return None
-        return self._device.consumption
-
-
-class PhynCurrentFlowRateSensor(PhynEntity, SensorEntity):
-    """Monitors the current water flow rate."""
-
-    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
-    _attr_translation_key = "current_flow_rate"
-    _attr_device_class = SensorDeviceClass.VOLUME_FLOW_RATE
-    _attr_native_unit_of_measurement = UnitOfVolumeFlowRate.GALLONS_PER_MINUTE
-
-    _device: PhynPlusDevice
-
-    def __init__(self, device: PhynPlusDevice) -> None:
-        """Initialize the flow rate sensor."""
-        super().__init__("current_flow_rate", NAME_FLOW_RATE, device)
-        self._state: float | None = None
+        """Initialize the water use event entity."""
+        super().__init__("water_use_event", "Water use", device)
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._device.async_add_water_use_listener(self._async_handle_water_use)
+        )
 
-    @property
-    def native_value(self) -> float | None:
-        """Return the current flow rate."""
-        if self._device.current_flow_rate is None:
-            return None
-        rate = round(self._device.current_flow_rate, 1)
-        return 0 if rate == 0 else rate
+    @callback
+    def _async_handle_water_use(self, event: WaterUseEvent) -> None:
+        """Trigger the entity for a completed water-use event."""
+        self._trigger_event(EVENT_TYPE_WATER_USE, event.as_dict())
+        self.async_write_ha_state()
 
 class PhynValve(PhynEntity, ValveEntity):
     """ValveEntity for the Phyn valve."""
@@ -546,7 +1062,7 @@ class PhynValve(PhynEntity, ValveEntity):
     
     async def async_open_valve(self) -> None:
         """Open the valve."""
-        await self._device.coordinator.api_client.device.open_valve(self._device.id)
+        await self._device.async_set_valve(True)
 
     def open_valve(self) -> None:
         """Open the valve."""
@@ -554,12 +1070,17 @@ class PhynValve(PhynEntity, ValveEntity):
     
     async def async_close_valve(self) -> None:
         """Close the valve."""
-        await self._device.coordinator.api_client.device.close_valve(self._device.id)
+        await self._device.async_set_valve(False)
 
     def close_valve(self) -> None:
         """Close valve."""
         raise NotImplementedError()
     
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the home of the valve, used by the home services."""
+        return {"home_id": self._device.home_id}
+
     @property
     def _attr_is_closed(self) -> bool | None:
         """ Is the valve closed """
@@ -571,6 +1092,8 @@ class PhynValve(PhynEntity, ValveEntity):
     @property
     def _attr_is_opening(self) -> bool:
         """ Is the valve opening """
+        if self._device.valve_command_pending:
+            return False
         if self._device.valve_changing and self._device._last_known_valve_state is False:
             return True
         return False
@@ -578,6 +1101,8 @@ class PhynValve(PhynEntity, ValveEntity):
     @property
     def _attr_is_closing(self) -> bool:
         """ Is the valve closing """
+        if self._device.valve_command_pending:
+            return False
         if self._device.valve_changing and self._device._last_known_valve_state is True:
             return True
         return False
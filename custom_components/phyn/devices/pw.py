@@ -2,36 +2,103 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
 from aiophyn.errors import RequestError
 
 from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
 from homeassistant.components.sensor import (
     SensorDeviceClass,
-    SensorEntity,
     SensorStateClass,
 )
 from homeassistant.const import (
     PERCENTAGE,
+    UnitOfTemperature,
 )
 from asyncio import timeout
 
 from .base import PhynDevice
+from .state import PhynWaterSensorState
 from ..entities.base import (
-    PhynEntity,
-    PhynAlertSensor,
+    DIAGNOSTIC_SENSORS,
+    PhynBinarySensor,
+    PhynBinarySensorEntityDescription,
+    PhynDiagnosticSensor,
     PhynFirwmwareUpdateEntity,
-    PhynHumiditySensor,
-    PhynTemperatureSensor,
+    PhynSensor,
+    PhynSensorEntityDescription,
 )
-from ..const import LOGGER
+from ..debug import CATEGORY_REFRESH, DEBUG
+from ..options import CONF_POLL_INTERVAL_WATER_SENSOR
 
 if TYPE_CHECKING:
     from ..update_coordinator import PhynDataUpdateCoordinator
 
+def _round(value: float | None) -> float | None:
+    """Round a reading that may be unknown."""
+    if value is None:
+        return None
+    return round(value, 1)
+
+SENSORS: tuple[PhynSensorEntityDescription, ...] = (
+    PhynSensorEntityDescription(
+        key="battery",
+        name="Battery",
+        device_class=SensorDeviceClass.BATTERY,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: _round(device.battery),
+    ),
+    PhynSensorEntityDescription(
+        key="humidity",
+        name="Humidity",
+        device_class=SensorDeviceClass.HUMIDITY,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: _round(device.humidity),
+    ),
+    PhynSensorEntityDescription(
+        key="air_temperature",
+        name="Air Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda device: _round(device.temperature),
+    ),
+)
+
+BINARY_SENSORS: tuple[PhynBinarySensorEntityDescription, ...] = (
+    PhynBinarySensorEntityDescription(
+        key="high_humidity_alert",
+        name="High Humidity Alert",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda device: device.high_humidity,
+    ),
+    PhynBinarySensorEntityDescription(
+        key="low_humidity_alert",
+        name="Low Humidity Alert",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda device: device.low_humidity,
+    ),
+    PhynBinarySensorEntityDescription(
+        key="low_temperature_alert",
+        name="Low Temperature Alert",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda device: device.low_temperature,
+    ),
+    PhynBinarySensorEntityDescription(
+        key="water_detected_alert",
+        name="Water Detected Alert",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda device: device.water_detected,
+    ),
+)
+
 class PhynWaterSensorDevice(PhynDevice):
     """Phyn Water Sensor Device"""
+
+    POLL_INTERVAL_OPTION = CONF_POLL_INTERVAL_WATER_SENSOR
     def __init__(
         self,
         coordinator: PhynDataUpdateCoordinator,
@@ -40,101 +107,67 @@ class PhynWaterSensorDevice(PhynDevice):
         product_code: str
     ) -> None:
         """Initialize the Phyn Water Sensor device."""
-        self._water_statistics: dict[str, Any] = {}
         super().__init__(coordinator, home_id, device_id, product_code)
+        self._device_state: PhynWaterSensorState = PhynWaterSensorState()
 
         self.entities = [
-            PhynAlertSensor(self, "high_humidity_alert", "High Humidity Alert", "high_humidity"),
-            PhynAlertSensor(self, "low_humidity_alert", "Low Humidity Alert", "low_humidity"),
-            PhynAlertSensor(self, "low_temperature_alert", "Low Temperature Alert", "low_temperature"),
-            PhynAlertSensor(self, "water_detected_alert", "Water Detected Alert", "water_detected"),
-            PhynBatterySensor(self, "battery", "Battery"),
+            *(PhynSensor(self, description) for description in SENSORS),
+            *(PhynBinarySensor(self, description) for description in BINARY_SENSORS),
+            *(PhynDiagnosticSensor(self, description) for description in DIAGNOSTIC_SENSORS),
             PhynFirwmwareUpdateEntity(self),
-            PhynHumiditySensor(self, "humidity","Humidity"),
-            PhynTemperatureSensor(self,"air_temperature","Air Temperature"),
         ]
 
     @property
     def battery(self) -> int | None:
         """Return battery percentage"""
-        if "battery_level" not in self._water_statistics:
-            return None
-        return self._water_statistics.get("battery_level")
+        return self._device_state.battery
 
     @property
     def device_name(self) -> str:
         """Return device name."""
-        if "name" not in self._device_state:
+        if self._device_state.name is None:
             return f"{self.manufacturer} {self.model}"
-        return f"{self.manufacturer} {self.model} - {self._device_state.get('name', '')}"
+        return f"{self.manufacturer} {self.model} - {self._device_state.name}"
 
     @property
     def high_humidity(self) -> bool | None:
         """High humidity detected"""
-        key = "high_humidity"
-        alerts = self._water_statistics.get("alerts", {})
-        if key in alerts:
-            return alerts.get(key)
-        return None
+        return self._device_state.high_humidity
 
     @property
-    def humidity(self) -> str | None:
+    def humidity(self) -> float | None:
         """Humidity percentage"""
-        if "humidity" not in self._water_statistics:
-            return None
-        humidity_data = self._water_statistics.get("humidity", [])
-        if humidity_data and len(humidity_data) > 0:
-            return humidity_data[0].get("value")
-        return None
+        return self._device_state.humidity
 
     @property
     def low_humidity(self) -> bool | None:
         """Low humidity detected"""
-        key = "low_humidity"
-        alerts = self._water_statistics.get("alerts", {})
-        if key in alerts:
-            return alerts.get(key)
-        return None
+        return self._device_state.low_humidity
 
     @property
     def low_temperature(self) -> bool | None:
         """Low temperature detected"""
-        key = "low_temperature"
-        alerts = self._water_statistics.get("alerts", {})
-        if key in alerts:
-            return alerts.get(key)
-        return None
+        return self._device_state.low_temperature
 
     @property
-    def temperature(self) -> str | None:
+    def temperature(self) -> float | None:
         """Current temperature"""
-        if "temperature" not in self._water_statistics:
-            return None
-        temperature_data = self._water_statistics.get("temperature", [])
-        if temperature_data and len(temperature_data) > 0:
-            return temperature_data[0].get("value")
-        return None
+        return self._device_state.temperature
 
     @property
     def water_detected(self) -> bool | None:
         """Water detected"""
-        key = "water"
-        alerts = self._water_statistics.get("alerts", {})
-        if key in alerts:
-            return alerts.get(key)
-        return None
+        return self._device_state.water_detected
 
     async def async_update_data(self):
         """Update data via library."""
         try:
             async with timeout(20):
-                if "product_code" not in self._device_state:
+                if not self._device_state.product_code:
                     await self._update_device_state()
                 await self._update_device()
 
-                #Update every hour
-                if self._update_count % 60 == 0:
-                    await self._update_firmware_information()
+                await self._update_firmware_information()
 
                 self._update_count += 1
         except (RequestError) as error:
@@ -145,7 +178,7 @@ class PhynWaterSensorDevice(PhynDevice):
         to_ts = int(datetime.timestamp(datetime.now()) * 1000)
         from_ts = to_ts - (3600 * 72 * 1000)
         data = await self._coordinator.api_client.device.get_water_statistics(self._phyn_device_id, from_ts, to_ts)
-        LOGGER.debug("PW1 data (%s): %s", (self._phyn_device_id, data))
+        DEBUG.event(CATEGORY_REFRESH, "Water statistics of %s", self._phyn_device_id, entries=len(data), data=data)
 
         item = None
         for entry in data:
@@ -156,32 +189,10 @@ class PhynWaterSensorDevice(PhynDevice):
                 item = entry
 
         if item:
-            self._water_statistics.update(item)
+            self._device_state.update_statistics(item)
 
-        LOGGER.debug("Phyn Water device state (%s): %s", (self._phyn_device_id, self._device_state))
+        DEBUG.event(CATEGORY_REFRESH, "State of %s", self._phyn_device_id, state=self._device_state)
 
     async def async_setup(self) -> None:
         """Async setup not needed"""
         pass
-
-class PhynBatterySensor(PhynEntity, SensorEntity):
-    """Monitors the battery level."""
-
-    _attr_device_class = SensorDeviceClass.BATTERY
-    _attr_native_unit_of_measurement = PERCENTAGE
-    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
-
-    _device: PhynWaterSensorDevice
-
-    def __init__(self, device: PhynWaterSensorDevice, name: str, readable_name: str) -> None:
-        """Initialize the battery sensor."""
-        super().__init__(name, readable_name, device)
-        self._state: float | None = None
-        self._device_property: str = "battery"
-
-    @property
-    def native_value(self) -> float | None:
-        """Return the current battery."""
-        if not hasattr(self._device, self._device_property) or self._device.battery is None:
-            return None
-        return round(self._device.battery, 1)
@@ -0,0 +1,162 @@
+"""Typed device state models for Phyn devices.
+
+Payloads from the API and MQTT are parsed once when they arrive, so entity
+reads are plain attribute loads instead of nested ``dict.get`` lookups and
+rounding on every state write.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, ClassVar
+
+
+def _reading(value: Any) -> float | None:
+    """Return the value of a ``{"v": ..., "ts": ...}`` reading, falling back to its mean."""
+    if isinstance(value, dict):
+        if "v" in value:
+            return value["v"]
+        return value.get("mean")
+    if isinstance(value, (int, float)):
+        return value
+    return None
+
+
+def _rounded(digits: int) -> Callable[[Any], float]:
+    """Return a parser for readings rounded to digits, defaulting to zero."""
+    def parse(value: Any) -> float:
+        reading = _reading(value)
+        return round(reading if reading is not None else 0, digits)
+    return parse
+
+
+def _flow(value: Any) -> float | None:
+    """Parse a flow reading, which is only valid with a current value."""
+    if not isinstance(value, dict) or "v" not in value:
+        return None
+    return round(value["v"], 3)
+
+
+def _status(value: Any) -> str | None:
+    """Parse a ``{"v": ...}`` status or a bare status string."""
+    if isinstance(value, dict):
+        return value.get("v")
+    return value
+
+
+def _first_value(value: Any) -> Any:
+    """Return the value of the first entry of a statistics series."""
+    if value:
+        return value[0].get("value")
+    return None
+
+
+@dataclass(slots=True)
+class PhynDeviceState:
+    """State common to all Phyn devices."""
+
+    product_code: str = ""
+    serial_number: str = ""
+    fw_version: str = ""
+    signal_strength: float | None = None
+    online: bool = False
+    name: str | None = None
+    sov_status: str | None = None
+    # Not part of equality so snapshots only differ when rendered data changes
+    last_updated: int | None = field(default=None, compare=False)
+
+    _PARSERS: ClassVar[dict[str, tuple[str, Callable[[Any], Any]]]] = {
+        "product_code": ("product_code", str),
+        "serial_number": ("serial_number", str),
+        "fw_version": ("fw_version", str),
+        "signal_strength": ("signal_strength", lambda value: value),
+        "online_status": ("online", lambda value: _status(value) == "online"),
+        "name": ("name", str),
+        "sov_status": ("sov_status", _status),
+        "last_updated": ("last_updated", int),
+    }
+
+    def update(self, data: dict[str, Any]) -> None:
+        """Parse a state payload, ignoring keys the model does not track."""
+        parsers = self._PARSERS
+        for key, value in data.items():
+            if (parser := parsers.get(key)) is not None:
+                setattr(self, parser[0], parser[1](value))
+
+
+@dataclass(slots=True)
+class PhynPlusState(PhynDeviceState):
+    """State of a Phyn Plus device."""
+
+    flow: float | None = None
+    pressure: float = 0.0
+    temperature: float = 0.0
+    consumption: float | None = None
+
+    _PARSERS: ClassVar[dict[str, tuple[str, Callable[[Any], Any]]]] = {
+        **PhynDeviceState._PARSERS,
+        "flow": ("flow", _flow),
+        "pressure": ("pressure", _rounded(2)),
+        "temperature": ("temperature", _rounded(2)),
+        "consumption": ("consumption", _reading),
+    }
+
+
+@dataclass(slots=True)
+class PhynClassicState(PhynDeviceState):
+    """State of a Phyn Classic device."""
+
+    flow: float | None = None
+    pressure1: float = 0.0
+    pressure2: float = 0.0
+    temperature1: float = 0.0
+    temperature2: float = 0.0
+    cold_line_num: int | None = None
+    hot_line_num: int | None = None
+
+    _PARSERS: ClassVar[dict[str, tuple[str, Callable[[Any], Any]]]] = {
+        **PhynDeviceState._PARSERS,
+        "flow": ("flow", _flow),
+        "pressure1": ("pressure1", _rounded(2)),
+        "pressure2": ("pressure2", _rounded(2)),
+        "temperature1": ("temperature1", _rounded(2)),
+        "temperature2": ("temperature2", _rounded(2)),
+        "cold_line_num": ("cold_line_num", lambda value: value),
+        "hot_line_num": ("hot_line_num", lambda value: value),
+    }
+
+
+@dataclass(slots=True)
+class PhynWaterSensorState(PhynDeviceState):
+    """State of a Phyn water sensor, including its latest statistics."""
+
+    battery: int | None = None
+    humidity: float | None = None
+    temperature: float | None = None
+    high_humidity: bool | None = None
+    low_humidity: bool | None = None
+    low_temperature: bool | None = None
+    water_detected: bool | None = None
+
+    _STATISTICS_PARSERS: ClassVar[dict[str, tuple[str, Callable[[Any], Any]]]] = {
+        "battery_level": ("battery", lambda value: value),
+        "humidity": ("humidity", _first_value),
+        "temperature": ("temperature", _first_value),
+    }
+    _ALERTS: ClassVar[dict[str, str]] = {
+        "high_humidity": "high_humidity",
+        "low_humidity": "low_humidity",
+        "low_temperature": "low_temperature",
+        "water": "water_detected",
+    }
+
+    def update_statistics(self, data: dict[str, Any]) -> None:
+        """Parse a water statistics entry."""
+        parsers = self._STATISTICS_PARSERS
+        for key, value in data.items():
+            if (parser := parsers.get(key)) is not None:
+                setattr(self, parser[0], parser[1](value))
+        if "alerts" in data:
+            alerts = data["alerts"] or {}
+            for key, attribute in self._ALERTS.items():
+                setattr(self, attribute, alerts.get(key))
@@ -0,0 +1,29 @@
+"""Diagnostics support for the phyn integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .trace import TO_REDACT
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics of a config entry, with API statistics and device data."""
+    coordinator = hass.data[DOMAIN]["coordinator"]
+    return {
+        "entry": async_redact_data(dict(entry.data), {CONF_PASSWORD, CONF_USERNAME}),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+            "skipped_writes": coordinator.skipped_writes,
+            "trace": str(coordinator.trace_path) if coordinator.trace_path is not None else None,
+        },
+        "api": coordinator.metrics.as_dict(),
+        "firmware": coordinator.firmware.as_dict(),
+        "devices": async_redact_data([device.diagnostics() for device in coordinator.devices], TO_REDACT),
+    }
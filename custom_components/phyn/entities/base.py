@@ -1,18 +1,21 @@
 """Base entity class for Phyn entities."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.helpers.entity import DeviceInfo, Entity
-from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
+    BinarySensorEntityDescription,
 )
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.components.switch import SwitchEntity
@@ -22,13 +25,11 @@ from homeassistant.components.update import (
     UpdateEntityFeature
 )
 from homeassistant.const import (
-    PERCENTAGE,
-    UnitOfPressure,
-    UnitOfTemperature,
+    EntityCategory,
+    UnitOfTime,
     UnitOfVolume,
 )
-
-from ..const import DOMAIN as PHYN_DOMAIN
+from homeassistant.helpers.typing import StateType
 
 if TYPE_CHECKING:
     from ..devices.base import PhynDevice
@@ -58,15 +59,7 @@ class PhynEntity(Entity):
     @property
     def device_info(self) -> DeviceInfo:
         """Return a device description for device registry."""
-        return DeviceInfo(
-            identifiers={(PHYN_DOMAIN, self._device.id)},
-            manufacturer=self._device.manufacturer,
-            model=self._device.model,
-            name=self._device.device_name.capitalize(),
-            sw_version=self._device.firmware_version,
-            connections={(CONNECTION_NETWORK_MAC, self._device.id)},
-            serial_number=self._device.serial_number
-        )
+        return self._device.device_info
 
     @property
     def available(self) -> bool:
@@ -79,65 +72,163 @@ class PhynEntity(Entity):
 
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
-        try:
-            # Prefer coordinator listener when available
-            self.async_on_remove(self._device.coordinator.async_add_listener(self.async_write_ha_state))
-        except AttributeError:
-            # Fallback for older device structure that exposes async_add_listener directly
-            self.async_on_remove(self._device.async_add_listener(self.async_write_ha_state))  # type: ignore[attr-defined]
+        self.async_on_remove(self._device.async_add_listener(self.async_write_ha_state))
+        self.async_on_remove(
+            self._device.coordinator.async_index_entity(self.entity_id, self._device)
+        )
 
-class PhynAlertSensor(PhynEntity, BinarySensorEntity):
-    """Alert sensor"""
-    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+@dataclass(frozen=True, kw_only=True)
+class PhynSensorEntityDescription(SensorEntityDescription):
+    """Describes a Phyn sensor and how to read its value from the device."""
 
-    def __init__(
-        self,
-        device: PhynDevice,
-        name: str,
-        readable_name: str,
-        device_property: str
-    ) -> None:
-        """Initialize Alert Sensor."""
-        super().__init__(name, readable_name, device)
-        self._device_property: str = device_property
+    value_fn: Callable[[Any], StateType]
+    attr_fn: Callable[[Any], dict[str, Any] | None] | None = None
 
-    @property
-    def is_on(self) -> bool | None:
-        if self._device_property is not None and hasattr(self._device, self._device_property):
-            return getattr(self._device, self._device_property)
-        return None
+@dataclass(frozen=True, kw_only=True)
+class PhynBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Describes a Phyn binary sensor and how to read its value from the device."""
 
-class PhynDailyUsageSensor(PhynEntity, SensorEntity):
-    """Monitors the daily water usage."""
+    value_fn: Callable[[Any], bool | None]
+    attr_fn: Callable[[Any], dict[str, Any] | None] | None = None
 
-    _attr_icon = WATER_ICON
-    _attr_native_unit_of_measurement = UnitOfVolume.GALLONS
-    _attr_state_class: SensorStateClass = SensorStateClass.TOTAL_INCREASING
-    _attr_device_class = SensorDeviceClass.WATER
+class PhynSensor(PhynEntity, SensorEntity):
+    """Sensor reading its value through an entity description."""
 
-    def __init__(self, device: PhynDevice) -> None:
-        """Initialize the daily water usage sensor."""
-        super().__init__("daily_consumption", NAME_DAILY_USAGE, device)
-        self._state: float | None = None
+    entity_description: PhynSensorEntityDescription
+
+    def __init__(self, device: PhynDevice, description: PhynSensorEntityDescription) -> None:
+        """Initialize the sensor."""
+        super().__init__(description.key, str(description.name), device)
+        self.entity_description = description
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the sensor value."""
+        return self.entity_description.value_fn(self._device)
 
     @property
-    def native_value(self) -> float | None:
-        """Return the current daily usage."""
-        if self._device.consumption_today is None:  # type: ignore[attr-defined]
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return extra state attributes."""
+        if self.entity_description.attr_fn is None:
             return None
-        return round(self._device.consumption_today, 1)  # type: ignore[attr-defined]
+        return self.entity_description.attr_fn(self._device)
 
-class PhynFirmwareUpdateAvailableSensor(PhynEntity, BinarySensorEntity):
-    """Firmware Update Available Sensor"""
-    _attr_device_class = BinarySensorDeviceClass.UPDATE
+class PhynDiagnosticSensor(PhynSensor):
+    """Sensor of instrumentation data, written after every coordinator refresh.
 
-    def __init__(self, device: PhynDevice) -> None:
-        """Initialize Firmware Update Sensor."""
-        super().__init__("firmware_update_available", "Firmware Update Available", device)
+    Its values change on every refresh, so it is not part of the device data
+    compared to skip unchanged writes.
+    """
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        self.async_on_remove(self._device.coordinator.async_add_listener(self.async_write_ha_state))
+        self.async_on_remove(
+            self._device.coordinator.async_index_entity(self.entity_id, self._device)
+        )
+
+class PhynBinarySensor(PhynEntity, BinarySensorEntity):
+    """Binary sensor reading its state through an entity description."""
+
+    entity_description: PhynBinarySensorEntityDescription
+
+    def __init__(self, device: PhynDevice, description: PhynBinarySensorEntityDescription) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(description.key, str(description.name), device)
+        self.entity_description = description
 
     @property
     def is_on(self) -> bool | None:
-        return self._device.firmware_has_update
+        """Return the binary sensor state."""
+        return self.entity_description.value_fn(self._device)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return extra state attributes."""
+        if self.entity_description.attr_fn is None:
+            return None
+        return self.entity_description.attr_fn(self._device)
+
+def _round(value: float | None, digits: int = 1) -> float | None:
+    """Round a value that may be unknown."""
+    if value is None:
+        return None
+    return round(value, digits)
+
+DAILY_USAGE_SENSOR = PhynSensorEntityDescription(
+    key="daily_consumption",
+    name=NAME_DAILY_USAGE,
+    icon=WATER_ICON,
+    native_unit_of_measurement=UnitOfVolume.GALLONS,
+    state_class=SensorStateClass.TOTAL_INCREASING,
+    device_class=SensorDeviceClass.WATER,
+    value_fn=lambda device: _round(device.consumption_today),
+)
+
+def _milliseconds(seconds: float | None) -> float | None:
+    """Convert seconds that may be unknown to milliseconds."""
+    if seconds is None:
+        return None
+    return round(seconds * 1000, 1)
+
+def _diagnostic_sensor(key: str, name: str, icon: str, value_fn: Callable[[Any], StateType], **kwargs: Any) -> PhynSensorEntityDescription:
+    """Describe a disabled by default diagnostic sensor."""
+    return PhynSensorEntityDescription(
+        key=key,
+        name=name,
+        icon=icon,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=value_fn,
+        **kwargs,
+    )
+
+REFRESH_DURATION_SENSOR = _diagnostic_sensor(
+    "refresh_duration", "Last refresh duration", "mdi:timer-refresh-outline",
+    lambda device: _milliseconds(device.refresh_duration),
+    device_class=SensorDeviceClass.DURATION,
+    native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+)
+API_LATENCY_SENSOR = _diagnostic_sensor(
+    "api_latency", "API latency", "mdi:timer-outline",
+    lambda device: _milliseconds(device.api_latency),
+    device_class=SensorDeviceClass.DURATION,
+    native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+)
+CONSECUTIVE_FAILURES_SENSOR = _diagnostic_sensor(
+    "consecutive_failures", "Consecutive refresh failures", "mdi:alert-circle-outline",
+    lambda device: device.consecutive_failures,
+)
+MQTT_MESSAGE_AGE_SENSOR = _diagnostic_sensor(
+    "mqtt_message_age", "MQTT message age", "mdi:clock-fast",
+    lambda device: _milliseconds(device.mqtt_message_age),
+    device_class=SensorDeviceClass.DURATION,
+    native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+)
+MQTT_MESSAGES_SENSOR = _diagnostic_sensor(
+    "mqtt_messages_per_minute", "MQTT messages per minute", "mdi:message-flash-outline",
+    lambda device: _round(device.mqtt_messages_per_minute),
+    native_unit_of_measurement="messages/min",
+)
+
+DIAGNOSTIC_SENSORS: tuple[PhynSensorEntityDescription, ...] = (
+    REFRESH_DURATION_SENSOR,
+    API_LATENCY_SENSOR,
+    CONSECUTIVE_FAILURES_SENSOR,
+)
+
+MQTT_DIAGNOSTIC_SENSORS: tuple[PhynSensorEntityDescription, ...] = (
+    MQTT_MESSAGE_AGE_SENSOR,
+    MQTT_MESSAGES_SENSOR,
+)
+
+FIRMWARE_UPDATE_AVAILABLE_SENSOR = PhynBinarySensorEntityDescription(
+    key="firmware_update_available",
+    name="Firmware Update Available",
+    device_class=BinarySensorDeviceClass.UPDATE,
+    value_fn=lambda device: device.firmware_has_update,
+)
 
 class PhynFirwmwareUpdateEntity(PhynEntity, UpdateEntity):
     """Update entity for Phyn Plus"""
@@ -200,88 +291,3 @@ class PhynSwitchEntity(PhynEntity, SwitchEntity):
         """Turn off the preference."""
         await self._device.set_device_preference(self._preference_name, "false")  # type: ignore[attr-defined]
         self.async_write_ha_state()
-
-class PhynHumiditySensor(PhynEntity, SensorEntity):
-    """Monitors the humidty."""
-
-    _attr_device_class = SensorDeviceClass.HUMIDITY
-    _attr_native_unit_of_measurement = PERCENTAGE
-    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
-
-    def __init__(
-        self,
-        device: PhynDevice,
-        name: str,
-        readable_name: str,
-        device_property: str | None = None
-    ) -> None:
-        """Initialize the humidity sensor."""
-        super().__init__(name, readable_name, device)
-        self._state: float | None = None
-        self._device_property: str | None = device_property
-
-    @property
-    def native_value(self) -> float | None:
-        """Return the current temperature."""
-        if self._device_property is not None and hasattr(self._device, self._device_property):
-            return getattr(self._device, self._device_property)
-        if not hasattr(self._device, "humidity") or self._device.humidity is None:
-            return None
-        return round(self._device.humidity, 1)
-
-class PhynPressureSensor(PhynEntity, SensorEntity):
-    """Monitors the water pressure."""
-
-    _attr_device_class = SensorDeviceClass.PRESSURE
-    _attr_native_unit_of_measurement = UnitOfPressure.PSI
-    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
-
-    def __init__(
-        self,
-        device: PhynDevice,
-        name: str,
-        readable_name: str,
-        device_property: str | None = None
-    ) -> None:
-        """Initialize the pressure sensor."""
-        super().__init__(name, readable_name, device)
-        self._state: float | None = None
-        self._device_property: str | None = device_property
-
-    @property
-    def native_value(self) -> float | None:
-        """Return the current water pressure."""
-        if self._device_property is not None and hasattr(self._device, self._device_property):
-            return getattr(self._device, self._device_property)
-        if not hasattr(self._device, "current_psi") or self._device.current_psi is None:
-            return None
-        return round(self._device.current_psi, 1)
-
-class PhynTemperatureSensor(PhynEntity, SensorEntity):
-    """Monitors the temperature."""
-
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_native_unit_of_measurement = UnitOfTemperature.FAHRENHEIT
-    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
-
-    def __init__(
-        self,
-        device: PhynDevice,
-        name: str,
-        readable_name: str,
-        device_property: str | None = None
-    ) -> None:
-        """Initialize the temperature sensor."""
-        super().__init__(name, readable_name, device)
-        self._state: float | None = None
-        self._device_property: str | None = device_property
-
-    @property
-    def native_value(self) -> float | None:
-        """Return the current temperature."""
-        if self._device_property is not None and hasattr(self._device, self._device_property):
-            return getattr(self._device, self._device_property)
-        if not hasattr(self._device, "temperature") or self._device.temperature is None:
-            return None
-        return round(self._device.temperature, 1)
-
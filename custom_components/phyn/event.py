@@ -0,0 +1,18 @@
+"""Event entities for the Phyn integration."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN as PHYN_DOMAIN
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Phyn events from config entry."""
+    coordinator = hass.data[PHYN_DOMAIN]["coordinator"]
+    coordinator.async_add_platform(Platform.EVENT, async_add_entities)
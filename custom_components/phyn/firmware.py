@@ -0,0 +1,61 @@
+"""Latest firmware information, shared by the devices of a product code.
+
+Devices of the same product code are offered the same firmware, so the
+coordinator asks the API once per product code. Every device of that
+product code then reads the answer, until it is older than the TTL.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import time
+from typing import Any
+
+from .options import POLL_SLACK
+
+
+class FirmwareCache:
+    """Latest firmware information per product code, with a TTL."""
+
+    def __init__(self) -> None:
+        """Initialize the cache."""
+        self._info: dict[str, dict[str, Any]] = {}
+        self._fetched: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def get(self, product_code: str) -> dict[str, Any]:
+        """Return the latest firmware information of a product code, empty if not fetched yet.
+
+        Entries are replaced, never changed, so callers may keep the dict.
+        """
+        return self._info.get(product_code, {})
+
+    async def async_update(
+        self,
+        product_code: str,
+        ttl: float,
+        fetch: Callable[[], Awaitable[list[dict[str, Any]]]],
+    ) -> dict[str, Any]:
+        """Fetch the firmware information of a product code, if it is older than ``ttl`` seconds.
+
+        Devices refreshed concurrently wait for the first one's fetch
+        instead of making their own.
+        """
+        lock = self._locks.setdefault(product_code, asyncio.Lock())
+        async with lock:
+            fetched = self._fetched.get(product_code)
+            if fetched is None or time.monotonic() - fetched >= ttl - POLL_SLACK:
+                self._info[product_code] = {**self.get(product_code), **(await fetch())[0]}
+                self._fetched[product_code] = time.monotonic()
+        return self._info[product_code]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cached firmware information and its age in seconds, for diagnostics."""
+        now = time.monotonic()
+        return {
+            product_code: {
+                "age": round(now - self._fetched[product_code], 1),
+                "info": dict(info),
+            }
+            for product_code, info in self._info.items()
+        }
@@ -0,0 +1,214 @@
+"""Latency and error statistics of Phyn API calls and MQTT handling.
+
+Every call made through the coordinator's client is timed and counted per
+endpoint and device. Latencies go into fixed histogram buckets, so the
+memory used does not grow with the number of calls. The statistics are
+part of the config entry diagnostics.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import statistics
+import time
+from typing import Any
+
+# Upper bounds of the latency buckets, in milliseconds
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000,
+)
+# Recent calls kept per endpoint and device for medians and rates
+RECENT_CALLS = 120
+# Seconds of recent calls a rate is computed over
+RATE_WINDOW = 600
+
+
+@dataclass(slots=True)
+class EndpointStats:
+    """Call count, errors and latency histogram of one endpoint and device."""
+
+    calls: int = 0
+    errors: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last_call: float | None = None
+    last_error: str | None = None
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    # Monotonic time and duration of the most recent calls
+    recent: deque[tuple[float, float]] = field(default_factory=lambda: deque(maxlen=RECENT_CALLS))
+
+    def add(self, duration: float, error: BaseException | None = None) -> None:
+        """Record a call that took ``duration`` seconds."""
+        self.calls += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.last_call = time.time()
+        self.recent.append((time.monotonic(), duration))
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration * 1000)] += 1
+        if error is not None:
+            self.errors += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+
+    def merge(self, other: EndpointStats) -> None:
+        """Add the calls of another device to these statistics."""
+        self.calls += other.calls
+        self.errors += other.errors
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.last_call is not None and (self.last_call is None or other.last_call > self.last_call):
+            self.last_call = other.last_call
+            self.last_error = other.last_error or self.last_error
+        self.buckets = [mine + theirs for mine, theirs in zip(self.buckets, other.buckets)]
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the bucket bound below which ``fraction`` of the calls fell, in milliseconds."""
+        if not self.calls:
+            return None
+        rank = fraction * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return round(self.max * 1000, 1)
+
+    def as_dict(self, elapsed: float) -> dict[str, Any]:
+        """Return the statistics, with the call rate over ``elapsed`` seconds."""
+        histogram = {f"<={bound:g}ms": count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)}
+        histogram[f">{LATENCY_BUCKETS_MS[-1]:g}ms"] = self.buckets[-1]
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "calls_per_minute": round(self.calls / elapsed * 60, 3) if elapsed > 0 else None,
+            "mean_ms": round(self.total / self.calls * 1000, 1) if self.calls else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max * 1000, 1),
+            "last_call": self.last_call,
+            "last_error": self.last_error,
+            "histogram": {bucket: count for bucket, count in histogram.items() if count},
+        }
+
+
+class PhynMetrics:
+    """Statistics of the API calls and MQTT updates of a config entry."""
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self._start = time.monotonic()
+        self._stats: dict[str, dict[str, EndpointStats]] = {}
+
+    def record(self, name: str, device_id: str | None, duration: float, error: BaseException | None = None) -> None:
+        """Record a call of an endpoint for a device."""
+        devices = self._stats.setdefault(name, {})
+        if (stats := devices.get(device_id or "")) is None:
+            stats = devices[device_id or ""] = EndpointStats()
+        stats.add(duration, error)
+
+    @contextmanager
+    def measure(self, name: str, device_id: str | None) -> Iterator[None]:
+        """Time the enclosed block as a call of an endpoint."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as error:
+            self.record(name, device_id, time.perf_counter() - start, error)
+            raise
+        self.record(name, device_id, time.perf_counter() - start)
+
+    def get(self, name: str, device_id: str | None = None) -> EndpointStats | None:
+        """Return the statistics of an endpoint for a device."""
+        return self._stats.get(name, {}).get(device_id or "")
+
+    def _matching(self, prefix: str, device_id: str | None) -> Iterator[EndpointStats]:
+        """Yield the statistics of the endpoints starting with prefix, of one or all devices."""
+        for name, devices in self._stats.items():
+            if not name.startswith(prefix):
+                continue
+            if device_id is None:
+                yield from devices.values()
+            elif (stats := devices.get(device_id)) is not None:
+                yield stats
+
+    def last_duration(self, name: str, device_id: str | None = None) -> float | None:
+        """Return the seconds the last call of an endpoint took."""
+        stats = self.get(name, device_id)
+        if stats is None or not stats.recent:
+            return None
+        return stats.recent[-1][1]
+
+    def median_latency(self, prefix: str, device_id: str | None = None) -> float | None:
+        """Return the median seconds of the recent calls of matching endpoints."""
+        durations = [
+            duration for stats in self._matching(prefix, device_id) for _, duration in stats.recent
+        ]
+        return statistics.median(durations) if durations else None
+
+    def rate(self, prefix: str, device_id: str | None = None) -> float:
+        """Return the recent calls per minute of matching endpoints."""
+        now = time.monotonic()
+        since = now - RATE_WINDOW
+        times = [
+            called for stats in self._matching(prefix, device_id)
+            for called, _ in stats.recent if called >= since
+        ]
+        if not times:
+            return 0.0
+        # Over at least a minute, so a burst does not read as a high rate
+        return len(times) / max(now - min(times), 60) * 60
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics per endpoint, in total and per device."""
+        elapsed = time.monotonic() - self._start
+        endpoints: dict[str, Any] = {}
+        for name, devices in sorted(self._stats.items()):
+            total = EndpointStats()
+            for stats in devices.values():
+                total.merge(stats)
+            endpoints[name] = {
+                **total.as_dict(elapsed),
+                "devices": {
+                    device_id: stats.as_dict(elapsed)
+                    for device_id, stats in sorted(devices.items()) if device_id
+                },
+            }
+        return {"uptime_s": round(elapsed, 1), "endpoints": endpoints}
+
+
+class _InstrumentedEndpoints:
+    """Proxy of an aiophyn endpoint group timing every call."""
+
+    def __init__(self, metrics: PhynMetrics, prefix: str, endpoints: Any) -> None:
+        self._metrics = metrics
+        self._prefix = prefix
+        self._endpoints = endpoints
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._endpoints, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        metrics = self._metrics
+        call_name = f"{self._prefix}.{name}"
+        per_device = self._prefix == "device"
+
+        async def measure_call(*args: Any, **kwargs: Any) -> Any:
+            with metrics.measure(call_name, args[0] if per_device and args else None):
+                return await attr(*args, **kwargs)
+
+        return measure_call
+
+
+class InstrumentedClient:
+    """Proxy of the aiophyn API recording statistics of the home and device calls."""
+
+    def __init__(self, client: Any, metrics: PhynMetrics) -> None:
+        """Wrap a client."""
+        self.client = client
+        self.home = _InstrumentedEndpoints(metrics, "home", client.home)
+        self.device = _InstrumentedEndpoints(metrics, "device", client.device)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
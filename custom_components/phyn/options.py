@@ -0,0 +1,86 @@
+"""Options of the phyn integration, which apply without a reload."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from typing import Any
+
+import voluptuous as vol
+
+CONF_POLL_INTERVAL_PHYN_PLUS = "poll_interval_phyn_plus"
+CONF_POLL_INTERVAL_CLASSIC = "poll_interval_classic"
+CONF_POLL_INTERVAL_WATER_SENSOR = "poll_interval_water_sensor"
+CONF_HEALTH_TEST_TTL = "health_test_ttl"
+CONF_FIRMWARE_TTL = "firmware_ttl"
+CONF_REFRESH_CONCURRENCY = "refresh_concurrency"
+CONF_FLOW_DEADBAND = "flow_deadband"
+CONF_PRESSURE_DEADBAND = "pressure_deadband"
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_ANALYTICS = "analytics"
+
+# Devices refreshed late by less than this are refreshed anyway
+POLL_SLACK = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class PhynOptions:
+    """Polling, concurrency and realtime options of a config entry."""
+
+    # Seconds between refreshes per device class
+    poll_interval_phyn_plus: int = 60
+    poll_interval_classic: int = 60
+    poll_interval_water_sensor: int = 60
+    # Seconds health tests and firmware information are reused for
+    health_test_ttl: int = 600
+    firmware_ttl: int = 3600
+    # Devices refreshed at the same time
+    refresh_concurrency: int = 1
+    # Realtime changes smaller than these do not write entity states
+    flow_deadband: float = 0.0
+    pressure_deadband: float = 0.0
+    temperature_deadband: float = 0.0
+    # Water-use detection, realtime samples, baselines and pressure decay
+    analytics: bool = True
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> PhynOptions:
+        """Create options from config entry options, defaulting missing ones."""
+        return cls(**{
+            field.name: options[field.name] for field in fields(cls) if field.name in options
+        })
+
+    @property
+    def update_interval(self) -> int:
+        """Return the seconds between coordinator refreshes."""
+        return min(
+            self.poll_interval_phyn_plus,
+            self.poll_interval_classic,
+            self.poll_interval_water_sensor,
+        )
+
+    @property
+    def deadbands(self) -> bool:
+        """Return True if any realtime deadband is set."""
+        return bool(self.flow_deadband or self.pressure_deadband or self.temperature_deadband)
+
+
+def options_schema(options: PhynOptions) -> vol.Schema:
+    """Return the options form, filled in with the current options."""
+    def integer(minimum: int, maximum: int) -> vol.All:
+        return vol.All(vol.Coerce(int), vol.Range(min=minimum, max=maximum))
+
+    def deadband(maximum: float) -> vol.All:
+        return vol.All(vol.Coerce(float), vol.Range(min=0, max=maximum))
+
+    return vol.Schema({
+        vol.Required(CONF_POLL_INTERVAL_PHYN_PLUS, default=options.poll_interval_phyn_plus): integer(15, 3600),
+        vol.Required(CONF_POLL_INTERVAL_CLASSIC, default=options.poll_interval_classic): integer(15, 3600),
+        vol.Required(CONF_POLL_INTERVAL_WATER_SENSOR, default=options.poll_interval_water_sensor): integer(15, 3600),
+        vol.Required(CONF_HEALTH_TEST_TTL, default=options.health_test_ttl): integer(60, 86400),
+        vol.Required(CONF_FIRMWARE_TTL, default=options.firmware_ttl): integer(600, 604800),
+        vol.Required(CONF_REFRESH_CONCURRENCY, default=options.refresh_concurrency): integer(1, 16),
+        vol.Required(CONF_FLOW_DEADBAND, default=options.flow_deadband): deadband(5),
+        vol.Required(CONF_PRESSURE_DEADBAND, default=options.pressure_deadband): deadband(20),
+        vol.Required(CONF_TEMPERATURE_DEADBAND, default=options.temperature_deadband): deadband(20),
+        vol.Required(CONF_ANALYTICS, default=options.analytics): bool,
+    })
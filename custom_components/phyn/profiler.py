@@ -0,0 +1,94 @@
+"""On-demand profiling of coordinator refreshes and realtime updates.
+
+cProfile is enabled while a profiled section runs. Sections are async, so
+anything else the event loop runs while one is suspended is profiled too.
+That is usually what slows the section down anyway.
+"""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+import pstats
+import time
+from typing import Any
+
+PROFILE_REFRESH = "refresh"
+PROFILE_UPDATE = "update"
+
+
+class PhynProfiler:
+    """Profile the next refreshes and realtime updates."""
+
+    def __init__(self, refreshes: int, updates: int) -> None:
+        """Initialize the profiler for a number of refreshes and updates."""
+        self._profile = cProfile.Profile()
+        self._remaining: dict[str, int] = {PROFILE_REFRESH: refreshes, PROFILE_UPDATE: updates}
+        self.profiled: dict[str, int] = {PROFILE_REFRESH: 0, PROFILE_UPDATE: 0}
+        self._depth = 0
+        self._start = time.monotonic()
+        self.duration: float | None = None
+        self.error: str | None = None
+        self.done = asyncio.Event()
+        if not any(self._remaining.values()):
+            self.done.set()
+
+    @contextmanager
+    def section(self, kind: str) -> Iterator[None]:
+        """Profile the enclosed block, if more sections of its kind are wanted."""
+        if self.done.is_set() or self._remaining[kind] <= 0:
+            yield
+            return
+        if self._depth == 0:
+            try:
+                self._profile.enable()
+            except ValueError as error:
+                # Another profiler, such as the profiler integration, is active
+                self.error = str(error)
+                self.stop()
+                yield
+                return
+        self._remaining[kind] -= 1
+        self.profiled[kind] += 1
+        self._depth += 1
+        try:
+            yield
+        finally:
+            # stop() may have ended profiling while the section was running
+            if self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._profile.disable()
+                    if not any(self._remaining.values()):
+                        self.stop()
+
+    def stop(self) -> None:
+        """Stop profiling, also when sections are still running."""
+        if self.done.is_set():
+            return
+        if self._depth:
+            self._profile.disable()
+            self._depth = 0
+        self.duration = time.monotonic() - self._start
+        self.done.set()
+
+    def write(self, path: Path, top: int) -> list[dict[str, Any]]:
+        """Write the stats for pstats or snakeviz and return the top hotspots.
+
+        Hotspots are the functions with the most time spent in their own
+        code. This does blocking I/O, run it in the executor.
+        """
+        self._profile.dump_stats(path)
+        stats = pstats.Stats(self._profile).stats  # type: ignore[attr-defined]
+        ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        return [
+            {
+                "function": f"{Path(filename).name}:{line}({name})",
+                "calls": calls,
+                "own_ms": round(own * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+            for (filename, line, name), (_, calls, own, cumulative, _) in ranked
+        ]
@@ -1,39 +1,195 @@
 """Services for the phyn integration"""
+from __future__ import annotations
 
+import asyncio
 import datetime
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from aiophyn.errors import RequestError
 import voluptuous as vol
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
-from homeassistant.helpers import config_validation as cv, device_registry as dr, entity_registry as er, entity_platform, service
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.service import async_extract_referenced_entity_ids
-from homeassistant.util.json import JsonObjectType
 
-from .const import CLIENT, DOMAIN, LOGGER
+from .const import DOMAIN, LOGGER
+from .devices.pp import PhynPlusDevice
+
+if TYPE_CHECKING:
+    from .devices.base import PhynDevice
 
-async def phyn_leak_test(service: ServiceCall):
-    """Handle the service call."""
-    entity = service.data['entity_id']
+# Leak tests started at the same time by one service call
+LEAK_TEST_CONCURRENCY = 4
 
+def _get_phyn_devices(service: ServiceCall) -> list[PhynDevice]:
+    """Return the Phyn devices of the entities, devices and areas targeted by a service call."""
+    coordinator = service.hass.data[DOMAIN]["coordinator"]
     ref = async_extract_referenced_entity_ids(service.hass, service)
-    entity_registry = er.async_get(service.hass)
-    device_registry = dr.async_get(service.hass)
-    
-    entity_id = ref.referenced.pop()
-    valve = entity_registry.async_get(entity_id)
-    device = device_registry.async_get(valve.device_id)
-    
-    device_id = None
-    extended_test = "true" if "extended" in service.data and service.data['extended'] else "false"
-    for x in device.identifiers:
-        if x[0] == "phyn":
-            device_id = x[1]
-            break
-    assert device_id is not None
-    
-    client = service.hass.data[DOMAIN][CLIENT]
-    LOGGER.debug("Running leak test for device_id: %s (extended: %s)", device_id, extended_test)
-    result = await client.device.run_leak_test(device_id, extended_test)
-    assert 'code' in result and result['code'] == 'success'
+    devices: dict[str, PhynDevice] = {}
+    for entity_id in (*ref.referenced, *ref.indirectly_referenced):
+        if (device := coordinator.get_device_by_entity_id(entity_id)) is not None:
+            devices.setdefault(device.id, device)
+    return list(devices.values())
+
+async def _async_run_leak_test(
+    device: PhynPlusDevice,
+    extended: bool,
+    wait_timeout: float | None,
+    semaphore: asyncio.Semaphore,
+) -> dict[str, Any]:
+    """Start a leak test on a device, optionally wait for it, and return its result."""
+    # Any error is reported for its device, so it does not drop the results of the others
+    async with semaphore:
+        try:
+            result = await device.async_run_leak_test(extended)
+        except RequestError as error:
+            LOGGER.error("Error starting leak test on %s: %s", device.id, error)
+            return {"success": False, "error": str(error)}
+        except Exception as error:
+            LOGGER.exception("Unexpected error starting leak test on %s", device.id)
+            return {"success": False, "error": repr(error)}
+    if result.get("code") != "success":
+        return {"success": False, "error": result.get("message", str(result))}
+    if wait_timeout is None:
+        return {"success": True}
+
+    try:
+        health_test = await device.async_wait_leak_test(wait_timeout)
+    except TimeoutError:
+        return {"success": True, "completed": False}
+    except RequestError as error:
+        return {"success": True, "completed": False, "error": str(error)}
+    except Exception as error:
+        LOGGER.exception("Unexpected error waiting for the leak test on %s", device.id)
+        return {"success": True, "completed": False, "error": repr(error)}
+    return {"success": True, "completed": True, "result": health_test}
+
+async def phyn_leak_test(service: ServiceCall) -> ServiceResponse:
+    """Start leak tests on every targeted Phyn Plus concurrently."""
+    devices = [
+        device for device in _get_phyn_devices(service)
+        if isinstance(device, PhynPlusDevice)
+    ]
+    if not devices:
+        raise ServiceValidationError("No Phyn Plus device targeted")
+
+    wait_timeout = service.data["timeout"] if service.data["wait"] else None
+    semaphore = asyncio.Semaphore(LEAK_TEST_CONCURRENCY)
+    results = await asyncio.gather(*(
+        _async_run_leak_test(device, service.data["extended"], wait_timeout, semaphore)
+        for device in devices
+    ))
+    response = {device.id: result for device, result in zip(devices, results)}
+    if service.return_response:
+        return {"results": response}
+
+    failed = [device_id for device_id, result in response.items() if not result["success"]]
+    if failed:
+        raise HomeAssistantError(f"Leak test failed to start on {', '.join(failed)}")
+    return None
+
+async def _async_apply_to_home(
+    service: ServiceCall, action: Callable[[PhynPlusDevice], Awaitable[None]]
+) -> ServiceResponse:
+    """Apply an action to every Phyn Plus of a home concurrently."""
+    home_id = service.data["home_id"]
+    coordinator = service.hass.data[DOMAIN]["coordinator"]
+    devices = [
+        device for device in coordinator.devices_for_home(home_id)
+        if isinstance(device, PhynPlusDevice)
+    ]
+    if not devices:
+        raise ServiceValidationError(f"No Phyn Plus devices in home {home_id}")
+
+    async def apply(device: PhynPlusDevice) -> dict[str, Any]:
+        # Any error is reported for its device, so the others are still applied and reported
+        try:
+            await action(device)
+        except RequestError as error:
+            LOGGER.error("Error applying %s to %s: %s", service.service, device.id, error)
+            return {"success": False, "error": str(error)}
+        except Exception as error:
+            LOGGER.exception("Unexpected error applying %s to %s", service.service, device.id)
+            return {"success": False, "error": repr(error)}
+        return {"success": True}
+
+    results = await asyncio.gather(*(apply(device) for device in devices))
+    response = {device.id: result for device, result in zip(devices, results)}
+    failed = [device_id for device_id, result in response.items() if not result["success"]]
+    if service.return_response:
+        return {"home_id": home_id, "failed": failed, "results": response}
+    if failed:
+        raise HomeAssistantError(
+            f"{service.service} failed on {len(failed)} of {len(devices)} devices: {', '.join(failed)}"
+        )
+    return None
+
+async def phyn_set_home_away_mode(service: ServiceCall) -> ServiceResponse:
+    """Set away mode on every Phyn Plus of a home."""
+    enabled = service.data["enabled"]
+    return await _async_apply_to_home(service, lambda device: device.set_away_mode(enabled))
+
+async def phyn_set_home_scheduled_leak_test(service: ServiceCall) -> ServiceResponse:
+    """Enable or disable scheduled leak tests on every Phyn Plus of a home."""
+    enabled = service.data["enabled"]
+    return await _async_apply_to_home(service, lambda device: device.set_scheduler_enabled(enabled))
+
+async def phyn_set_home_valve(service: ServiceCall) -> ServiceResponse:
+    """Open or close the valve of every Phyn Plus of a home."""
+    open_valve = service.data["open"]
+    return await _async_apply_to_home(service, lambda device: device.async_set_valve(open_valve))
+
+async def phyn_get_samples(service: ServiceCall) -> ServiceResponse:
+    """Return recent realtime samples downsampled to the requested resolution."""
+    devices = _get_phyn_devices(service)
+    device = devices[0] if devices else None
+    if not isinstance(device, PhynPlusDevice):
+        raise ServiceValidationError(f"No realtime samples available for {service.data['entity_id']}")
+
+    minutes = service.data["minutes"]
+    resolution = service.data["resolution"]
+    since = time.time() - minutes * 60
+    return {
+        "device_id": device.id,
+        "minutes": minutes,
+        "resolution": resolution,
+        "samples": device.samples.downsample(since, resolution),
+    }
+
+async def phyn_record_trace(service: ServiceCall) -> ServiceResponse:
+    """Record Phyn API calls and MQTT updates to a trace file."""
+    hass = service.hass
+    coordinator = hass.data[DOMAIN]["coordinator"]
+    if coordinator.trace_path is not None:
+        raise ServiceValidationError(f"A trace is already being recorded to {coordinator.trace_path}")
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = Path(hass.config.path(f"phyn_trace_{stamp}.jsonl.gz"))
+    await coordinator.async_start_trace(path, service.data["duration"])
+    return {"path": str(path), "duration": service.data["duration"]}
+
+async def phyn_profile(service: ServiceCall) -> ServiceResponse:
+    """Profile the next refreshes and realtime updates and return the hotspots."""
+    hass = service.hass
+    coordinator = hass.data[DOMAIN]["coordinator"]
+    if coordinator.profiler is not None:
+        raise ServiceValidationError("Profiling is already running")
+    if not service.data["refreshes"] and not service.data["updates"]:
+        raise ServiceValidationError("Nothing to profile, set refreshes or updates")
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = Path(hass.config.path(f"phyn_profile_{stamp}.prof"))
+    try:
+        return await coordinator.async_profile(
+            path,
+            service.data["refreshes"],
+            service.data["updates"],
+            service.data["timeout"],
+            service.data["top"],
+        )
+    except RuntimeError as error:
+        raise HomeAssistantError(str(error)) from error
 
 async def phyn_leak_test_service_setup(hass: HomeAssistant):
     """Setup service for phyn leak test"""
@@ -41,9 +197,69 @@ async def phyn_leak_test_service_setup(hass: HomeAssistant):
         DOMAIN,
         "leak_test",
         phyn_leak_test,
+        schema=cv.make_entity_service_schema({
+            vol.Optional("extended", default=False): cv.boolean,
+            vol.Optional("wait", default=False): cv.boolean,
+            vol.Optional("timeout", default=1800): vol.All(vol.Coerce(int), vol.Range(min=60, max=7200)),
+        }),
+        supports_response=SupportsResponse.OPTIONAL
+    )
+
+async def phyn_get_samples_service_setup(hass: HomeAssistant):
+    """Setup service for downsampled realtime samples"""
+    hass.services.async_register(
+        DOMAIN,
+        "get_samples",
+        phyn_get_samples,
         schema=vol.Schema({
-            vol.Optional("entity_id"): str,
-            vol.Optional("extended"): bool
+            vol.Required("entity_id"): str,
+            vol.Optional("minutes", default=10): vol.All(vol.Coerce(int), vol.Range(min=1, max=1440)),
+            vol.Optional("resolution", default=10): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=3600)),
         }),
-        supports_response=SupportsResponse.NONE
+        supports_response=SupportsResponse.ONLY
     )
+
+async def phyn_record_trace_service_setup(hass: HomeAssistant):
+    """Setup service for recording a trace of Phyn traffic"""
+    hass.services.async_register(
+        DOMAIN,
+        "record_trace",
+        phyn_record_trace,
+        schema=vol.Schema({
+            vol.Optional("duration", default=300): vol.All(vol.Coerce(int), vol.Range(min=10, max=86400)),
+        }),
+        supports_response=SupportsResponse.OPTIONAL
+    )
+
+async def phyn_profile_service_setup(hass: HomeAssistant):
+    """Setup service for profiling refreshes and realtime updates"""
+    hass.services.async_register(
+        DOMAIN,
+        "profile",
+        phyn_profile,
+        schema=vol.Schema({
+            vol.Optional("refreshes", default=3): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+            vol.Optional("updates", default=100): vol.All(vol.Coerce(int), vol.Range(min=0, max=10000)),
+            vol.Optional("timeout", default=600): vol.All(vol.Coerce(int), vol.Range(min=1, max=7200)),
+            vol.Optional("top", default=20): vol.All(vol.Coerce(int), vol.Range(min=1, max=200)),
+        }),
+        supports_response=SupportsResponse.OPTIONAL
+    )
+
+async def phyn_home_service_setup(hass: HomeAssistant):
+    """Setup services applying a setting to every device of a home"""
+    for name, handler, field in (
+        ("set_home_away_mode", phyn_set_home_away_mode, "enabled"),
+        ("set_home_scheduled_leak_test", phyn_set_home_scheduled_leak_test, "enabled"),
+        ("set_home_valve", phyn_set_home_valve, "open"),
+    ):
+        hass.services.async_register(
+            DOMAIN,
+            name,
+            handler,
+            schema=vol.Schema({
+                vol.Required("home_id"): cv.string,
+                vol.Required(field): cv.boolean,
+            }),
+            supports_response=SupportsResponse.OPTIONAL
+        )
@@ -0,0 +1,176 @@
+"""Opt-in recording of Phyn API and MQTT traffic.
+
+While a trace is recorded, every API call made through the coordinator's
+client and every MQTT update is appended to a gzip compressed JSON lines
+file. Each record has ``t``, the seconds since the trace started, and a
+``kind``:
+
+* ``header``: the trace version and wall clock start time
+* ``call``: ``name``, ``args`` and either ``result`` or ``error``
+* ``mqtt``: ``device_id`` and ``data``
+
+Personal data is redacted, so traces can be attached to issues and fed
+back with the replay driver in ``benchmarks/replay_trace.py``.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import gzip
+import json
+from pathlib import Path
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.core import HomeAssistant, callback
+
+from .const import LOGGER
+
+TRACE_VERSION = 1
+# Records buffered before they are written out
+FLUSH_RECORDS = 500
+
+REDACTED = "**REDACTED**"
+TO_REDACT = {
+    "access_token",
+    "address",
+    "email",
+    "first_name",
+    "id_token",
+    "ip",
+    "ip_address",
+    "last_name",
+    "latitude",
+    "longitude",
+    "mac",
+    "mac_address",
+    "password",
+    "phone",
+    "refresh_token",
+    "serial_number",
+    "ssid",
+    "token",
+    "user_id",
+    "username",
+    "wifi_ssid",
+}
+
+
+class TraceRecorder:
+    """Buffer trace records and append them to a gzip JSON lines file."""
+
+    def __init__(self, hass: HomeAssistant, path: Path, username: str | None = None) -> None:
+        """Initialize the recorder."""
+        self._hass = hass
+        self.path = path
+        self._username = username
+        self._start = time.monotonic()
+        self._lines: list[str] = []
+        self._write_lock = asyncio.Lock()
+        self.records = 0
+        self.async_record("header", version=TRACE_VERSION, started=time.time())
+
+    @callback
+    def async_record(self, kind: str, **fields: Any) -> None:
+        """Add a record to the trace."""
+        record = {
+            "t": round(time.monotonic() - self._start, 3),
+            "kind": kind,
+            **async_redact_data(fields, TO_REDACT),
+        }
+        self._lines.append(json.dumps(record, default=str, separators=(",", ":")))
+        self.records += 1
+        if len(self._lines) >= FLUSH_RECORDS:
+            self._hass.async_create_background_task(
+                self._async_write(self._take_lines()), "phyn trace write"
+            )
+
+    @callback
+    def async_record_call(self, name: str, args: tuple[Any, ...], **outcome: Any) -> None:
+        """Record an API call, redacting the account username from its arguments."""
+        self.async_record(
+            "call",
+            name=name,
+            args=[REDACTED if arg == self._username else arg for arg in args],
+            **outcome,
+        )
+
+    async def async_close(self) -> None:
+        """Write the remaining records."""
+        await self._async_write(self._take_lines())
+        LOGGER.info("Recorded %s records to %s", self.records, self.path)
+
+    def _take_lines(self) -> list[str]:
+        lines, self._lines = self._lines, []
+        return lines
+
+    async def _async_write(self, lines: list[str]) -> None:
+        """Append lines in order, without blocking the event loop."""
+        if not lines:
+            return
+        async with self._write_lock:
+            await self._hass.async_add_executor_job(self._write, lines)
+
+    def _write(self, lines: list[str]) -> None:
+        with gzip.open(self.path, "at", encoding="utf-8") as trace:
+            trace.write("\n".join(lines) + "\n")
+
+
+class _RecordingEndpoints:
+    """Proxy of an aiophyn endpoint group recording every call."""
+
+    def __init__(self, recorder: TraceRecorder, prefix: str, endpoints: Any) -> None:
+        self._recorder = recorder
+        self._prefix = prefix
+        self._endpoints = endpoints
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._endpoints, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        recorder = self._recorder
+        call_name = f"{self._prefix}.{name}"
+
+        async def record_call(*args: Any, **kwargs: Any) -> Any:
+            try:
+                result = await attr(*args, **kwargs)
+            except Exception as error:
+                recorder.async_record_call(call_name, args, error=f"{type(error).__name__}: {error}")
+                raise
+            recorder.async_record_call(call_name, args, result=result)
+            return result
+
+        return record_call
+
+
+class RecordingClient:
+    """Proxy of the aiophyn API recording the home and device calls."""
+
+    def __init__(self, client: Any, recorder: TraceRecorder) -> None:
+        """Wrap a client."""
+        self.client = client
+        self.home = _RecordingEndpoints(recorder, "home", client.home)
+        self.device = _RecordingEndpoints(recorder, "device", client.device)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+def unwrap_client(client: Any) -> Any:
+    """Return the aiophyn API behind a recording client."""
+    return client.client if isinstance(client, RecordingClient) else client
+
+
+def load_trace(path: Path) -> list[dict[str, Any]]:
+    """Read the records of a trace."""
+    with gzip.open(path, "rt", encoding="utf-8") as trace:
+        return [json.loads(line) for line in trace if line.strip()]
+
+
+def mqtt_recorder(recorder: Callable[[], TraceRecorder | None]) -> Callable[[str, dict[str, Any]], Any]:
+    """Return an MQTT update handler recording to the active recorder."""
+    async def record_update(device_id: str, data: dict[str, Any]) -> None:
+        if (active := recorder()) is not None:
+            active.async_record("mqtt", device_id=device_id, data=data)
+    return record_update
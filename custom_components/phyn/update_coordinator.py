@@ -1,73 +1,398 @@
 """Phyn device object."""
 from __future__ import annotations
 
+from contextlib import AbstractContextManager, nullcontext
 from datetime import timedelta
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from aiophyn.api import API
 from aiophyn.errors import RequestError
+import asyncio
 from asyncio import timeout
+import time
 
-from homeassistant.core import HomeAssistant
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.components.event import EventEntity
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.switch import SwitchEntity
+from homeassistant.components.update import UpdateEntity
+from homeassistant.components.valve import ValveEntity
+from homeassistant.const import Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import DOMAIN as PHYN_DOMAIN, LOGGER
+from .debug import CATEGORY_REFRESH, DEBUG
 
 
+from .devices.account import PhynAccount
 from .devices.pc import PhynClassicDevice
 from .devices.pp import PhynPlusDevice
 from .devices.pw import PhynWaterSensorDevice
+from .firmware import FirmwareCache
+from .metrics import InstrumentedClient, PhynMetrics
+from .options import POLL_SLACK, PhynOptions
+from .profiler import PROFILE_REFRESH, PROFILE_UPDATE, PhynProfiler
+from .trace import RecordingClient, TraceRecorder, mqtt_recorder, unwrap_client
 
 if TYPE_CHECKING:
     from .devices.base import PhynDevice
 
+PLATFORM_ENTITY_TYPES: tuple[tuple[Platform, type[Entity]], ...] = (
+    (Platform.BINARY_SENSOR, BinarySensorEntity),
+    (Platform.EVENT, EventEntity),
+    (Platform.SENSOR, SensorEntity),
+    (Platform.SWITCH, SwitchEntity),
+    (Platform.UPDATE, UpdateEntity),
+    (Platform.VALVE, ValveEntity),
+)
+
+# Time between looking for devices added to or removed from the account
+DISCOVERY_INTERVAL = timedelta(minutes=30)
+# Discoveries a device must be missing from before it is removed
+DISCOVERY_MISSES = 2
+
 class PhynDataUpdateCoordinator(DataUpdateCoordinator[None]):
     """Update coordinator for Phyn devices"""
     def __init__(
-        self, hass: HomeAssistant, api_client: API, 
-        update_interval: timedelta = timedelta(seconds=60)
+        self, hass: HomeAssistant, api_client: API,
+        update_interval: timedelta | None = None,
+        options: PhynOptions | None = None,
     ) -> None:
         """Initialize the device."""
         self.hass: HomeAssistant = hass
-        self.api_client: API = api_client
+        self.options: PhynOptions = options or PhynOptions()
+        self._last_polled: dict[str, float] = {}
+        self.metrics = PhynMetrics()
+        self.api_client: API = InstrumentedClient(api_client, self.metrics)
+        self.firmware = FirmwareCache()
         self._devices: list[PhynDevice] = []
+        self._entity_index: dict[str, PhynDevice] = {}
+        self.skipped_writes: int = 0
+        self.consecutive_failures: int = 0
+        self._device_failures: dict[str, int] = {}
+        self.account: PhynAccount | None = None
+        self.profiler: PhynProfiler | None = None
+        self._trace: TraceRecorder | None = None
+        self._trace_mqtt_handler: Any = None
+        self._cancel_trace_stop: CALLBACK_TYPE | None = None
+        self._platform_entities: dict[Platform, list[Entity]] = {
+            platform: [] for platform, _ in PLATFORM_ENTITY_TYPES
+        }
+        self._platform_callbacks: dict[Platform, AddEntitiesCallback] = {}
+        self._missing_devices: dict[str, int] = {}
 
         super().__init__(
             hass,
             LOGGER,
             name=f"{PHYN_DOMAIN}-coordinator",
-            update_interval=update_interval,
+            update_interval=update_interval or timedelta(seconds=self.options.update_interval),
         )
     
-    def add_device(self, home_id: str, device_id: str, product_code: str) -> None:
+    def add_device(self, home_id: str, device_id: str, product_code: str) -> PhynDevice | None:
         """Add a device to the coordinator."""
+        device: PhynDevice
         if product_code in ["PP1","PP2"]:
-            self._devices.append(
-                PhynPlusDevice(self, home_id, device_id, product_code)
-            )
+            device = PhynPlusDevice(self, home_id, device_id, product_code)
         elif product_code in ["PC1"]:
-            self._devices.append(
-                PhynClassicDevice(self, home_id, device_id, product_code)
-            )
+            device = PhynClassicDevice(self, home_id, device_id, product_code)
         elif product_code in ["PW1"]:
-            self._devices.append(
-                PhynWaterSensorDevice(self, home_id, device_id, product_code)
-            )
+            device = PhynWaterSensorDevice(self, home_id, device_id, product_code)
+        else:
+            return None
+
+        self._devices.append(device)
+        self._add_entities(device.entities)
+        return device
+
+    def add_account(self, entry_id: str, brand: str) -> PhynAccount:
+        """Add the account of the config entry, which has account-wide diagnostic entities."""
+        self.account = PhynAccount(self, entry_id, brand)
+        self._add_entities(self.account.entities)
+        return self.account
+
+    def _add_entities(self, entities: list[Entity]) -> None:
+        """Bucket entities by platform."""
+        for entity in entities:
+            for platform, entity_type in PLATFORM_ENTITY_TYPES:
+                if isinstance(entity, entity_type):
+                    self._platform_entities[platform].append(entity)
+                    break
+
+    def entities_for_platform(self, platform: Platform) -> list[Entity]:
+        """Return the entities of all devices that belong to a platform."""
+        return self._platform_entities[platform]
+
+    @callback
+    def async_add_platform(self, platform: Platform, async_add_entities: AddEntitiesCallback) -> None:
+        """Add the entities of a platform, and those of devices discovered later."""
+        self._platform_callbacks[platform] = async_add_entities
+        async_add_entities(self._platform_entities[platform])
+
+    @callback
+    def _async_forward_entities(self, entities: list[Entity]) -> None:
+        """Add the entities of a discovered device to the platforms already set up."""
+        for platform, entity_type in PLATFORM_ENTITY_TYPES:
+            platform_entities = [entity for entity in entities if isinstance(entity, entity_type)]
+            if platform_entities and (async_add_entities := self._platform_callbacks.get(platform)):
+                async_add_entities(platform_entities)
+
+    async def async_discover_devices(self, username: str) -> None:
+        """Add devices new to the account and remove those gone from it.
+
+        Devices that are already known are left alone. A device is only
+        removed after it was missing from several discoveries in a row,
+        so one incomplete answer does not drop it.
+        """
+        try:
+            homes = await self.api_client.home.get_homes(username)
+        except (RequestError, TimeoutError) as error:
+            LOGGER.debug("Could not discover devices: %s", error)
+            return
+
+        found: dict[str, tuple[str, str]] = {
+            device["device_id"]: (home["id"], device["product_code"])
+            for home in homes
+            for device in home["devices"]
+        }
+        for device_id, (home_id, product_code) in found.items():
+            self._missing_devices.pop(device_id, None)
+            if self.get_device(device_id) is None:
+                await self._async_add_discovered_device(home_id, device_id, product_code)
+        for device in list(self._devices):
+            if device.id in found:
+                continue
+            misses = self._missing_devices[device.id] = self._missing_devices.get(device.id, 0) + 1
+            if misses >= DISCOVERY_MISSES:
+                await self._async_remove_device(device)
+
+    async def _async_add_discovered_device(self, home_id: str, device_id: str, product_code: str) -> None:
+        """Refresh and set up a device new to the account, then add its entities."""
+        if (device := self.add_device(home_id, device_id, product_code)) is None:
+            return
+        try:
+            await self._async_update_device(device, asyncio.Semaphore(1))
+        except (TimeoutError, UpdateFailed) as error:
+            LOGGER.warning("Could not refresh new device %s, retrying with the next refresh: %s", device_id, error)
+        await device.async_setup()
+        self._async_forward_entities(device.entities)
+        LOGGER.info("Added %s device %s", product_code, device_id)
+
+    async def _async_remove_device(self, device: PhynDevice) -> None:
+        """Remove a device gone from the account, with its entities and registry entry."""
+        self._devices.remove(device)
+        entities = set(device.entities)
+        for platform, platform_entities in self._platform_entities.items():
+            self._platform_entities[platform] = [
+                entity for entity in platform_entities if entity not in entities
+            ]
+        self._last_polled.pop(device.id, None)
+        self._device_failures.pop(device.id, None)
+        self._missing_devices.pop(device.id, None)
+
+        await device.async_remove()
+        for entity in device.entities:
+            if entity.hass is not None:
+                await entity.async_remove(force_remove=True)
+        registry = dr.async_get(self.hass)
+        if (registry_device := registry.async_get_device(identifiers={(PHYN_DOMAIN, device.id)})) is not None:
+            registry.async_remove_device(registry_device.id)
+        LOGGER.info("Removed device %s, which is no longer in the account", device.id)
 
     @property
     def devices(self) -> list[PhynDevice]:
         """Return list of devices."""
         return self._devices
 
-    async def _async_update_data(self) -> None:
-        """Update data via library."""
+    def devices_for_home(self, home_id: str) -> list[PhynDevice]:
+        """Return the devices of a Phyn home."""
+        return [device for device in self._devices if device.home_id == home_id]
+
+    def get_device(self, device_id: str) -> PhynDevice | None:
+        """Return the device with the given Phyn device id."""
         for device in self._devices:
+            if device.id == device_id:
+                return device
+        return None
+
+    @callback
+    def async_index_entity(self, entity_id: str, device: PhynDevice) -> CALLBACK_TYPE:
+        """Index the device of an entity added to hass, for resolving service targets."""
+        self._entity_index[entity_id] = device
+
+        @callback
+        def remove_entity() -> None:
+            self._entity_index.pop(entity_id, None)
+
+        return remove_entity
+
+    def get_device_by_entity_id(self, entity_id: str) -> PhynDevice | None:
+        """Return the device of an entity added to hass."""
+        return self._entity_index.get(entity_id)
+
+    async def _async_update_data(self) -> None:
+        """Update data via library.
+
+        Entities listen on their own device, so only devices whose data
+        changed during the refresh write their entity states.
+        """
+        skipped_writes = 0
+        try:
+            with self.metrics.measure("refresh", None), self.profile(PROFILE_REFRESH):
+                now = time.monotonic()
+                semaphore = asyncio.Semaphore(self.options.refresh_concurrency)
+                results = await asyncio.gather(
+                    *(
+                        self._async_update_device(device, semaphore)
+                        for device in self._devices if self._poll_due(device, now)
+                    ),
+                    return_exceptions=True,
+                )
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+                    skipped_writes += result
+        except (TimeoutError, UpdateFailed):
+            self.consecutive_failures += 1
+            raise
+        else:
+            self.consecutive_failures = 0
+        finally:
+            self.skipped_writes = skipped_writes
+            DEBUG.event(CATEGORY_REFRESH, "Skipped %s unchanged entity writes", skipped_writes)
+
+    def _poll_due(self, device: PhynDevice, now: float) -> bool:
+        """Return True if a device is due for a refresh at its class poll interval."""
+        interval = getattr(self.options, device.POLL_INTERVAL_OPTION)
+        if interval <= self.options.update_interval:
+            return True
+        polled = self._last_polled.get(device.id)
+        return polled is None or now - polled >= interval - POLL_SLACK
+
+    async def _async_update_device(self, device: PhynDevice, semaphore: asyncio.Semaphore) -> int:
+        """Refresh a device and notify its listeners, returning the skipped writes."""
+        async with semaphore:
             try:
-                async with timeout(20):
-                    await device.async_update_data()
-            except (RequestError) as error:
-                raise UpdateFailed(error) from error
+                with self.metrics.measure("refresh.device", device.id):
+                    async with timeout(20):
+                        await device.async_update_data()
+            except (RequestError, TimeoutError, UpdateFailed) as error:
+                self._device_failures[device.id] = self._device_failures.get(device.id, 0) + 1
+                if isinstance(error, RequestError):
+                    raise UpdateFailed(error) from error
+                raise
+            self._device_failures[device.id] = 0
+            self._last_polled[device.id] = time.monotonic()
+            return device.async_update_listeners_if_changed()
+
+    @callback
+    def async_apply_options(self, options: PhynOptions) -> None:
+        """Apply changed options, the new interval from the next scheduled refresh."""
+        self.options = options
+        self.update_interval = timedelta(seconds=options.update_interval)
+        LOGGER.debug("Applied options: %s", options)
+
+    def device_failures(self, device_id: str) -> int:
+        """Return the consecutive refreshes in which a device failed to update."""
+        return self._device_failures.get(device_id, 0)
     
+    def profile(self, kind: str) -> AbstractContextManager[None]:
+        """Return a context profiling a refresh or realtime update, while profiling."""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.section(kind)
+
+    async def async_profile(
+        self, path: Path, refreshes: int, updates: int, wait: float, top: int
+    ) -> dict[str, Any]:
+        """Profile the next refreshes and realtime updates and write the stats to a file.
+
+        Waits at most ``wait`` seconds, then reports what was profiled so far.
+        No file is written if nothing was profiled by then.
+        """
+        if self.profiler is not None:
+            raise RuntimeError("Profiling is already running")
+        profiler = self.profiler = PhynProfiler(refreshes, updates)
+        LOGGER.info("Profiling %s refreshes and %s realtime updates", refreshes, updates)
+        try:
+            async with timeout(wait):
+                await profiler.done.wait()
+        except TimeoutError:
+            LOGGER.debug("Profiling timed out after %s seconds", wait)
+        finally:
+            profiler.stop()
+            self.profiler = None
+        if profiler.error is not None:
+            raise RuntimeError(f"Could not start profiling: {profiler.error}")
+        if not sum(profiler.profiled.values()):
+            LOGGER.warning("Nothing was profiled within %s seconds", wait)
+            return {
+                "path": None,
+                "duration": 0,
+                "refreshes": 0,
+                "updates": 0,
+                "hotspots": [],
+            }
+        hotspots = await self.hass.async_add_executor_job(profiler.write, path, top)
+        return {
+            "path": str(path),
+            "duration": round(profiler.duration or 0, 3),
+            "refreshes": profiler.profiled[PROFILE_REFRESH],
+            "updates": profiler.profiled[PROFILE_UPDATE],
+            "hotspots": hotspots,
+        }
+
+    @property
+    def trace_path(self) -> Path | None:
+        """Return the file of the trace being recorded."""
+        return self._trace.path if self._trace is not None else None
+
+    async def async_start_trace(self, path: Path, duration: float) -> None:
+        """Record API calls and MQTT updates to a trace for ``duration`` seconds."""
+        if self._trace is not None:
+            raise RuntimeError(f"A trace is already being recorded to {self._trace.path}")
+        client = self.api_client
+        recorder = TraceRecorder(self.hass, path, getattr(client, "username", None))
+        recorder.async_record("devices", devices=[
+            {"home_id": device.home_id, "device_id": device.id, "product_code": device.product_code}
+            for device in self._devices
+        ])
+        if self._trace_mqtt_handler is None:
+            # aiophyn has no way to remove a handler, so it is added once and stays idle
+            self._trace_mqtt_handler = mqtt_recorder(lambda: self._trace)
+            await client.mqtt.add_event_handler("update", self._trace_mqtt_handler)
+        self._trace = recorder
+        self.api_client = RecordingClient(client, recorder)
+        self._cancel_trace_stop = async_call_later(self.hass, duration, self._async_trace_expired)
+        # Device states are cached between refreshes, so a replay starts from these
+        for device in self._devices:
+            try:
+                await self.api_client.device.get_state(device.id)
+            except RequestError as error:
+                LOGGER.debug("Could not record the state of %s: %s", device.id, error)
+        LOGGER.info("Recording a trace to %s for %s seconds", path, duration)
+
+    async def _async_trace_expired(self, _now: Any) -> None:
+        self._cancel_trace_stop = None
+        await self.async_stop_trace()
+
+    async def async_stop_trace(self) -> Path | None:
+        """Stop recording and write out the trace, returning its file."""
+        if (recorder := self._trace) is None:
+            return None
+        if self._cancel_trace_stop is not None:
+            self._cancel_trace_stop()
+            self._cancel_trace_stop = None
+        self._trace = None
+        self.api_client = unwrap_client(self.api_client)
+        await recorder.async_close()
+        return recorder.path
+
     async def async_setup(self) -> None:
         """Setup devices."""
         for device in self._devices:
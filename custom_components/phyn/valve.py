@@ -2,9 +2,9 @@
 from __future__ import annotations
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.components.valve import ValveEntity
 
 from .const import DOMAIN as PHYN_DOMAIN
 
@@ -15,12 +15,4 @@ async def async_setup_entry(
 ) -> None:
     """Set up the Phyn switches from config entry."""
     coordinator = hass.data[PHYN_DOMAIN]["coordinator"]
-    entities = []
-    for device in coordinator.devices:
-        entities.extend([
-                entity
-                for entity in device.entities
-                if isinstance(entity, ValveEntity)
-        ])
-
-    async_add_entities(entities)
+    coordinator.async_add_platform(Platform.VALVE, async_add_entities)
@@ -0,0 +1,417 @@
+"""Offline stand-in for the aiophyn API and its MQTT client.
+
+``FakePhynAPI`` mirrors the parts of ``aiophyn.api.API`` the integration
+uses: ``home.get_homes``, the ``device`` endpoints and ``mqtt``. Every call
+can be given a simulated latency and error rate. MQTT updates, valve travel
+and leak tests are pushed to the registered handlers like the cloud would.
+
+    api = FakePhynAPI({"PP2": 10, "PW1": 2}, latency=0.05, error_rate=0.01)
+    coordinator = PhynDataUpdateCoordinator(hass, api)
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import itertools
+import random
+import time
+from typing import Any
+
+from aiophyn.errors import RequestError
+
+PRODUCT_CODES = ("PP1", "PP2", "PC1", "PW1")
+PHYN_PLUS_PRODUCTS = ("PP1", "PP2")
+
+
+@dataclass
+class FakeDevice:
+    """Simulated state of one Phyn device."""
+
+    device_id: str
+    product_code: str
+    home_id: str
+    sov_status: str = "Open"
+    flow: float = 0.0
+    pressure: float = 60.0
+    temperature: float = 65.0
+    consumption: float = 0.0
+    fw_version: str = "100"
+    preferences: dict[str, str] = field(default_factory=lambda: {
+        "leak_sensitivity_away_mode": "false",
+        "scheduler_enable": "true",
+    })
+    auto_shutoff: bool = True
+    health_tests: list[dict[str, Any]] = field(default_factory=list)
+
+    def state(self) -> dict[str, Any]:
+        """Return the payload of ``device.get_state``."""
+        state: dict[str, Any] = {
+            "device_id": self.device_id,
+            "product_code": self.product_code,
+            "serial_number": f"SN{self.device_id}",
+            "fw_version": self.fw_version,
+            "signal_strength": -50,
+            "online_status": {"v": "online"},
+            "name": None,
+        }
+        if self.product_code in PHYN_PLUS_PRODUCTS:
+            state.update({
+                "sov_status": {"v": self.sov_status},
+                "flow": {"v": self.flow, "ts": _now_ms()},
+                "pressure": {"mean": self.pressure},
+                "temperature": {"mean": self.temperature},
+            })
+        elif self.product_code == "PC1":
+            state.update({
+                "flow": {"v": self.flow, "ts": _now_ms()},
+                "pressure1": {"mean": self.pressure},
+                "pressure2": {"mean": self.pressure - 2},
+                "temperature1": {"mean": self.temperature},
+                "temperature2": {"mean": self.temperature + 40},
+                "cold_line_num": 1,
+                "hot_line_num": 2,
+            })
+        return state
+
+    def realtime(self) -> dict[str, Any]:
+        """Return an MQTT realtime update payload."""
+        return {
+            "flow": {"v": self.flow, "ts": _now_ms()},
+            "flow_state": {"v": "flow" if self.flow > 0 else "no_flow"},
+            "sov_state": self.sov_status,
+            "consumption": {"v": self.consumption},
+            "sensor_data": {
+                "pressure": {"v": self.pressure},
+                "temperature": {"v": self.temperature},
+            },
+        }
+
+
+def _now_ms() -> int:
+    """Return the current time in milliseconds, as the cloud timestamps readings."""
+    return int(time.time() * 1000)
+
+
+class FakePhynCloud:
+    """Shared state and call simulation behind the fake endpoints."""
+
+    def __init__(
+        self,
+        devices: dict[str, int],
+        homes: int,
+        latency: float,
+        jitter: float,
+        error_rate: float,
+        seed: int,
+    ) -> None:
+        """Create the simulated homes and devices."""
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.calls: Counter[str] = Counter()
+        self.valve_travel: float = 0.0
+        self.leak_test_duration: float = 0.0
+        self.devices: dict[str, FakeDevice] = {}
+
+        home_ids = itertools.cycle([f"home-{index}" for index in range(max(homes, 1))])
+        for product_code in PRODUCT_CODES:
+            for index in range(devices.get(product_code, 0)):
+                device_id = f"{product_code.lower()}-{index:04d}"
+                self.devices[device_id] = FakeDevice(device_id, product_code, next(home_ids))
+
+    async def call(self, name: str, result: Callable[[], Any]) -> Any:
+        """Simulate a request, with latency and random errors."""
+        self.calls[name] += 1
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            raise RequestError(f"Simulated error in {name}")
+        return result()
+
+    def device(self, device_id: str) -> FakeDevice:
+        """Return a simulated device."""
+        if device_id not in self.devices:
+            raise RequestError(f"Unknown device {device_id}")
+        return self.devices[device_id]
+
+
+class FakeHome:
+    """Fake of ``aiophyn.home.Home``."""
+
+    def __init__(self, cloud: FakePhynCloud) -> None:
+        """Initialize the endpoints."""
+        self._cloud = cloud
+
+    async def get_homes(self, user_id: str) -> list[dict[str, Any]]:
+        """Return the homes and their devices."""
+        def result() -> list[dict[str, Any]]:
+            homes: dict[str, dict[str, Any]] = {}
+            for device in self._cloud.devices.values():
+                home = homes.setdefault(
+                    device.home_id,
+                    {"id": device.home_id, "alias_name": device.home_id, "devices": []},
+                )
+                home["devices"].append(
+                    {"device_id": device.device_id, "product_code": device.product_code}
+                )
+            return list(homes.values())
+        return await self._cloud.call("home.get_homes", result)
+
+
+class FakeDeviceEndpoints:
+    """Fake of ``aiophyn.device.Device``."""
+
+    def __init__(self, cloud: FakePhynCloud, mqtt: FakeMQTT) -> None:
+        """Initialize the endpoints."""
+        self._cloud = cloud
+        self._mqtt = mqtt
+
+    async def _call(self, name: str, result: Callable[[], Any]) -> Any:
+        return await self._cloud.call(f"device.{name}", result)
+
+    async def get_state(self, device_id: str) -> dict[str, Any]:
+        return await self._call("get_state", lambda: self._cloud.device(device_id).state())
+
+    async def get_consumption(self, device_id: str, duration: str, *args: Any, **kwargs: Any) -> dict[str, Any]:
+        return await self._call("get_consumption", lambda: {
+            "device_id": device_id,
+            "duration": duration,
+            "water_consumption": round(self._cloud.device(device_id).consumption, 2),
+        })
+
+    async def get_water_usage_events(self, device_id: str, from_ts: int, to_ts: int) -> list[dict[str, Any]]:
+        return await self._call("get_water_usage_events", lambda: [])
+
+    async def get_water_statistics(self, device_id: str, from_ts: int, to_ts: int) -> list[dict[str, Any]]:
+        def result() -> list[dict[str, Any]]:
+            device = self._cloud.device(device_id)
+            return [{
+                "ts": to_ts,
+                "battery_level": 90,
+                "humidity": [{"value": 45.0}],
+                "temperature": [{"value": device.temperature}],
+                "alerts": {"high_humidity": False, "low_humidity": False, "low_temperature": False, "water": False},
+            }]
+        return await self._call("get_water_statistics", result)
+
+    async def open_valve(self, device_id: str) -> None:
+        await self._call("open_valve", lambda: self._cloud.device(device_id))
+        self._mqtt.move_valve(device_id, "Open")
+
+    async def close_valve(self, device_id: str) -> None:
+        await self._call("close_valve", lambda: self._cloud.device(device_id))
+        self._mqtt.move_valve(device_id, "Close")
+
+    async def get_away_mode(self, device_id: str) -> dict[str, Any]:
+        return await self._call("get_away_mode", lambda: {
+            "value": self._cloud.device(device_id).preferences["leak_sensitivity_away_mode"]
+        })
+
+    async def enable_away_mode(self, device_id: str) -> None:
+        await self._call("enable_away_mode", lambda: self._set(device_id, "leak_sensitivity_away_mode", "true"))
+
+    async def disable_away_mode(self, device_id: str) -> None:
+        await self._call("disable_away_mode", lambda: self._set(device_id, "leak_sensitivity_away_mode", "false"))
+
+    async def get_autoshuftoff_status(self, device_id: str) -> dict[str, Any]:
+        return await self._call("get_autoshuftoff_status", lambda: {
+            "auto_shutoff_enable": self._cloud.device(device_id).auto_shutoff
+        })
+
+    async def get_device_preferences(self, device_id: str) -> list[dict[str, Any]]:
+        return await self._call("get_device_preferences", lambda: [
+            {"device_id": device_id, "name": name, "value": value}
+            for name, value in self._cloud.device(device_id).preferences.items()
+        ])
+
+    async def get_health_tests(self, device_id: str) -> dict[str, Any]:
+        return await self._call("get_health_tests", lambda: {
+            "data": list(self._cloud.device(device_id).health_tests)
+        })
+
+    async def get_latest_firmware_info(self, device_id: str) -> list[dict[str, Any]]:
+        return await self._call("get_latest_firmware_info", lambda: [{
+            "fw_version": self._cloud.device(device_id).fw_version,
+            "release_notes": "https://example.com/release-notes",
+        }])
+
+    async def run_leak_test(self, device_id: str, extended_test: bool = False) -> dict[str, Any]:
+        await self._call("run_leak_test", lambda: self._cloud.device(device_id))
+        self._mqtt.run_leak_test(device_id)
+        return {"code": "success"}
+
+    async def set_autoshutoff_enabled(self, device_id: str, shutoff_on: bool, time: int | None = None) -> None:
+        def result() -> None:
+            self._cloud.device(device_id).auto_shutoff = shutoff_on
+        await self._call("set_autoshutoff_enabled", result)
+
+    async def set_device_preferences(self, device_id: str, data: list[dict[str, Any]]) -> None:
+        def result() -> None:
+            for item in data:
+                self._set(device_id, item["name"], item["value"])
+        await self._call("set_device_preferences", result)
+
+    def _set(self, device_id: str, name: str, value: str) -> None:
+        self._cloud.device(device_id).preferences[name] = value
+
+
+class FakeMQTT:
+    """Fake of ``aiophyn.mqtt.MQTTClient`` that pushes updates locally."""
+
+    def __init__(self, cloud: FakePhynCloud) -> None:
+        """Initialize the client."""
+        self._cloud = cloud
+        self._handlers: dict[str, list[Callable[[str, dict[str, Any]], Awaitable[None]]]] = {
+            "connect": [],
+            "disconnect": [],
+            "update": [],
+        }
+        self.topics: list[str] = []
+        self.connected: bool = False
+        self.published: int = 0
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def add_event_handler(self, type: str, target: Callable[..., Awaitable[None]]) -> bool | None:
+        if type not in self._handlers:
+            return False
+        if target in self._handlers[type]:
+            return True
+        self._handlers[type].append(target)
+        return None
+
+    async def connect(self) -> None:
+        self.connected = True
+
+    async def subscribe(self, topic: str) -> None:
+        self.topics.append(topic)
+
+    def disconnect(self) -> None:
+        self.connected = False
+
+    async def disconnect_and_wait(self, timeout: float | None = None) -> None:
+        self.disconnect()
+        for task in self._tasks:
+            task.cancel()
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    def subscribed(self, device_id: str) -> bool:
+        """Return True if updates of the device were subscribed to."""
+        return f"prd/app_subscriptions/{device_id}" in self.topics
+
+    async def push(self, device_id: str, data: dict[str, Any]) -> None:
+        """Deliver an update to the handlers, if the device is subscribed."""
+        if not self.subscribed(device_id):
+            return
+        self.published += 1
+        for handler in list(self._handlers["update"]):
+            await handler(device_id, data)
+
+    async def push_realtime(self, device_id: str, **changes: Any) -> None:
+        """Apply changes to the simulated device and push its realtime update."""
+        device = self._cloud.device(device_id)
+        for name, value in changes.items():
+            setattr(device, name, value)
+        await self.push(device_id, device.realtime())
+
+    async def stream(self, rate: float, count: int, devices: list[str] | None = None) -> int:
+        """Push ``count`` realtime updates at ``rate`` messages per second.
+
+        Messages are spread round-robin over the given (or all Phyn Plus)
+        devices with random flow and pressure readings. A rate of zero
+        pushes as fast as possible. Returns the number of messages sent.
+        """
+        cloud = self._cloud
+        targets = devices or [
+            device.device_id for device in cloud.devices.values()
+            if device.product_code in PHYN_PLUS_PRODUCTS
+        ]
+        interval = 1 / rate if rate else 0
+        start = time.monotonic()
+        for index in range(count):
+            device_id = targets[index % len(targets)]
+            flow = cloud.random.choice((0.0, 0.0, cloud.random.uniform(0.1, 3.0)))
+            device = cloud.device(device_id)
+            await self.push_realtime(
+                device_id,
+                flow=flow,
+                pressure=60 + cloud.random.uniform(-2, 2),
+                consumption=device.consumption + flow / 60,
+            )
+            if interval:
+                delay = start + (index + 1) * interval - time.monotonic()
+                await asyncio.sleep(max(delay, 0))
+            elif index % 100 == 99:
+                await asyncio.sleep(0)
+        return count
+
+    async def settle(self) -> None:
+        """Wait until simulated valve travel and leak tests have finished."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    def move_valve(self, device_id: str, target: str) -> None:
+        """Simulate valve travel, reporting Partial before the target status."""
+        self._spawn(self._async_transition(device_id, "Partial", target, self._cloud.valve_travel))
+
+    def run_leak_test(self, device_id: str) -> None:
+        """Simulate a leak test, reporting LeakExp until it ends and adding its result."""
+        device = self._cloud.device(device_id)
+        device.health_tests.append({
+            "end_time": _now_ms() + int(self._cloud.leak_test_duration * 1000),
+            "is_leak": False,
+            "is_warn": False,
+        })
+        self._spawn(self._async_transition(
+            device_id, "LeakExp", device.sov_status, self._cloud.leak_test_duration
+        ))
+
+    async def _async_transition(self, device_id: str, during: str, target: str, duration: float) -> None:
+        await self.push_realtime(device_id, sov_status=during)
+        await asyncio.sleep(duration)
+        await self.push_realtime(device_id, sov_status=target)
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class FakePhynAPI:
+    """Fake of ``aiophyn.api.API`` backed by simulated devices.
+
+    ``devices`` maps product codes (PP1, PP2, PC1, PW1) to how many devices
+    of each to create, spread round-robin over ``homes`` homes.
+    """
+
+    def __init__(
+        self,
+        devices: dict[str, int] | None = None,
+        *,
+        homes: int = 1,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        username: str = "user@example.com",
+    ) -> None:
+        """Initialize the fake API."""
+        self.cloud = FakePhynCloud(devices or {"PP2": 1}, homes, latency, jitter, error_rate, seed)
+        self.mqtt = FakeMQTT(self.cloud)
+        self.home = FakeHome(self.cloud)
+        self.device = FakeDeviceEndpoints(self.cloud, self.mqtt)
+        self._username = username
+
+    @property
+    def username(self) -> str:
+        """Return the API username."""
+        return self._username
+
+    async def async_authenticate(self, *, allow_refresh: bool = True) -> None:
+        """Authenticate, which always succeeds."""
+        await self.cloud.call("async_authenticate", lambda: None)
@@ -0,0 +1,134 @@
+"""Replay of traces recorded by ``custom_components.phyn.trace``.
+
+``ReplayPhynAPI`` stands in for ``aiophyn.api.API``: every API call is
+answered with the results recorded for the same endpoint and device, in
+order, repeating the last one once they run out. Recorded errors are raised
+again as ``RequestError``. Calls the trace has no result for, such as the
+hourly firmware check, are answered by simulated devices of ``FakePhynAPI``
+with the recorded ids. ``async_replay`` pushes the recorded MQTT
+updates at their original timing, or faster.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict, deque
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+import time
+from typing import Any
+
+from aiophyn.errors import RequestError
+
+from custom_components.phyn.trace import load_trace
+
+from .fake_phyn import FakeDevice, FakePhynAPI
+
+
+class _ReplayEndpoints:
+    """Endpoint group answering calls with recorded results."""
+
+    def __init__(self, api: ReplayPhynAPI, prefix: str) -> None:
+        self._api = api
+        self._prefix = prefix
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        call_name = f"{self._prefix}.{name}"
+
+        async def replay_call(*args: Any, **kwargs: Any) -> Any:
+            device_id = args[0] if args and self._prefix == "device" else None
+            if self._api.recorded(call_name, device_id):
+                return self._api.answer(call_name, device_id)
+            self._api.unanswered.append(call_name)
+            simulated = getattr(self._api.simulator, self._prefix)
+            return await getattr(simulated, name)(*args, **kwargs)
+
+        return replay_call
+
+
+class ReplayPhynAPI:
+    """Fake of ``aiophyn.api.API`` answering from a recorded trace."""
+
+    def __init__(self, records: list[dict[str, Any]], username: str = "user@example.com") -> None:
+        """Index the records of a trace."""
+        self.records = records
+        self.simulator = FakePhynAPI({}, username=username)
+        self.mqtt = self.simulator.mqtt
+        self.home = _ReplayEndpoints(self, "home")
+        self.device = _ReplayEndpoints(self, "device")
+        self.username = username
+        # Calls answered by the simulated devices
+        self.unanswered: list[str] = []
+        self._answers: dict[tuple[str, Any], deque[dict[str, Any]]] = defaultdict(deque)
+        devices: list[dict[str, Any]] = []
+        for record in records:
+            if record["kind"] == "call":
+                key = record["args"][0] if record["args"] and record["name"].startswith("device.") else None
+                self._answers[(record["name"], key)].append(record)
+            elif record["kind"] == "devices":
+                devices = record["devices"]
+        homes: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for device in devices:
+            self.simulator.cloud.devices[device["device_id"]] = FakeDevice(
+                device["device_id"], device["product_code"], device["home_id"]
+            )
+            homes[device["home_id"]].append(
+                {"device_id": device["device_id"], "product_code": device["product_code"]}
+            )
+        # Setup is answered from the device list, the trace may start later
+        self._answers[("home.get_homes", None)] = deque([{
+            "result": [{"id": home_id, "devices": home_devices} for home_id, home_devices in homes.items()]
+        }])
+
+    @classmethod
+    def from_file(cls, path: Path) -> ReplayPhynAPI:
+        """Load a trace file."""
+        return cls(load_trace(path))
+
+    @property
+    def mqtt_records(self) -> list[dict[str, Any]]:
+        """Return the recorded MQTT updates."""
+        return [record for record in self.records if record["kind"] == "mqtt"]
+
+    @property
+    def duration(self) -> float:
+        """Return the trace time of the last record."""
+        return self.records[-1]["t"] if self.records else 0.0
+
+    def recorded(self, name: str, device_id: str | None) -> bool:
+        """Return True if the trace has results of a call."""
+        return bool(self._answers.get((name, device_id)))
+
+    def answer(self, name: str, device_id: str | None) -> Any:
+        """Return the next recorded result of a call."""
+        answers = self._answers[(name, device_id)]
+        record = answers.popleft() if len(answers) > 1 else answers[0]
+        if "error" in record:
+            raise RequestError(record["error"])
+        return record.get("result")
+
+    async def async_authenticate(self, *, allow_refresh: bool = True) -> None:
+        """Authenticate, which always succeeds."""
+
+    async def async_replay(
+        self,
+        speed: float = 1.0,
+        on_time: Callable[[float], Awaitable[None]] | None = None,
+    ) -> int:
+        """Push the recorded MQTT updates and return how many were pushed.
+
+        Updates are pushed at their recorded time divided by ``speed``; a
+        speed of zero pushes them as fast as possible. ``on_time`` is awaited
+        with the trace time before each update, so callers can interleave
+        refreshes deterministically.
+        """
+        start = time.monotonic()
+        pushed = 0
+        for record in self.mqtt_records:
+            if speed:
+                delay = start + record["t"] / speed - time.monotonic()
+                await asyncio.sleep(max(delay, 0))
+            if on_time is not None:
+                await on_time(record["t"])
+            await self.mqtt.push(record["device_id"], record["data"])
+            pushed += 1
+        return pushed
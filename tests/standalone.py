@@ -0,0 +1,33 @@
+"""Import the integration's pure Python modules without Home Assistant.
+
+The ``custom_components.phyn`` package and its ``devices`` subpackage
+import Home Assistant when they are initialized. The analytics and state
+modules do not need it. This loads a subpackage as a top-level package
+without running any ``__init__`` file, so tests of those modules also run
+where Home Assistant is not installed:
+
+    water_use = import_standalone("analytics", "water_use")
+"""
+from __future__ import annotations
+
+import importlib
+import importlib.machinery
+from pathlib import Path
+import sys
+from types import ModuleType
+
+INTEGRATION = Path(__file__).parent.parent / "custom_components" / "phyn"
+
+
+def import_standalone(subpackage: str, module: str) -> ModuleType:
+    """Import ``custom_components/phyn/<subpackage>/<module>.py``.
+
+    Relative imports within the subpackage work. Imports from the
+    integration package do not.
+    """
+    package = f"phyn_standalone_{subpackage}"
+    if package not in sys.modules:
+        spec = importlib.machinery.ModuleSpec(package, None, is_package=True)
+        spec.submodule_search_locations = [str(INTEGRATION / subpackage)]
+        sys.modules[package] = importlib.util.module_from_spec(spec)
+    return importlib.import_module(f"{package}.{module}")
@@ -0,0 +1,54 @@
+"""Tests for the hour-of-week baseline anomaly detector."""
+from datetime import datetime, timezone
+
+import pytest
+
+from .standalone import import_standalone
+
+baseline = import_standalone("analytics", "baseline")
+BaselineAnomalyDetector = baseline.BaselineAnomalyDetector
+HourOfWeekStats = baseline.HourOfWeekStats
+
+WEEK = 7 * 24 * 3600
+START = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+def test_welford_statistics():
+    """Test running mean and variance match the batch values."""
+    stats = HourOfWeekStats()
+    for value in (2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0):
+        stats.update(3, value)
+
+    assert stats.count[3] == 8
+    assert stats.mean[3] == pytest.approx(5.0)
+    assert stats.std(3) == pytest.approx(2.138, abs=1e-3)
+    assert stats.count[4] == 0
+
+    restored = HourOfWeekStats.from_dict(stats.as_dict())
+    assert restored.mean[3] == pytest.approx(5.0)
+
+
+def test_continuous_flow_anomaly():
+    """Test an hour of uninterrupted flow is flagged against a dry baseline."""
+    detector = BaselineAnomalyDetector(timezone.utc)
+
+    for week in range(3):
+        base = START + week * WEEK
+        detector.add_sample(base + 60, flow=0.0, pressure=60.0)
+        detector.add_sample(base + 600, flow=1.0, pressure=58.0)
+        detector.add_sample(base + 900, flow=0.0, pressure=60.0)
+        detector.advance(base + 3600)
+        assert not detector.continuous_flow
+
+    base = START + 3 * WEEK
+    # Flow starts before the hour and never stops
+    detector.add_sample(base - 60, flow=0.5, pressure=60.0)
+    detector.advance(base)
+    detector.add_sample(base + 1800, flow=0.8, pressure=59.0)
+    assert detector.advance(base + 3600)
+    assert detector.continuous_flow
+    assert not detector.pressure_decay
+
+    restored = BaselineAnomalyDetector(timezone.utc)
+    restored.restore(detector.as_dict())
+    assert restored.baseline(START)["observations"] == 3
@@ -0,0 +1,46 @@
+"""Tests for sampled debug logging."""
+import logging
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.phyn.debug import DebugTracer, summarize  # noqa: E402
+
+
+class _Unformattable:
+    """Payload failing if it is ever formatted."""
+
+    def __repr__(self) -> str:
+        raise AssertionError("formatted while debug logging is off")
+
+
+def test_sampling_per_category(caplog):
+    """Test each category logs its fraction of events, with capped payloads."""
+    logger = logging.getLogger("phyn_debug_test")
+    tracer = DebugTracer(logger, {"mqtt": 0.25, "command": 1.0, "refresh": 0})
+
+    with caplog.at_level(logging.DEBUG, logger="phyn_debug_test"):
+        for index in range(8):
+            tracer.event("mqtt", "Update %s", index, data={"flow": index})
+        tracer.event("command", "Open valve", state="x" * 1000)
+        tracer.event("refresh", "Refreshed")
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages[:2] == ["[mqtt] Update 0 data={'flow': 0}", "[mqtt] Update 4 data={'flow': 4}"]
+    assert len(messages) == 3
+    assert messages[2].endswith("...(+702 chars)")
+    assert caplog.records[2].phyn_category == "command"
+    assert tracer.rate("mqtt") == 0.25
+
+
+def test_lazy_when_disabled(caplog):
+    """Test payloads are not formatted when debug logging is off."""
+    logger = logging.getLogger("phyn_debug_test_off")
+    tracer = DebugTracer(logger, {"mqtt": 1.0})
+
+    with caplog.at_level(logging.INFO, logger="phyn_debug_test_off"):
+        tracer.event("mqtt", "Update", data=_Unformattable())
+
+    assert not caplog.records
+    assert summarize("abc", 2) == "'a...(+3 chars)"
@@ -0,0 +1,43 @@
+"""Tests for the valve-closed pressure decay analysis."""
+import pytest
+
+from .standalone import import_standalone
+
+np = pytest.importorskip("numpy")
+
+decay = import_standalone("analytics", "decay")
+PressureDecayAnalyzer = decay.PressureDecayAnalyzer
+fit_decay = decay.fit_decay
+SampleRingBuffer = import_standalone("analytics", "samples").SampleRingBuffer
+
+
+def test_fit_decay_ignores_missing_values():
+    """Test the fit recovers a linear decay with gaps in the data."""
+    ts = np.arange(0.0, 600.0, 10.0)
+    pressure = 60.0 - 0.5 * ts / 60
+    pressure[::3] = np.nan
+
+    rate, r_squared, count = fit_decay(ts, pressure)
+
+    assert rate == pytest.approx(0.5)
+    assert r_squared == pytest.approx(1.0)
+    assert count == 40
+
+
+def test_analyzer_fits_closed_window():
+    """Test a fit is produced when the valve opens again."""
+    samples = SampleRingBuffer(256)
+    analyzer = PressureDecayAnalyzer()
+
+    assert not analyzer.update(1000.0, True, samples)
+    for i in range(10):
+        ts = 1000.0 + i * 10
+        samples.append(ts, pressure=60.0 - i * 0.1)
+        analyzer.update(ts, True, samples)
+    assert analyzer.window_active
+
+    assert analyzer.update(1120.0, False, samples)
+    assert not analyzer.window_active
+    assert analyzer.fit is not None
+    assert analyzer.fit.rate == pytest.approx(0.6)
+    assert analyzer.fit.samples == 10
@@ -0,0 +1,107 @@
+"""Tests for API statistics and config entry diagnostics."""
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("numpy")
+
+from custom_components.phyn.const import DOMAIN  # noqa: E402
+from custom_components.phyn.diagnostics import async_get_config_entry_diagnostics  # noqa: E402
+from custom_components.phyn.metrics import EndpointStats, PhynMetrics  # noqa: E402
+
+from .fake_phyn import FakePhynAPI  # noqa: E402
+
+
+def test_histogram_buckets():
+    """Test latencies are counted in bounded buckets."""
+    stats = EndpointStats()
+    for duration in (0.0005, 0.02, 0.02, 0.3, 30.0):
+        stats.add(duration)
+    stats.add(0.02, RuntimeError("offline"))
+
+    assert stats.calls == 6
+    assert stats.errors == 1
+    assert len(stats.buckets) == 14
+    assert stats.percentile(0.5) == 25
+    assert stats.percentile(1.0) == 30000.0
+    summary = stats.as_dict(60)
+    assert summary["calls_per_minute"] == 6
+    assert summary["histogram"] == {"<=1ms": 1, "<=25ms": 3, "<=500ms": 1, ">20000ms": 1}
+    assert summary["last_error"] == "RuntimeError: offline"
+
+
+def test_measure_counts_errors():
+    """Test measured blocks record their duration and errors."""
+    metrics = PhynMetrics()
+    with metrics.measure("device.get_state", "device"):
+        pass
+    with pytest.raises(RuntimeError), metrics.measure("device.get_state", "device"):
+        raise RuntimeError("offline")
+
+    stats = metrics.get("device.get_state", "device")
+    assert stats is not None
+    assert (stats.calls, stats.errors) == (2, 1)
+
+
+async def test_config_entry_diagnostics(hass, setup_fake_api):
+    """Test diagnostics report statistics per endpoint and device, redacted."""
+    api = FakePhynAPI({"PP2": 1, "PC1": 1})
+    coordinator = await setup_fake_api(api)
+    await api.mqtt.push_realtime("pp2-0000", flow=1.0)
+    hass.data[DOMAIN] = {"coordinator": coordinator}
+    entry = MagicMock(data={"username": api.username, "password": "secret", "Brand": "phyn"})
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["password"] == "**REDACTED**"
+    endpoints = diagnostics["api"]["endpoints"]
+    assert endpoints["device.get_state"]["calls"] == 2
+    assert set(endpoints["device.get_state"]["devices"]) == {"pp2-0000", "pc1-0000"}
+    assert endpoints["mqtt.update"]["devices"]["pp2-0000"]["calls"] == 1
+    devices = {device["id"]: device for device in diagnostics["devices"]}
+    assert devices["pp2-0000"]["state"]["serial_number"] == "**REDACTED**"
+    assert devices["pp2-0000"]["state"]["flow"] == 1.0
+    assert "water_usage" in devices["pc1-0000"]
+
+
+async def test_diagnostic_sensor_values(setup_fake_api):
+    """Test diagnostic sensors read the instrumentation data."""
+    api = FakePhynAPI({"PP2": 1})
+    coordinator = await setup_fake_api(api)
+    account = coordinator.add_account("entry", "phyn")
+    device = coordinator.devices[0]
+    await api.mqtt.push_realtime(device.id, flow=1.0)
+
+    assert device.refresh_duration is not None
+    assert device.api_latency is not None
+    assert device.consecutive_failures == 0
+    assert device.mqtt_message_age is not None and device.mqtt_message_age < 1
+    assert device.mqtt_messages_per_minute == 1.0
+    assert account.refresh_duration >= device.refresh_duration
+    assert account.mqtt_messages_per_minute == 1.0
+    diagnostic = [entity for entity in device.entities if entity.unique_id == f"{device.id}_api_latency"]
+    assert diagnostic and not diagnostic[0].entity_description.entity_registry_enabled_default
+    assert {entity.unique_id for entity in account.entities} >= {"account_entry_consecutive_failures"}
+
+    api.cloud.error_rate = 1.0
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert account.consecutive_failures == 2
+    assert device.consecutive_failures == 2
+
+
+async def test_diagnostic_sensor_resolves_service_targets(hass, setup_fake_api):
+    """Test diagnostic sensors are indexed, so services targeting them find their device."""
+    api = FakePhynAPI({"PP2": 1})
+    coordinator = await setup_fake_api(api)
+    device = coordinator.devices[0]
+    sensor = next(entity for entity in device.entities if entity.unique_id == f"{device.id}_api_latency")
+    sensor.hass = hass
+    sensor.entity_id = "sensor.api_latency"
+
+    await sensor.async_added_to_hass()
+    assert coordinator.get_device_by_entity_id("sensor.api_latency") is device
+
+    await sensor.async_remove()
+    assert coordinator.get_device_by_entity_id("sensor.api_latency") is None
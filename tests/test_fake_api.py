@@ -0,0 +1,163 @@
+"""Tests running the coordinator and devices against the offline fake API."""
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("numpy")
+
+from homeassistant.const import Platform  # noqa: E402
+
+from custom_components.phyn.devices.pp import PhynPlusDevice  # noqa: E402
+from custom_components.phyn.options import PhynOptions  # noqa: E402
+from custom_components.phyn.update_coordinator import PhynDataUpdateCoordinator  # noqa: E402
+
+from .fake_phyn import FakeDevice, FakePhynAPI  # noqa: E402
+
+
+async def test_refresh_all_products(setup_fake_api):
+    """Test every product refreshes from the fake API."""
+    api = FakePhynAPI({"PP1": 1, "PP2": 2, "PC1": 1, "PW1": 1}, homes=2)
+    coordinator = await setup_fake_api(api)
+
+    assert coordinator.last_update_success
+    assert len(coordinator.devices) == 5
+    assert {device.home_id for device in coordinator.devices} == {"home-0", "home-1"}
+    assert all(device.available for device in coordinator.devices)
+    assert api.cloud.calls["device.get_state"] == 5
+
+
+async def test_mqtt_stream_and_valve(setup_fake_api):
+    """Test pushed updates reach the devices and valve travel is reported."""
+    api = FakePhynAPI({"PP2": 2})
+    coordinator = await setup_fake_api(api)
+    device = coordinator.devices[0]
+    assert isinstance(device, PhynPlusDevice)
+
+    assert await api.mqtt.stream(rate=0, count=10) == 10
+    assert len(device.samples.window(0)[0]) == 5
+
+    await device.async_set_valve(False)
+    await api.mqtt.settle()
+    await asyncio.sleep(0)
+    assert device.valve_closed
+    assert device.valve_confirmation["confirmed_by"] == "mqtt"
+
+
+async def test_flow_state_closes_water_use_event(setup_fake_api):
+    """Test a no-flow state closes the water-use event when no zero flow follows."""
+    api = FakePhynAPI({"PP2": 1})
+    coordinator = await setup_fake_api(api)
+    device = coordinator.devices[0]
+    events = []
+    device.async_add_water_use_listener(events.append)
+
+    await api.mqtt.push(device.id, {"flow": {"v": 2.0, "ts": (time.time() - 60) * 1000}})
+    assert not events
+    await api.mqtt.push(device.id, {"flow_state": {"v": "no_flow"}})
+
+    assert len(events) == 1
+    assert events[0].volume > 1
+
+
+async def test_realtime_updates_take_no_snapshot(setup_fake_api):
+    """Test realtime updates skip the snapshot, and the next refresh writes again."""
+    api = FakePhynAPI({"PP2": 1})
+    coordinator = await setup_fake_api(api)
+    device = coordinator.devices[0]
+    device.snapshot = MagicMock(wraps=device.snapshot)
+    writes = []
+    remove = device.async_add_listener(lambda: writes.append(1))
+
+    await api.mqtt.stream(rate=0, count=5)
+    assert len(writes) == 5
+    device.snapshot.assert_not_called()
+
+    await coordinator.async_refresh()
+    assert len(writes) == 6
+    await coordinator.async_refresh()
+    assert len(writes) == 6
+    remove()
+
+
+async def test_simulated_errors(hass):
+    """Test simulated request errors fail the refresh."""
+    api = FakePhynAPI({"PP2": 1}, error_rate=1.0)
+    coordinator = PhynDataUpdateCoordinator(hass, api)
+    coordinator.add_device("home-0", "pp2-0000", "PP2")
+
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
+
+
+async def test_device_discovery(monkeypatch, setup_fake_api):
+    """Test discovery adds new devices and removes missing ones, leaving the others alone."""
+    api = FakePhynAPI({"PP2": 2})
+    coordinator = await setup_fake_api(api)
+    added = []
+    for platform in (Platform.SENSOR, Platform.VALVE):
+        coordinator.async_add_platform(platform, added.extend)
+    kept, gone = coordinator.devices
+    # Reconnects subscribe to the topics again
+    api.mqtt.topics.append(f"prd/app_subscriptions/{gone.id}")
+    added.clear()
+    state_calls = api.cloud.calls["device.get_state"]
+    # Pending work of the device that goes away, which no longer reports anything
+    monkeypatch.setattr(api.mqtt, "move_valve", lambda device_id, target: None)
+    monkeypatch.setattr(api.mqtt, "run_leak_test", lambda device_id: None)
+    await gone.async_run_leak_test()
+    leak_test = asyncio.ensure_future(gone.async_wait_leak_test(60))
+    preference = asyncio.ensure_future(gone.set_away_mode(True))
+    await gone.async_set_valve(False)
+    confirm_task = gone._valve_confirm_task
+    await asyncio.sleep(0)
+
+    api.cloud.devices["pw1-0000"] = FakeDevice("pw1-0000", "PW1", "home-0")
+    del api.cloud.devices[gone.id]
+    await coordinator.async_discover_devices(api.username)
+
+    new = coordinator.get_device("pw1-0000")
+    assert new is not None and new.available
+    assert added and all(entity in new.entities for entity in added)
+    # Only the new device was refreshed
+    assert api.cloud.calls["device.get_state"] == state_calls + 1
+    assert coordinator.get_device(gone.id) is gone
+
+    await coordinator.async_discover_devices(api.username)
+
+    assert coordinator.devices == [kept, new]
+    await asyncio.sleep(0)
+    assert confirm_task is not None and confirm_task.cancelled()
+    for waiter in (leak_test, preference):
+        with pytest.raises(RuntimeError, match="removed"):
+            await waiter
+    assert gone._preference_writer._timer is None
+    assert not gone._optimistic.is_pending("valve")
+    assert not api.mqtt.subscribed(gone.id)
+    assert f"prd/app_subscriptions/{gone.id}" not in api.mqtt.topics
+    assert api.mqtt.subscribed(kept.id)
+    assert not set(gone.entities) & set(coordinator.entities_for_platform(Platform.SENSOR))
+
+
+async def test_firmware_shared_per_product_code(hass):
+    """Test devices of a product code share one firmware request per TTL."""
+    api = FakePhynAPI({"PP2": 1, "PW1": 3})
+    coordinator = PhynDataUpdateCoordinator(hass, api, options=PhynOptions(refresh_concurrency=4))
+    for home in await api.home.get_homes(api.username):
+        for device in home["devices"]:
+            coordinator.add_device(home["id"], device["device_id"], device["product_code"])
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+
+    assert api.cloud.calls["device.get_latest_firmware_info"] == 2
+    sensors = [device for device in coordinator.devices if device.product_code == "PW1"]
+    assert all(device.firmware_latest_version == sensors[0].firmware_latest_version for device in sensors)
+    assert sensors[0].firmware_latest_version is not None
+    assert set(coordinator.firmware.as_dict()) == {"PP2", "PW1"}
+
+    coordinator.async_apply_options(PhynOptions(firmware_ttl=0))
+    await coordinator.async_refresh()
+    assert api.cloud.calls["device.get_latest_firmware_info"] == 6
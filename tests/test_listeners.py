@@ -0,0 +1,38 @@
+"""Tests for per-device listeners and unchanged refresh detection."""
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.phyn.devices.pc import PhynClassicDevice  # noqa: E402
+
+
+def test_unchanged_refresh_skips_writes():
+    """Test listeners are only notified when the device data changed."""
+    device = PhynClassicDevice(MagicMock(), "home", "device", "PC1")
+    writes = []
+    remove = device.async_add_listener(lambda: writes.append(1))
+
+    assert device.async_update_listeners_if_changed() == 0
+    assert len(writes) == 1
+
+    device._device_state.update({"last_updated": 1700000000})
+    assert device.async_update_listeners_if_changed() == 1
+    assert len(writes) == 1
+
+    device._device_state.update({"pressure1": {"v": 60.0}})
+    assert device.async_update_listeners_if_changed() == 0
+    assert len(writes) == 2
+
+    # A notification in between, such as a realtime update, forces the next write
+    device.async_update_listeners()
+    assert len(writes) == 3
+    assert device.async_update_listeners_if_changed() == 0
+    assert len(writes) == 4
+
+    remove()
+    device._device_state.update({"pressure1": {"v": 61.0}})
+    assert device.async_update_listeners_if_changed() == 0
+    assert len(writes) == 4
+    device._coordinator.async_add_listener.return_value.assert_called_once()
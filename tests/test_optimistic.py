@@ -0,0 +1,120 @@
+"""Tests for optimistic command state."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("numpy")
+
+from custom_components.phyn.devices import pp  # noqa: E402
+from custom_components.phyn.devices.optimistic import OptimisticState  # noqa: E402
+from custom_components.phyn.options import PhynOptions  # noqa: E402
+
+
+def _coordinator() -> MagicMock:
+    """Create a coordinator mock running tasks on the current loop."""
+    loop = asyncio.get_running_loop()
+    coordinator = MagicMock()
+    coordinator.options = PhynOptions()
+    coordinator.hass.loop = loop
+    coordinator.hass.async_create_background_task = lambda target, name: loop.create_task(target)
+    return coordinator
+
+
+async def test_pending_value_expires():
+    """Test a pending value is shown until its deadline and then rolled back."""
+    hass = MagicMock(loop=asyncio.get_running_loop())
+    changes = []
+    state = OptimisticState(hass, "device", lambda: changes.append(1))
+
+    state.async_set("key", True, 0.01)
+    assert state.value("key", False) is True
+    assert not state.async_confirm("key", False)
+
+    await asyncio.sleep(0.02)
+    assert not state.is_pending("key")
+    assert state.value("key", False) is False
+    assert len(changes) == 2
+
+
+async def test_preference_confirmed_by_read_back(monkeypatch):
+    """Test a preference is shown immediately and confirmed by the read back."""
+    monkeypatch.setattr(pp, "PREFERENCE_WRITE_DELAY", 0.01)
+    coordinator = _coordinator()
+    api = coordinator.api_client.device
+    api.set_device_preferences = AsyncMock()
+    api.get_device_preferences = AsyncMock(
+        return_value=[{"name": pp.AWAY_MODE_KEY, "value": "true"}]
+    )
+    device = pp.PhynPlusDevice(coordinator, "home", "device", "PP2")
+
+    await device.set_away_mode(True)
+
+    assert device.away_mode is True
+    assert not device._optimistic.is_pending(pp.AWAY_MODE_KEY)
+
+
+async def test_failed_command_rolls_back():
+    """Test a failed command shows the reported state again."""
+    coordinator = _coordinator()
+    coordinator.api_client.device.close_valve = AsyncMock(side_effect=RuntimeError("offline"))
+    device = pp.PhynPlusDevice(coordinator, "home", "device", "PP2")
+    device._device_state.update({"sov_status": {"v": "Open"}})
+
+    with pytest.raises(RuntimeError):
+        await device.async_set_valve(False)
+
+    assert device.valve_open is True
+    assert not device.valve_command_pending
+
+
+async def test_preference_writes_are_batched(monkeypatch):
+    """Test preferences set together are written in one request."""
+    monkeypatch.setattr(pp, "PREFERENCE_WRITE_DELAY", 0.01)
+    coordinator = _coordinator()
+    api = coordinator.api_client.device
+    api.set_device_preferences = AsyncMock()
+    api.get_device_preferences = AsyncMock(return_value=[
+        {"name": pp.AWAY_MODE_KEY, "value": "false"},
+        {"name": pp.SCHEDULER_KEY, "value": "true"},
+    ])
+    device = pp.PhynPlusDevice(coordinator, "home", "device", "PP2")
+
+    await asyncio.gather(
+        device.set_away_mode(True),
+        device.set_scheduler_enabled(True),
+        device.set_away_mode(False),
+    )
+
+    api.set_device_preferences.assert_awaited_once()
+    params = api.set_device_preferences.await_args.args[1]
+    assert {param["name"]: param["value"] for param in params} == {
+        pp.AWAY_MODE_KEY: "false",
+        pp.SCHEDULER_KEY: "true",
+    }
+    api.get_device_preferences.assert_awaited_once()
+    assert device.away_mode is False
+    assert device.scheduled_leak_test_enabled is True
+
+
+async def test_command_deadline_covers_next_poll(monkeypatch):
+    """Test an unconfirmed command is shown until after the configured next poll."""
+    monkeypatch.setattr(pp, "PREFERENCE_WRITE_DELAY", 0.01)
+    coordinator = _coordinator()
+    coordinator.options = PhynOptions(poll_interval_phyn_plus=600)
+    api = coordinator.api_client.device
+    api.set_autoshutoff_enabled = AsyncMock()
+    api.get_autoshuftoff_status = AsyncMock(return_value={"auto_shutoff_enable": False})
+    api.set_device_preferences = AsyncMock()
+    api.get_device_preferences = AsyncMock(return_value=[])
+    device = pp.PhynPlusDevice(coordinator, "home", "device", "PP2")
+
+    await device.set_autoshutoff_enabled(True)
+    await device.set_away_mode(True)
+
+    loop = asyncio.get_running_loop()
+    for key in (pp.AUTO_SHUTOFF_KEY, pp.AWAY_MODE_KEY):
+        remaining = device._optimistic._pending[key].timer.when() - loop.time()
+        assert 600 < remaining <= 600 + pp.POLL_SLACK + pp.COMMAND_CONFIRM_MARGIN
+        device._optimistic.async_rollback(key, "test finished")
@@ -0,0 +1,76 @@
+"""Tests for the options flow and applying options live."""
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("numpy")
+
+from homeassistant.data_entry_flow import FlowResultType  # noqa: E402
+
+from custom_components.phyn.config_flow import OptionsFlowHandler  # noqa: E402
+from custom_components.phyn.options import PhynOptions, options_schema  # noqa: E402
+
+from .fake_phyn import FakePhynAPI  # noqa: E402
+
+
+def test_options_defaults_and_schema():
+    """Test missing options default and the form validates ranges."""
+    options = PhynOptions.from_options({"poll_interval_water_sensor": 300, "unknown": 1})
+    assert options.poll_interval_water_sensor == 300
+    assert options.update_interval == 60
+    assert not options.deadbands
+
+    data = options_schema(options)({"refresh_concurrency": "4"})
+    assert data["refresh_concurrency"] == 4
+    assert data["poll_interval_water_sensor"] == 300
+    with pytest.raises(Exception):
+        options_schema(options)({"poll_interval_phyn_plus": 1})
+
+
+async def test_options_flow(hass):
+    """Test the options flow shows the current options and stores the new ones."""
+    flow = OptionsFlowHandler(MagicMock(options={"flow_deadband": 0.2}))
+    flow.hass = hass
+
+    result = await flow.async_step_init()
+    assert result["type"] == FlowResultType.FORM
+    assert result["data_schema"]({})["flow_deadband"] == 0.2
+
+    result = await flow.async_step_init({"analytics": False})
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["data"] == {"analytics": False}
+
+
+async def test_poll_intervals_per_device_class(setup_fake_api):
+    """Test devices of a class with a longer interval skip refreshes until due."""
+    api = FakePhynAPI({"PP2": 1, "PW1": 1})
+    coordinator = await setup_fake_api(api)
+    coordinator.async_apply_options(PhynOptions(poll_interval_water_sensor=300, refresh_concurrency=2))
+    assert coordinator.update_interval.total_seconds() == 60
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+
+    assert api.cloud.calls["device.get_water_statistics"] == 1
+    assert api.cloud.calls["device.get_autoshuftoff_status"] == 3
+
+
+async def test_realtime_deadbands(setup_fake_api):
+    """Test realtime readings within the deadbands do not write entity states."""
+    api = FakePhynAPI({"PP2": 1})
+    coordinator = await setup_fake_api(api)
+    coordinator.async_apply_options(PhynOptions(pressure_deadband=1.0, flow_deadband=0.5))
+    device = coordinator.devices[0]
+    writes = []
+    remove = device.async_add_listener(lambda: writes.append(1))
+
+    await api.mqtt.push_realtime(device.id, flow=1.0, pressure=60.0)
+    await api.mqtt.push_realtime(device.id, flow=1.2, pressure=60.5)
+    await api.mqtt.push_realtime(device.id, flow=1.2, pressure=61.5)
+    await api.mqtt.push_realtime(device.id, sov_status="Close", flow=1.2, pressure=61.5)
+
+    assert len(writes) == 3
+    assert device.skipped_realtime_writes == 1
+    assert device.current_psi == 61.5
+    remove()
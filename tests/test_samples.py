@@ -0,0 +1,46 @@
+"""Tests for the realtime sample ring buffer."""
+import math
+
+import pytest
+
+from .standalone import import_standalone
+
+pytest.importorskip("numpy")
+
+SampleRingBuffer = import_standalone("analytics", "samples").SampleRingBuffer
+
+
+def test_ring_buffer_wraps():
+    """Test the buffer keeps only the newest samples in order."""
+    buffer = SampleRingBuffer(4)
+    for i in range(6):
+        buffer.append(float(i), flow=float(i))
+
+    assert len(buffer) == 4
+    ts, flow, pressure, _ = buffer.window(0)
+    assert ts.tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert flow.tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert all(math.isnan(value) for value in pressure.tolist())
+
+    ts, *_ = buffer.window(3.5)
+    assert ts.tolist() == [4.0, 5.0]
+
+
+def test_downsample():
+    """Test min/max/mean buckets skip missing values."""
+    buffer = SampleRingBuffer(16)
+    buffer.append(100.0, flow=1.0, pressure=60.0)
+    buffer.append(101.0, flow=3.0)
+    buffer.append(105.0, flow=2.0, pressure=58.0)
+    buffer.append(112.0, pressure=59.0)
+
+    result = buffer.downsample(100.0, 5.0)
+
+    assert result["ts"] == [100.0, 105.0, 110.0]
+    assert result["flow"] == {
+        "min": [1.0, 2.0, None],
+        "max": [3.0, 2.0, None],
+        "mean": [2.0, 2.0, None],
+    }
+    assert result["pressure"]["mean"] == [60.0, 58.0, 59.0]
+    assert result["temperature"]["min"] == [None, None, None]
@@ -0,0 +1,220 @@
+"""Tests for the phyn services."""
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("numpy")
+
+from aiophyn.errors import RequestError  # noqa: E402
+from homeassistant.exceptions import HomeAssistantError  # noqa: E402
+
+from custom_components.phyn.const import DOMAIN  # noqa: E402
+from custom_components.phyn.devices.pp import PhynPlusDevice  # noqa: E402
+from custom_components.phyn.services import (  # noqa: E402
+    phyn_leak_test,
+    phyn_profile,
+    phyn_set_home_away_mode,
+)
+from custom_components.phyn.update_coordinator import PhynDataUpdateCoordinator  # noqa: E402
+
+from .fake_phyn import FakePhynAPI  # noqa: E402
+
+
+def _device(hass, device_id: str) -> PhynPlusDevice:
+    """Create a Phyn Plus device indexed under a valve entity."""
+    coordinator = MagicMock()
+    coordinator.hass = hass
+    device = PhynPlusDevice(coordinator, "home", device_id, "PP2")
+    hass.data[DOMAIN]["coordinator"].async_index_entity(f"valve.{device_id}", device)
+    return device
+
+
+async def test_leak_test_multiple_targets(hass):
+    """Test leak tests run for every target and report per-device results."""
+    hass.data[DOMAIN] = {"coordinator": PhynDataUpdateCoordinator(hass, MagicMock())}
+    first = _device(hass, "first")
+    second = _device(hass, "second")
+    first.async_run_leak_test = AsyncMock(return_value={"code": "success"})
+    second.async_run_leak_test = AsyncMock(side_effect=RequestError("offline"))
+    service = MagicMock(
+        hass=hass,
+        data={
+            "entity_id": ["valve.first", "valve.second"],
+            "extended": True,
+            "wait": False,
+            "timeout": 1800,
+        },
+        return_response=True,
+    )
+
+    response = await phyn_leak_test(service)
+
+    first.async_run_leak_test.assert_awaited_once_with(True)
+    assert response["results"]["first"] == {"success": True}
+    assert response["results"]["second"]["success"] is False
+
+
+async def test_leak_test_unexpected_error_keeps_other_results(hass):
+    """Test an unexpected error on one target is reported without losing the others."""
+    hass.data[DOMAIN] = {"coordinator": PhynDataUpdateCoordinator(hass, MagicMock())}
+    first = _device(hass, "first")
+    second = _device(hass, "second")
+    first.async_run_leak_test = AsyncMock(return_value={"code": "success"})
+    first.async_wait_leak_test = AsyncMock(side_effect=KeyError("end_time"))
+    second.async_run_leak_test = AsyncMock(side_effect=ValueError("bad response"))
+    service = MagicMock(
+        hass=hass,
+        data={
+            "entity_id": ["valve.first", "valve.second"],
+            "extended": False,
+            "wait": True,
+            "timeout": 60,
+        },
+        return_response=True,
+    )
+
+    response = await phyn_leak_test(service)
+
+    assert response["results"]["first"]["success"] is True
+    assert response["results"]["first"]["completed"] is False
+    assert "end_time" in response["results"]["first"]["error"]
+    assert response["results"]["second"] == {"success": False, "error": "ValueError('bad response')"}
+
+
+async def test_leak_test_wait_for_result(hass, monkeypatch):
+    """Test waiting for a leak test returns the health test after LeakExp ends."""
+    monkeypatch.setattr(hass, "async_create_background_task", lambda target, name: hass.async_create_task(target))
+    hass.data[DOMAIN] = {"coordinator": PhynDataUpdateCoordinator(hass, MagicMock())}
+    device = _device(hass, "valve")
+    api = device._coordinator.api_client.device
+    api.run_leak_test = AsyncMock(return_value={"code": "success"})
+    api.get_health_tests = AsyncMock(return_value={"data": [{"end_time": 2, "is_leak": False}]})
+    service = MagicMock(
+        hass=hass,
+        data={"entity_id": ["valve.valve"], "extended": False, "wait": True, "timeout": 60},
+        return_response=True,
+    )
+
+    task = asyncio.create_task(phyn_leak_test(service))
+    while not api.run_leak_test.await_count:
+        await asyncio.sleep(0)
+    await device.on_device_update("valve", {"sov_state": "LeakExp"})
+    await device.on_device_update("valve", {"sov_state": "Open"})
+    response = await task
+
+    assert response["results"]["valve"] == {
+        "success": True,
+        "completed": True,
+        "result": {"end_time": 2, "is_leak": False},
+    }
+
+
+async def test_leak_test_restart_keeps_waiters(hass, monkeypatch):
+    """Test starting a leak test while one is tracked hands the waiter a result, not a cancellation."""
+    monkeypatch.setattr(hass, "async_create_background_task", lambda target, name: hass.async_create_task(target))
+    hass.data[DOMAIN] = {"coordinator": PhynDataUpdateCoordinator(hass, MagicMock())}
+    device = _device(hass, "valve")
+    api = device._coordinator.api_client.device
+    api.run_leak_test = AsyncMock(side_effect=[{"code": "success"}, RequestError("busy")])
+    api.get_health_tests = AsyncMock(return_value={"data": [{"end_time": 2, "is_leak": False}]})
+
+    await device.async_run_leak_test()
+    waiter = asyncio.create_task(device.async_wait_leak_test(60))
+    await asyncio.sleep(0)
+    with pytest.raises(RequestError):
+        await device.async_run_leak_test()
+    await device.on_device_update("valve", {"sov_state": "LeakExp"})
+    await device.on_device_update("valve", {"sov_state": "Open"})
+
+    assert await waiter == {"end_time": 2, "is_leak": False}
+
+
+async def test_leak_test_completed_by_health_test(hass):
+    """Test a leak test whose LeakExp status was never polled completes with the next health test."""
+    hass.data[DOMAIN] = {"coordinator": PhynDataUpdateCoordinator(hass, MagicMock())}
+    device = _device(hass, "valve")
+    api = device._coordinator.api_client.device
+    api.run_leak_test = AsyncMock(return_value={"code": "success"})
+    test = {"end_time": time.time() * 1000 + 1000, "is_leak": False}
+    api.get_health_tests = AsyncMock(return_value={"data": [test]})
+
+    await device.async_run_leak_test()
+    waiter = asyncio.create_task(device.async_wait_leak_test(60))
+    await asyncio.sleep(0)
+    await device._update_device_health_tests()
+
+    assert await waiter == test
+    assert not device._leak_test_tracker.active
+
+
+async def test_home_away_mode_partial_failure(hass):
+    """Test a home service reports the devices that failed."""
+    coordinator = PhynDataUpdateCoordinator(hass, MagicMock())
+    hass.data[DOMAIN] = {"coordinator": coordinator}
+    first = _device(hass, "first")
+    second = _device(hass, "second")
+    other = PhynPlusDevice(MagicMock(), "other", "other", "PP2")
+    coordinator._devices.extend([first, second, other])
+    for device in (first, second, other):
+        device.set_away_mode = AsyncMock()
+    second.set_away_mode.side_effect = RequestError("offline")
+    third = _device(hass, "third")
+    coordinator._devices.append(third)
+    third.set_away_mode = AsyncMock(side_effect=KeyError("value"))
+    service = MagicMock(
+        hass=hass,
+        service="set_home_away_mode",
+        data={"home_id": "home", "enabled": True},
+        return_response=True,
+    )
+
+    response = await phyn_set_home_away_mode(service)
+
+    first.set_away_mode.assert_awaited_once_with(True)
+    other.set_away_mode.assert_not_awaited()
+    assert response["failed"] == ["second", "third"]
+    assert response["results"]["first"] == {"success": True}
+    assert response["results"]["third"] == {"success": False, "error": "KeyError('value')"}
+
+    service.return_response = False
+    with pytest.raises(HomeAssistantError):
+        await phyn_set_home_away_mode(service)
+
+
+async def test_profile_refreshes_and_updates(hass, tmp_path, setup_fake_api):
+    """Test profiling covers the requested refreshes and updates and returns hotspots."""
+    api = FakePhynAPI({"PP2": 1})
+    coordinator = await setup_fake_api(api)
+    hass.data[DOMAIN] = {"coordinator": coordinator}
+    hass.config.config_dir = str(tmp_path)
+    service = MagicMock(hass=hass, data={"refreshes": 1, "updates": 2, "timeout": 10, "top": 5})
+
+    task = asyncio.ensure_future(phyn_profile(service))
+    await asyncio.sleep(0)
+    assert coordinator.profiler is not None
+    await coordinator.async_refresh()
+    for flow in (1.0, 0.0, 2.0):
+        await api.mqtt.push_realtime("pp2-0000", flow=flow)
+    response = await task
+
+    assert coordinator.profiler is None
+    assert (response["refreshes"], response["updates"]) == (1, 2)
+    assert len(response["hotspots"]) == 5
+    assert (tmp_path / response["path"]).exists()
+
+
+async def test_profile_nothing_profiled(hass, tmp_path, setup_fake_api):
+    """Test profiling that times out before anything ran reports no file."""
+    coordinator = await setup_fake_api(FakePhynAPI({"PP2": 1}))
+    hass.data[DOMAIN] = {"coordinator": coordinator}
+    hass.config.config_dir = str(tmp_path)
+    service = MagicMock(hass=hass, data={"refreshes": 1, "updates": 0, "timeout": 0.01, "top": 5})
+
+    response = await phyn_profile(service)
+
+    assert coordinator.profiler is None
+    assert response == {"path": None, "duration": 0, "refreshes": 0, "updates": 0, "hotspots": []}
+    assert not list(tmp_path.glob("*.prof"))
@@ -0,0 +1,57 @@
+"""Tests for the typed device state models."""
+from .standalone import import_standalone
+
+state = import_standalone("devices", "state")
+PhynClassicState = state.PhynClassicState
+PhynPlusState = state.PhynPlusState
+PhynWaterSensorState = state.PhynWaterSensorState
+
+
+def test_plus_state_parses_readings():
+    """Test readings are parsed and rounded at ingest."""
+    state = PhynPlusState()
+    state.update({
+        "flow": {"v": 1.23456, "ts": 1},
+        "pressure": {"mean": 55.555},
+        "sov_status": {"v": "Open"},
+        "online_status": {"v": "online"},
+        "fw_version": 123,
+        "unknown": {"v": 1},
+    })
+
+    assert state.flow == 1.235
+    assert state.pressure == 55.55
+    assert state.temperature == 0.0
+    assert state.sov_status == "Open"
+    assert state.online
+    assert state.fw_version == "123"
+
+    state.update({"flow": {"ts": 2}})
+    assert state.flow is None
+
+
+def test_classic_state_lines():
+    """Test the per-line readings of a Phyn Classic."""
+    state = PhynClassicState()
+    state.update({"pressure1": {"v": 60.123}, "temperature2": {"mean": 50.456}, "hot_line_num": 2})
+
+    assert state.pressure1 == 60.12
+    assert state.pressure2 == 0.0
+    assert state.temperature2 == 50.46
+    assert state.hot_line_num == 2
+
+
+def test_water_sensor_statistics():
+    """Test water sensor statistics and alerts."""
+    state = PhynWaterSensorState()
+    state.update_statistics({
+        "battery_level": 90,
+        "humidity": [{"value": 40.2}],
+        "alerts": {"water": True},
+    })
+
+    assert state.battery == 90
+    assert state.humidity == 40.2
+    assert state.temperature is None
+    assert state.water_detected is True
+    assert state.high_humidity is None
@@ -0,0 +1,46 @@
+"""Tests for recording and replaying traces of Phyn traffic."""
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("numpy")
+
+from custom_components.phyn.trace import REDACTED, RecordingClient, load_trace  # noqa: E402
+
+from .fake_phyn import FakePhynAPI  # noqa: E402
+from .replay_phyn import ReplayPhynAPI  # noqa: E402
+
+
+async def test_record_and_replay(tmp_path, setup_fake_api):
+    """Test a recorded trace is redacted and replays to the same state."""
+    api = FakePhynAPI({"PP2": 1})
+    coordinator = await setup_fake_api(api)
+    device = coordinator.devices[0]
+    path = tmp_path / "trace.jsonl.gz"
+
+    await coordinator.async_start_trace(path, 60)
+    assert isinstance(coordinator.api_client, RecordingClient)
+    await coordinator.async_refresh()
+    await api.mqtt.push_realtime(device.id, flow=1.5, pressure=61.0)
+    await coordinator.api_client.home.get_homes(api.username)
+    assert await coordinator.async_stop_trace() == path
+    assert not isinstance(coordinator.api_client, RecordingClient)
+    # Updates after stopping are not recorded
+    await api.mqtt.push_realtime(device.id, flow=0.0)
+
+    records = load_trace(path)
+    assert [record["kind"] for record in records[:2]] == ["header", "devices"]
+    assert sum(record["kind"] == "mqtt" for record in records) == 1
+    calls = {record["name"]: record for record in records if record["kind"] == "call"}
+    assert "device.get_state" in calls
+    assert calls["home.get_homes"]["args"] == [REDACTED]
+    assert api.username not in path.read_bytes().decode("latin-1")
+
+    replay = ReplayPhynAPI(records)
+    replayed = await setup_fake_api(replay)
+    replayed_device = replayed.devices[0]
+    assert replayed.last_update_success
+    assert replayed_device.id == device.id
+    assert await replay.async_replay(speed=0) == 1
+    assert replayed_device.current_flow_rate == 1.5
+    assert "device.get_state" not in replay.unanswered
+    assert "device.get_latest_firmware_info" in replay.unanswered
@@ -0,0 +1,76 @@
+"""Tests for the valve command confirmation burst."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("numpy")
+
+from custom_components.phyn.devices import pp  # noqa: E402
+
+from .fake_phyn import FakePhynAPI  # noqa: E402
+
+
+def _device() -> pp.PhynPlusDevice:
+    """Create a Phyn Plus device with a mocked API."""
+    coordinator = MagicMock()
+    coordinator.api_client.device.get_state = AsyncMock(
+        side_effect=[{"sov_status": {"v": "Partial"}}, {"sov_status": {"v": "Close"}}]
+    )
+    return pp.PhynPlusDevice(coordinator, "home", "device", "PP2")
+
+
+async def test_confirm_valve_by_poll(monkeypatch):
+    """Test the state is polled until the valve settles."""
+    monkeypatch.setattr(pp, "VALVE_CONFIRM_INITIAL_INTERVAL", 0.01)
+    device = _device()
+    device._valve_target = False
+    device._valve_confirm_task = asyncio.create_task(device._async_confirm_valve(False, pp.time.monotonic()))
+    await device._valve_confirm_task
+
+    assert device._coordinator.api_client.device.get_state.await_count == 2
+    assert device.valve_confirmation["confirmed_by"] == "poll"
+    assert device.valve_command_latency is not None
+    assert device._valve_target is None
+
+
+async def test_confirm_valve_by_mqtt():
+    """Test an MQTT update reaching the target ends the burst without polling."""
+    device = _device()
+    device._valve_target = False
+    task = device._valve_confirm_task = asyncio.create_task(
+        device._async_confirm_valve(False, pp.time.monotonic())
+    )
+    await device.on_device_update("device", {"sov_state": "Close"})
+    await task
+
+    device._coordinator.api_client.device.get_state.assert_not_awaited()
+    assert device.valve_confirmation["confirmed_by"] == "mqtt"
+
+
+async def test_back_to_back_valve_commands(setup_fake_api):
+    """Test a second command keeps its own confirmation when it cancels the first."""
+    api = FakePhynAPI({"PP2": 1})
+    api.cloud.valve_travel = 0.05
+    coordinator = await setup_fake_api(api)
+    device = coordinator.devices[0]
+
+    await device.async_set_valve(False)
+    first = device._valve_confirm_task
+    # Let the first burst start waiting for its confirmation
+    await asyncio.sleep(0)
+    await device.async_set_valve(True)
+    await asyncio.sleep(0)
+
+    assert first.cancelled()
+    second = device._valve_confirm_task
+    assert second is not None and second is not first
+    assert device._valve_target is True
+
+    await api.mqtt.settle()
+    await second
+    assert not device.valve_closed
+    assert device.valve_confirmation["target"] == "open"
+    assert device.valve_confirmation["confirmed_by"] == "mqtt"
+    assert device._valve_confirm_task is None
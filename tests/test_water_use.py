@@ -0,0 +1,66 @@
+"""Tests for the water-use event detector."""
+import pytest
+
+from .standalone import import_standalone
+
+water_use = import_standalone("analytics", "water_use")
+WaterUseEventDetector = water_use.WaterUseEventDetector
+payload_timestamp = water_use.payload_timestamp
+
+
+def test_event_segmentation():
+    """Test that a flow burst is reported as a single event."""
+    detector = WaterUseEventDetector()
+
+    assert detector.add_sample(0, 0.0) is None
+    assert detector.add_sample(10, 2.0) is None
+    assert detector.active
+    assert detector.add_sample(40, 3.0) is None
+    event = detector.add_sample(70, 0.0)
+
+    assert event is not None
+    assert not detector.active
+    assert event.start == 10
+    assert event.end == 70
+    assert event.duration == 60
+    assert event.peak_gpm == 3.0
+    # 30s at an average of 2.5 gpm plus 30s at an average of 1.5 gpm
+    assert event.volume == pytest.approx(2.0)
+
+
+def test_ignores_out_of_order_and_tiny_events():
+    """Test duplicate samples and negligible events are dropped."""
+    detector = WaterUseEventDetector()
+
+    assert detector.add_sample(10, 0.1) is None
+    assert detector.add_sample(5, 4.0) is None
+    assert detector.add_sample(11, 0.0) is None
+    assert not detector.active
+
+
+def test_flow_state_closes_event():
+    """Test an event closes when the device reports no flow instead of a zero sample."""
+    detector = WaterUseEventDetector()
+
+    assert detector.add_sample(10, 2.0) is None
+    assert detector.add_sample(40, 2.0) is None
+    event = detector.flow_stopped(70)
+
+    assert event is not None
+    assert not detector.active
+    assert event.end == 70
+    # 30s at 2 gpm plus 30s ramping down to no flow
+    assert event.volume == pytest.approx(1.5)
+
+    # A state at the time of the last sample closes the event there
+    assert detector.add_sample(80, 1.0) is None
+    assert detector.flow_stopped(80) is None
+    assert not detector.active
+    assert detector.flow_stopped(90) is None
+
+
+def test_payload_timestamp():
+    """Test payload timestamps are normalised to seconds."""
+    assert payload_timestamp({"v": 1, "ts": 1700000000000}, 5.0) == 1700000000
+    assert payload_timestamp({"v": 1, "ts": 1700000000}, 5.0) == 1700000000
+    assert payload_timestamp({"v": 1}, 5.0) == 5.0